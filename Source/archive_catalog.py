@@ -0,0 +1,327 @@
+# archive_catalog.py
+import os
+import bz2
+import zlib
+import time
+import struct
+import sqlite3
+import zipfile
+import threading
+import logging
+from pathlib import Path
+
+from file_index import fold_text
+from compression import is_archive_name, READ_CHUNK
+
+# Yerel dosya başlığı: imza ... ad uzunluğu, ek alan uzunluğu (30 bayt)
+_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+_LOCAL_SIGNATURE = b'PK\x03\x04'
+
+
+class ArchivedMember:
+    __slots__ = ('archive', 'name', 'size', 'compress_size', 'crc', 'method', 'offset')
+
+    def __init__(self, archive, name, size, compress_size, crc, method, offset):
+        self.archive = Path(archive)
+        self.name = name
+        self.size = size
+        self.compress_size = compress_size
+        self.crc = crc
+        self.method = method
+        self.offset = offset
+
+    @property
+    def path(self):
+        """Arama sonucunda gösterilen yol: Old/Archived_....zip/ad"""
+        return self.archive / self.name
+
+
+def _make_decompressor(method):
+    if method == zipfile.ZIP_DEFLATED:
+        return zlib.decompressobj(-15)
+    if method == zipfile.ZIP_BZIP2:
+        return bz2.BZ2Decompressor()
+    if method == zipfile.ZIP_LZMA:
+        return zipfile.LZMADecompressor()
+    raise zipfile.BadZipFile(f"Unsupported compression method: {method}")
+
+
+class ArchiveCatalog:
+    """
+    Old'daki arşivlerin üye kataloğu (SQLite). Her arşivin merkezi dizini
+    yalnızca bir kez okunur; üye adı, boyutu, CRC'si ve yerel başlığının
+    arşiv içindeki konumu saklanır. Sıkıştırıcı yeni bir arşivi kapatınca
+    üyeleri doğrudan bellekten eklenir (add_archive). Boyutu ya da mtime'ı
+    değişmeyen arşivler refresh()'te yeniden okunmaz.
+    """
+
+    SCHEMA_VERSION = '1'
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._fts = False
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._create_schema()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != self.SCHEMA_VERSION:
+                conn.execute('DROP TABLE IF EXISTS members_fts')
+                conn.execute('DROP TABLE IF EXISTS members')
+                conn.execute('DROP TABLE IF EXISTS archives')
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (self.SCHEMA_VERSION,)
+                )
+
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS archives (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS members (
+                    id INTEGER PRIMARY KEY,
+                    archive TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    compress_size INTEGER NOT NULL,
+                    crc INTEGER NOT NULL,
+                    method INTEGER NOT NULL,
+                    offset INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS members_archive ON members (archive)')
+
+            # Alt dize araması FileIndex'teki gibi trigram FTS ile
+            try:
+                conn.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS members_fts USING fts5(
+                        key, content='members', content_rowid='id', tokenize='trigram'
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS members_ai AFTER INSERT ON members BEGIN
+                        INSERT INTO members_fts (rowid, key) VALUES (new.id, new.key);
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS members_ad AFTER DELETE ON members BEGIN
+                        INSERT INTO members_fts (members_fts, rowid, key) VALUES ('delete', old.id, old.key);
+                    END
+                ''')
+                self._fts = True
+            except sqlite3.OperationalError as e:
+                logging.warning(f"Trigram FTS desteklenmiyor, arşiv kataloğunda düz arama: {e}")
+
+    def refresh(self, directory):
+        """
+        Dizindeki arşivleri katalogla eşitler: yeni ya da değişen arşivlerin
+        merkezi dizini okunur, silinen arşivlerin üyeleri çıkarılır.
+        """
+        start = time.perf_counter()
+        found = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not is_archive_name(entry.name):
+                        continue
+                    try:
+                        if entry.is_file():
+                            st = entry.stat()
+                            found[entry.path] = (st.st_size, st.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logging.error(f"Archive catalog scan error: {e}")
+            return
+
+        directory = str(directory)
+        known = {
+            path: (size, mtime)
+            for path, size, mtime in self._connect().execute('SELECT path, size, mtime FROM archives')
+            if os.path.dirname(path) == directory
+        }
+        removed = known.keys() - found.keys()
+        if removed:
+            self._remove_archives(removed)
+
+        read = 0
+        for path, signature in found.items():
+            if known.get(path) == signature:
+                continue
+            try:
+                with zipfile.ZipFile(path) as archive:
+                    infos = archive.infolist()
+            except (OSError, zipfile.BadZipFile) as e:
+                logging.error(f"Archive catalog read error for {path}: {e}")
+                continue
+            self.add_archive(path, infos, signature)
+            read += 1
+        if read or removed:
+            logging.info(
+                f"Archive catalog refreshed: {read} archives read, {len(removed)} removed "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+
+    def add_archive(self, path, infos, signature=None):
+        """Arşivin üyelerini (zipfile.ZipInfo listesi) kaydeder; varsa eski kaydın yerini alır"""
+        path = str(path)
+        if signature is None:
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                logging.error(f"Archive catalog update error for {path}: {e}")
+                return
+            signature = (st.st_size, st.st_mtime_ns)
+        rows = [
+            (path, info.filename, fold_text(info.filename), info.file_size,
+             info.compress_size, info.CRC, info.compress_type, info.header_offset)
+            for info in infos
+            if not info.is_dir()
+        ]
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute('DELETE FROM members WHERE archive = ?', (path,))
+                    conn.executemany(
+                        'INSERT INTO members (archive, name, key, size, compress_size, crc, method, offset) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                        rows
+                    )
+                    conn.execute(
+                        'INSERT OR REPLACE INTO archives (path, size, mtime) VALUES (?, ?, ?)',
+                        (path, *signature)
+                    )
+        except sqlite3.Error as e:
+            logging.error(f"Archive catalog update error for {path}: {e}")
+
+    def _remove_archives(self, paths):
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany('DELETE FROM members WHERE archive = ?', [(path,) for path in paths])
+                    conn.executemany('DELETE FROM archives WHERE path = ?', [(path,) for path in paths])
+        except sqlite3.Error as e:
+            logging.error(f"Archive catalog remove error: {e}")
+
+    def iter_search(self, term, limit=None, batch_size=500, should_stop=None):
+        """
+        Adı terimi içeren arşiv üyelerini batch_size'lık ArchivedMember
+        listeleri halinde üretir (FileIndex.iter_search ile aynı sözleşme).
+        """
+        term = fold_text(term)
+        if not term:
+            return
+
+        conn = self._connect()
+        columns = 'members.archive, members.name, members.size, members.compress_size, ' \
+                  'members.crc, members.method, members.offset'
+        params = [term]
+        if self._fts and len(term) >= 3:
+            query = (
+                f'SELECT {columns} FROM members_fts '
+                'JOIN members ON members.id = members_fts.rowid '
+                'WHERE members_fts.key LIKE ? AND instr(members.key, ?) > 0'
+            )
+            params.insert(0, f'%{term}%')
+        else:
+            query = f'SELECT {columns} FROM members WHERE instr(key, ?) > 0'
+
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        if should_stop is not None:
+            conn.set_progress_handler(should_stop, 10000)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                if should_stop is not None and should_stop():
+                    return
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield [ArchivedMember(*row) for row in rows]
+        except sqlite3.OperationalError as e:
+            if should_stop is None or not should_stop():
+                logging.error(f"Archive catalog search error: {e}")
+        except sqlite3.Error as e:
+            logging.error(f"Archive catalog search error: {e}")
+        finally:
+            if should_stop is not None:
+                conn.set_progress_handler(None, 0)
+
+    def extract(self, member, dest_dir):
+        """
+        Tek bir üyeyi, arşivi açmadan doğrudan yerel başlığının konumuna
+        giderek çıkarır ve CRC'sini doğrular. Çıkarılan dosyanın yolunu döndürür.
+        """
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        dest_path = dest_dir / os.path.basename(member.name)
+        temp_path = dest_path.with_name(dest_path.name + '.tmp')
+
+        with open(member.archive, 'rb') as src:
+            src.seek(member.offset)
+            header = src.read(_LOCAL_HEADER.size)
+            if len(header) != _LOCAL_HEADER.size:
+                raise zipfile.BadZipFile(f"Truncated local header for {member.name}")
+            fields = _LOCAL_HEADER.unpack(header)
+            if fields[0] != _LOCAL_SIGNATURE:
+                raise zipfile.BadZipFile(f"Bad local header for {member.name}, catalog out of date")
+            # Ad ve ek alan atlanır; boyutlar merkezi dizinden (katalogdan) alınır
+            src.seek(fields[-2] + fields[-1], os.SEEK_CUR)
+
+            decompressor = None if member.method == zipfile.ZIP_STORED else _make_decompressor(member.method)
+            remaining = member.compress_size
+            crc = 0
+            size = 0
+            try:
+                with open(temp_path, 'wb') as dst:
+                    while remaining > 0:
+                        chunk = src.read(min(READ_CHUNK, remaining))
+                        if not chunk:
+                            raise zipfile.BadZipFile(f"Truncated data for {member.name}")
+                        remaining -= len(chunk)
+                        if decompressor is not None:
+                            chunk = decompressor.decompress(chunk)
+                        crc = zlib.crc32(chunk, crc)
+                        size += len(chunk)
+                        dst.write(chunk)
+                    if decompressor is not None and hasattr(decompressor, 'flush'):
+                        chunk = decompressor.flush()
+                        crc = zlib.crc32(chunk, crc)
+                        size += len(chunk)
+                        dst.write(chunk)
+                if crc != member.crc or size != member.size:
+                    raise zipfile.BadZipFile(f"CRC/size mismatch extracting {member.name}")
+            except BaseException:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+                raise
+        os.replace(temp_path, dest_path)
+        logging.info(f"Extracted {member.name} from {member.archive.name}",
+                     extra={'op': 'extract', 'path': member.path, 'dest': dest_path, 'bytes': size})
+        return dest_path
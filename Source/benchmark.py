@@ -0,0 +1,700 @@
+# benchmark.py
+"""
+Düzenleyicinin sıcak yolları için başsız (Qt'siz) benchmark takımı.
+Her ölçüm geçici bir dizine yönlendirilmiş Config ile, corpus.py'nin
+ürettiği tekrarlanabilir sentetik ağaç üzerinde çalışır.
+
+    python benchmark.py run --sizes 1000 10000 --output bench.json
+    python benchmark.py run --baseline bench.json --tolerance 0.25
+    python benchmark.py fold
+    python benchmark.py classifier --files 100000
+    python benchmark.py startup --backlog-files 5000
+    python benchmark.py cluster --instances 1 2 4 --files 2000 --kill-one
+"""
+import os
+import sys
+import json
+import time
+import random
+import signal
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+from config import Config
+from corpus import generate_corpus, EXTENSIONS, ASCII_WORDS
+from file_index import fold_text
+from classifier import FileClassifier, SIGNATURES
+from rules import RuleEngine
+from logging_setup import setup_logging
+
+# Türkçe eşlenebilir karakterlerle dolu örnek; eski varyasyon üretimi
+# bu karakter sayısıyla üstel büyüyordu
+TR_SAMPLE = 'ŞişiçögüIİıSCGOU'
+
+SEARCH_QUERIES = [
+    'rapor', 'sirket', 'isik', 'download', 'fatura', 'pdf', 'ozet', 'image',
+    'İstanbul', 'çıktı', 'final_1', 'zzz_no_match', 'sözleşme', 'png', 'a', 'ed',
+]
+
+
+def _timeit(func, *args, repeat=2000):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def _make_config(workdir):
+    config = Config(home_path=workdir)
+    # Ölçüm sırasında kaynak yöneticisi işleri yavaşlatmasın
+    config.RESOURCE_LIMITS.update(MAX_CPU=100, MAX_RAM=100, MAX_DISK_MBPS=0)
+    return config
+
+
+def _make_file_manager(config):
+    # file_manager watchdog/psutil içe aktarır; yalnızca gereken ölçümlerde yüklenir
+    from file_manager import FileManager
+    return FileManager(config)
+
+
+def _result(seconds, ops, **extra):
+    result = {'seconds': seconds, 'ops': ops, 'ops_per_sec': ops / seconds if seconds > 0 else 0.0}
+    result.update(extra)
+    return result
+
+
+def bench_categorize(workdir, count, seed):
+    config = _make_config(workdir)
+    file_manager = _make_file_manager(config)
+    root = config.BASE_DIRS['FILES']
+    paths = generate_corpus(root, count, seed=seed)
+    ops = sum(1 for path in paths if os.path.dirname(path) == str(root))
+    try:
+        start = time.perf_counter()
+        file_manager.categorize_files_in_directory()
+        return _result(time.perf_counter() - start, ops)
+    finally:
+        file_manager.close()
+
+
+def bench_move_to_category(workdir, count, seed):
+    config = _make_config(workdir)
+    file_manager = _make_file_manager(config)
+    # Çakışan adlar dahil; hepsi tek tek move_to_category'den geçer
+    paths = generate_corpus(os.path.join(workdir, 'incoming'), count, seed=seed, collision_ratio=0.3)
+    try:
+        start = time.perf_counter()
+        for path in paths:
+            file_manager.move_to_category(path)
+        return _result(time.perf_counter() - start, len(paths))
+    finally:
+        file_manager.close()
+
+
+def bench_unique_filename(workdir, count, seed):
+    config = _make_config(workdir)
+    file_manager = _make_file_manager(config)
+    directory = config.BASE_DIRS['FILES'] / 'Others'
+    try:
+        start = time.perf_counter()
+        for _ in range(count):
+            file_manager._unique_filename(directory, 'download.pdf')
+        return _result(time.perf_counter() - start, count)
+    finally:
+        file_manager.close()
+
+
+def bench_compress_old_files(workdir, count, seed):
+    config = _make_config(workdir)
+    file_manager = _make_file_manager(config)
+    old_dir = config.BASE_DIRS['OLD']
+    paths = generate_corpus(old_dir, count, seed=seed, collision_ratio=0,
+                            min_age_days=31, max_age_days=365)
+    ops = sum(1 for path in paths if os.path.dirname(path) == str(old_dir))
+    total_bytes = sum(
+        os.path.getsize(path) for path in paths if os.path.dirname(path) == str(old_dir)
+    )
+    try:
+        start = time.perf_counter()
+        file_manager.compress_old_files()
+        seconds = time.perf_counter() - start
+        archived = sum(
+            entry.stat().st_size for entry in os.scandir(old_dir)
+            if entry.name.startswith('Archived_')
+        )
+        return _result(
+            seconds, ops,
+            mb_per_sec=total_bytes / (1024 * 1024) / seconds if seconds > 0 else 0.0,
+            ratio=archived / total_bytes if total_bytes else 0.0,
+        )
+    finally:
+        file_manager.close()
+
+
+def bench_clean_trash(workdir, count, seed):
+    config = _make_config(workdir)
+    file_manager = _make_file_manager(config)
+    trash_dir = config.BASE_DIRS['TRASH']
+    paths = generate_corpus(trash_dir, count, seed=seed, collision_ratio=0,
+                            min_age_days=2, max_age_days=30)
+    # Süre dolumu geliş indeksine göre yapılır; geliş zamanları mtime'dan alınır
+    for path in paths:
+        file_manager.trash.record(path, os.stat(path).st_mtime)
+    try:
+        start = time.perf_counter()
+        file_manager.trash_expiry.expire()
+        return _result(time.perf_counter() - start, len(paths))
+    finally:
+        file_manager.close()
+
+
+def bench_search(workdir, count, seed):
+    from file_index import FileIndex
+
+    config = _make_config(workdir)
+    generate_corpus(config.BASE_DIRS['FILES'] / 'Documents', count, seed=seed)
+    index = FileIndex(config.INDEX_PATH, config.BASE_DIRS['FILES'])
+
+    start = time.perf_counter()
+    index.ensure_built()
+    build_seconds = time.perf_counter() - start
+
+    # Arama penceresiyle aynı sonuç sınırı kullanılır
+    limit = config.SEARCH_SETTINGS['MAX_RESULTS']
+    latencies = []
+    for query in SEARCH_QUERIES:
+        query_start = time.perf_counter()
+        for _ in index.iter_search(query, limit):
+            pass
+        latencies.append(time.perf_counter() - query_start)
+
+    latencies.sort()
+    return _result(
+        sum(latencies), len(latencies),
+        index_build_seconds=build_seconds,
+        median_query_ms=latencies[len(latencies) // 2] * 1000,
+        max_query_ms=latencies[-1] * 1000,
+    )
+
+
+def bench_plan(workdir, count, seed):
+    from planner import Planner
+
+    config = _make_config(workdir)
+    file_manager = _make_file_manager(config)
+    base_dirs = config.BASE_DIRS
+    # Ağacın çoğu düzenlenmiş dosyalar; kalanı gelen kutusu, Old ve çöp
+    generate_corpus(base_dirs['FILES'] / 'Documents', count * 7 // 10, seed=seed, max_age_days=365)
+    generate_corpus(base_dirs['FILES'], count // 10, seed=seed + 1, collision_ratio=0)
+    generate_corpus(base_dirs['OLD'], count // 10, seed=seed + 2, collision_ratio=0, max_age_days=365)
+    generate_corpus(base_dirs['TRASH'], count // 10, seed=seed + 3, collision_ratio=0)
+    try:
+        start = time.perf_counter()
+        plan = Planner(file_manager).build()
+        return _result(
+            time.perf_counter() - start, plan.entries,
+            actions=len(plan.items), vectorized=plan.vectorized,
+        )
+    finally:
+        file_manager.close()
+
+
+BENCHMARKS = {
+    'categorize': bench_categorize,
+    'move_to_category': bench_move_to_category,
+    'unique_filename': bench_unique_filename,
+    'compress_old_files': bench_compress_old_files,
+    'clean_trash': bench_clean_trash,
+    'search': bench_search,
+    'plan': bench_plan,
+}
+
+
+def run_suite(names, sizes, seed):
+    results = []
+    for size in sizes:
+        for name in names:
+            with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as workdir:
+                result = BENCHMARKS[name](workdir, size, seed)
+            result.update(benchmark=name, files=size)
+            results.append(result)
+            print(f"{name:>20} {size:>9,} files: {result['seconds']:8.2f}s "
+                  f"({result['ops_per_sec']:,.0f} ops/s)", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Temel çizgiye göre ops/s'si tolerance'tan fazla düşen ölçümleri döndürür"""
+    previous = {(row['benchmark'], row['files']): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        old = previous.get((row['benchmark'], row['files']))
+        if old and old['ops_per_sec'] and row['ops_per_sec'] < old['ops_per_sec'] * (1 - tolerance):
+            regressions.append((row, old))
+    return regressions
+
+
+def run_benchmarks(args):
+    # Dosya başına log kaydı gerçek maliyetin parçasıdır; geçici bir dosyaya yazılır
+    log_dir = tempfile.mkdtemp(prefix='organizer_bench_log_')
+    setup_logging(os.path.join(log_dir, 'bench.jsonl'), Config(load=False).LOG_SETTINGS)
+
+    names = args.only or list(BENCHMARKS)
+    results = run_suite(names, args.sizes, args.seed)
+    report = {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for row, old in regressions:
+            print(f"REGRESSION: {row['benchmark']} @ {row['files']:,} files: "
+                  f"{row['ops_per_sec']:,.0f} ops/s vs {old['ops_per_sec']:,.0f} ops/s baseline")
+        if regressions:
+            return 1
+    return 0
+
+
+def bench_fold(lengths=(10, 20, 40, 80, 160, 320)):
+    """fold_text maliyetini dosya adı uzunluğuna göre ölçer (önbelleksiz)"""
+    fold = fold_text.__wrapped__
+    results = []
+    for length in lengths:
+        name = (TR_SAMPLE * (length // len(TR_SAMPLE) + 1))[:length] + '.pdf'
+        seconds = _timeit(fold, name)
+        results.append({
+            'length': length,
+            'us_per_name': seconds * 1e6,
+            'ns_per_char': seconds * 1e9 / len(name),
+        })
+    return results
+
+
+def run_fold(args):
+    results = bench_fold()
+    for row in results:
+        print(f"fold len={row['length']:>4}: {row['us_per_name']:8.2f} us/name, "
+              f"{row['ns_per_char']:7.1f} ns/char")
+
+    # Karakter başına maliyet uzunluktan bağımsız kalmalı (doğrusal zaman)
+    ratio = results[-1]['ns_per_char'] / results[0]['ns_per_char']
+    print(f"ns/char ratio (longest/shortest): {ratio:.2f}")
+    if ratio > 3:
+        print("REGRESSION: fold cost grows faster than name length")
+        return 1
+    return 0
+
+
+def _header_for(pattern):
+    return bytes(random.randrange(256) if byte is None else byte for byte in pattern)
+
+
+def bench_classifier(directory, file_count, sniff_ratio=0.4, seed=1):
+    """
+    file_count dosyalık bir derlem oluşturur: sniff_ratio kadarı uzantısız
+    ya da şüpheli uzantılı (içerik okunur), kalanı bilinen uzantılı.
+    İki geçiş ölçülür; ikinci geçişte önbellek sayesinde hiç okuma olmamalı.
+    """
+    random.seed(seed)
+    config = Config(home_path=directory)
+    extensions = list(config.EXTENSION_MAP)
+    suspicious = ['', '.bin', '.dat', '.tmp']
+
+    paths = []
+    for i in range(file_count):
+        if random.random() < sniff_ratio:
+            offset, pattern, _, _ = random.choice(SIGNATURES)
+            data = bytes(offset) + _header_for(pattern) + b'\0' * 32
+            name = f'file_{i}{random.choice(suspicious)}'
+        else:
+            data = b'\0' * 16
+            name = f'file_{i}.{random.choice(extensions)}'
+        path = os.path.join(directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        paths.append(path)
+
+    classifier = FileClassifier(config.EXTENSION_MAP, config.CLASSIFIER_SETTINGS)
+    classifier.cache_size = file_count
+    results = []
+    for run in ('cold', 'cached'):
+        reads_before = classifier.reads
+        start = time.perf_counter()
+        for entry in os.scandir(directory):
+            classifier.classify(entry.path, entry.stat())
+        elapsed = time.perf_counter() - start
+        results.append({
+            'run': run,
+            'files': file_count,
+            'seconds': elapsed,
+            'files_per_sec': file_count / elapsed if elapsed > 0 else 0.0,
+            'header_reads': classifier.reads - reads_before,
+        })
+
+    # Karşılaştırma için yalnızca uzantı eşlemesi
+    start = time.perf_counter()
+    for path in paths:
+        config.EXTENSION_MAP.get(os.path.splitext(path)[1][1:].lower(), 'Others')
+    elapsed = time.perf_counter() - start
+    results.append({
+        'run': 'extension-only',
+        'files': file_count,
+        'seconds': elapsed,
+        'files_per_sec': file_count / elapsed if elapsed > 0 else 0.0,
+        'header_reads': 0,
+    })
+    return results
+
+
+def run_classifier(args):
+    with tempfile.TemporaryDirectory() as directory:
+        results = bench_classifier(directory, args.files)
+    for row in results:
+        print(f"classify {row['run']:>14}: {row['files']} files in {row['seconds']:.2f}s "
+              f"({row['files_per_sec']:,.0f} files/s, {row['header_reads']} header reads)")
+
+    if results[1]['header_reads']:
+        print("REGRESSION: cached pass read file headers again")
+        return 1
+    return 0
+
+
+class _FakeStat:
+    __slots__ = ('st_size', 'st_mtime')
+
+    def __init__(self, size, mtime):
+        self.st_size = size
+        self.st_mtime = mtime
+
+
+def _synthetic_rules(count, rng):
+    """Uzantı, glob, regex ve boyut/yaş koşullarının karışımı"""
+    rules = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            rule = {'extensions': [f'x{i}', rng.choice(EXTENSIONS) or 'bin']}
+        elif kind == 1:
+            rule = {'glob': f'{rng.choice(ASCII_WORDS)}_{i}_*'}
+        elif kind == 2:
+            rule = {'regex': rf'(?:{rng.choice(ASCII_WORDS)}|scan)_\d{{4}}_{i}\b'}
+        else:
+            rule = {'extensions': [rng.choice(EXTENSIONS) or 'bin'], 'min_size': rng.randint(1, 1 << 20),
+                    'max_age_days': rng.randint(1, 365)}
+        rule['destination'] = f'Rules/{i}/{{year}}'
+        rules.append(rule)
+    return rules
+
+
+def _linear_match(engine, facts_args):
+    """Derlenmiş yapı olmadan her kuralı sırayla deneyen referans değerlendirme"""
+    from rules import _FileFacts
+    facts = _FileFacts(*facts_args)
+    for rule in engine.rules:
+        if rule.extensions is not None and facts.ext not in rule.extensions:
+            continue
+        if rule.name_regex is not None and not rule.name_regex.match(facts.name):
+            continue
+        if rule.check(facts):
+            return rule
+    return None
+
+
+def bench_rules(rule_counts, file_count, seed=0):
+    rng = random.Random(seed)
+    now = time.time()
+    files = []
+    for i in range(file_count):
+        ext = rng.choice(EXTENSIONS)
+        stem = f'{rng.choice(ASCII_WORDS)}_{rng.randrange(max(rule_counts))}_{i}'
+        name = f'{stem}.{ext}' if ext else stem
+        files.append((f'/data/in/{name}', _FakeStat(rng.randint(0, 1 << 21), now - rng.uniform(0, 400 * 86400))))
+
+    config = Config(home_path=tempfile.gettempdir())
+    extension_map = config.EXTENSION_MAP
+    start = time.perf_counter()
+    for path, _ in files:
+        extension_map.get(os.path.splitext(path)[1][1:].lower(), 'Others')
+    baseline = file_count / (time.perf_counter() - start)
+
+    results = []
+    for count in rule_counts:
+        engine = RuleEngine(_synthetic_rules(count, rng))
+        start = time.perf_counter()
+        matched = sum(1 for path, st in files if engine.match(path, st, None, now)[0] is not None)
+        compiled = file_count / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for path, st in files:
+            _linear_match(engine, (path, st, None, now))
+        linear = file_count / (time.perf_counter() - start)
+
+        results.append({
+            'rules': count,
+            'files': file_count,
+            'matched': matched,
+            'compiled_files_per_sec': compiled,
+            'linear_files_per_sec': linear,
+            'extension_map_files_per_sec': baseline,
+        })
+    return results
+
+
+def run_rules(args):
+    results = bench_rules(args.rules, args.files)
+    for row in results:
+        print(f"rules={row['rules']:>5}: compiled {row['compiled_files_per_sec']:>10,.0f} files/s, "
+              f"linear {row['linear_files_per_sec']:>10,.0f} files/s, "
+              f"extension map {row['extension_map_files_per_sec']:>12,.0f} files/s "
+              f"({row['matched']} matched)")
+
+    # Kural sayısı arttıkça derlenmiş değerlendirme maliyeti düz kalmalı
+    ratio = results[0]['compiled_files_per_sec'] / results[-1]['compiled_files_per_sec']
+    print(f"throughput ratio (fewest/most rules): {ratio:.2f}")
+    if len(results) > 1 and ratio > 3:
+        print("REGRESSION: rule evaluation cost grows with rule count")
+        return 1
+    return 0
+
+
+def _wait_for(predicate, timeout, interval=0.005):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = predicate()
+        if value:
+            return value
+        time.sleep(interval)
+    return None
+
+
+def _read_status(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def bench_startup(workdir, backlog_files, settle, seed=0, timeout=120):
+    """
+    daemon.py'yi ayrı bir süreçte soğuk başlatır. Files'ta backlog_files
+    kadar birikmiş dosya varken izlemenin başlama süresini ve hazır olunca
+    bırakılan dosyanın düzenlenme süresini ölçer; ikincisi birikmiş işin
+    izleyiciyi bekletmediğini gösterir.
+    """
+    config = Config(home_path=workdir, load=False)
+    with open(config.CONFIG_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            'RESOURCE_LIMITS': {'MAX_CPU': 100, 'MAX_RAM': 100},
+            'WATCHER_SETTINGS': {'SETTLE_SECONDS': settle, 'POLL_INTERVAL': 0.05},
+        }, f)
+    files_dir = config.BASE_DIRS['FILES']
+    files_dir.mkdir(parents=True, exist_ok=True)
+    generate_corpus(str(files_dir), backlog_files, seed=seed)
+
+    daemon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'daemon.py')
+    spawned = time.time()
+    process = subprocess.Popen([sys.executable, daemon_path, '--home', str(workdir)])
+    try:
+        status = _wait_for(
+            lambda: (_read_status(config.DAEMON_STATUS_PATH) or {}).get('ready') and
+            _read_status(config.DAEMON_STATUS_PATH), timeout
+        )
+        if status is None:
+            raise RuntimeError('daemon did not become ready')
+
+        probe = files_dir / 'startup_probe.pdf'
+        probe.write_bytes(b'%PDF-1.4 startup probe')
+        dropped = time.time()
+        if not _wait_for(lambda: not probe.exists(), timeout):
+            raise RuntimeError('probe file was not organized')
+        handled = time.time()
+
+        status = _wait_for(
+            lambda: (_read_status(config.DAEMON_STATUS_PATH) or {}).get('backlog_done') and
+            _read_status(config.DAEMON_STATUS_PATH), timeout, interval=0.05
+        ) or status
+    finally:
+        process.send_signal(signal.SIGTERM if hasattr(signal, 'SIGTERM') else signal.SIGINT)
+        process.wait(timeout=60)
+
+    return {
+        'backlog_files': backlog_files,
+        'settle_seconds': settle,
+        # Python yorumlayıcısının açılışı dahil, süreç oluşturmadan itibaren
+        'ready_ms': (status['ready'] - spawned) * 1000,
+        'imports_ms': (status['imported'] - status['started']) * 1000,
+        'first_event_ms': (handled - spawned) * 1000,
+        'event_ms': (handled - dropped) * 1000,
+        'backlog_seconds': status['backlog_done'] - status['ready'] if 'backlog_done' in status else None,
+    }
+
+
+def run_startup(args):
+    results = []
+    for backlog_files in args.backlog_files:
+        with tempfile.TemporaryDirectory() as workdir:
+            results.append(bench_startup(workdir, backlog_files, args.settle))
+    for row in results:
+        backlog = f"{row['backlog_seconds']:.2f}s" if row['backlog_seconds'] is not None else 'unfinished'
+        print(f"backlog={row['backlog_files']:>6}: ready {row['ready_ms']:7.0f} ms "
+              f"(imports {row['imports_ms']:.0f} ms), first event {row['first_event_ms']:7.0f} ms "
+              f"(dropped->organized {row['event_ms']:.0f} ms, settle {row['settle_seconds']}s), "
+              f"backlog {backlog}")
+    return 0
+
+
+def bench_cluster(workdir, instances, file_count, kill_one=False, seed=0, timeout=180):
+    """
+    Aynı paylaşımlı Files/Old/Trash ağacında eşgüdümlü instances kadar
+    daemon.py süreci başlatır, hepsi birbirini görünce file_count dosya
+    bırakır ve Files boşalana kadar geçen süreyi ölçer. kill_one ise bir
+    örnek bırakmanın hemen ardından SIGKILL ile öldürülür; payı kiranın
+    dolmasından sonra diğerlerine geçmelidir. Sonunda her dosyanın
+    kategorilerde tam bir kez bulunduğu doğrulanır.
+    """
+    shared = os.path.join(workdir, 'shared')
+    cluster_dir = os.path.join(shared, 'cluster')
+    files_dir = os.path.join(shared, 'Files')
+    settings = {
+        'BASE_DIRS': {'FILES': files_dir, 'OLD': os.path.join(shared, 'Old'), 'TRASH': os.path.join(shared, 'Trash')},
+        'RESOURCE_LIMITS': {'MAX_CPU': 100, 'MAX_RAM': 100},
+        'WATCHER_SETTINGS': {'SETTLE_SECONDS': 0.2, 'POLL_INTERVAL': 0.05, 'RECONCILE_INTERVAL': 2},
+        'COORDINATION_SETTINGS': {'ENABLED': True, 'DIR': cluster_dir, 'HEARTBEAT_INTERVAL': 0.5,
+                                  'LEASE_SECONDS': 3},
+        'DEDUP_SETTINGS': {'POLICY': 'off'},
+    }
+    daemon_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'daemon.py')
+    processes = []
+    try:
+        for number in range(instances):
+            home = os.path.join(workdir, f'instance{number}')
+            os.makedirs(home)
+            with open(Config(home_path=home, load=False).CONFIG_FILE, 'w', encoding='utf-8') as f:
+                json.dump(settings, f)
+            processes.append(subprocess.Popen([sys.executable, daemon_path, '--home', home]))
+
+        members_dir = os.path.join(cluster_dir, 'members')
+        if not _wait_for(lambda: os.path.isdir(members_dir) and len(os.listdir(members_dir)) >= instances,
+                         timeout, interval=0.05):
+            raise RuntimeError('instances did not join the cluster')
+        # Herkesin herkesi gördüğü bir kalp atışı beklenir
+        time.sleep(1.5)
+
+        rng = random.Random(seed)
+        names = [f'{rng.choice(ASCII_WORDS)}_{number}.{rng.choice(EXTENSIONS)}' for number in range(file_count)]
+        start = time.time()
+        for name in names:
+            with open(os.path.join(files_dir, name), 'wb') as f:
+                f.write(name.encode())
+        if kill_one:
+            processes[-1].kill()
+
+        def settled():
+            with os.scandir(files_dir) as entries:
+                return not any(entry.is_file() for entry in entries)
+
+        if not _wait_for(settled, timeout, interval=0.05):
+            raise RuntimeError('files were not organized in time')
+        elapsed = time.time() - start
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM if hasattr(signal, 'SIGTERM') else signal.SIGINT)
+        for process in processes:
+            process.wait(timeout=60)
+
+    organized = {}
+    for category in os.listdir(files_dir):
+        category_dir = os.path.join(files_dir, category)
+        if os.path.isdir(category_dir):
+            for root, _, files in os.walk(category_dir):
+                for name in files:
+                    organized[name] = organized.get(name, 0) + 1
+    lost = [name for name in names if name not in organized]
+    duplicated = [name for name, count in organized.items() if count > 1]
+    return {
+        'instances': instances,
+        'files': file_count,
+        'killed': kill_one,
+        'seconds': elapsed,
+        'files_per_sec': file_count / elapsed,
+        'lost': len(lost),
+        'duplicated': len(duplicated),
+    }
+
+
+def run_cluster(args):
+    failed = False
+    for instances in args.instances:
+        with tempfile.TemporaryDirectory() as workdir:
+            row = bench_cluster(workdir, instances, args.files, kill_one=args.kill_one and instances > 1)
+        failed |= bool(row['lost'] or row['duplicated'])
+        print(f"instances={row['instances']}: {row['files']} files in {row['seconds']:.2f}s "
+              f"({row['files_per_sec']:.0f} files/s){' one killed' if row['killed'] else ''}, "
+              f"lost {row['lost']}, duplicated {row['duplicated']}")
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Smart File Organizer benchmarks')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    run_parser = subparsers.add_parser('run', help='hot-path suite on synthetic trees')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                            help='file counts, e.g. 1000 10000 100000 1000000')
+    run_parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS))
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--output', help='write machine-readable results (JSON)')
+    run_parser.add_argument('--baseline', help='previous JSON results to compare against')
+    run_parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='allowed ops/s drop vs. baseline before failing')
+
+    subparsers.add_parser('fold', help='fold_text cost vs. name length')
+
+    classifier_parser = subparsers.add_parser('classifier', help='content sniffing classifier')
+    classifier_parser.add_argument('--files', type=int, default=100000)
+
+    rules_parser = subparsers.add_parser('rules', help='rule engine vs. extension map')
+    rules_parser.add_argument('--rules', type=int, nargs='+', default=[10, 100, 500])
+    rules_parser.add_argument('--files', type=int, default=100000)
+
+    startup_parser = subparsers.add_parser('startup', help='daemon cold start to first event')
+    startup_parser.add_argument('--backlog-files', type=int, nargs='+', default=[0, 5000])
+    startup_parser.add_argument('--settle', type=float, default=0.2)
+
+    cluster_parser = subparsers.add_parser('cluster', help='coordinated instances on one shared tree')
+    cluster_parser.add_argument('--instances', type=int, nargs='+', default=[1, 2, 4])
+    cluster_parser.add_argument('--files', type=int, default=2000)
+    cluster_parser.add_argument('--kill-one', action='store_true',
+                                help='SIGKILL one instance after the drop to exercise failover')
+
+    args = parser.parse_args()
+    runners = {
+        'run': run_benchmarks,
+        'fold': run_fold,
+        'classifier': run_classifier,
+        'rules': run_rules,
+        'startup': run_startup,
+        'cluster': run_cluster,
+    }
+    return runners[args.benchmark](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# classifier.py
+import os
+import threading
+from collections import OrderedDict
+
+_ANY = None
+_MATCH = 'match'
+
+
+def _pattern(*parts):
+    """Bayt dizilerini ve joker sayılarını tek bir desende birleştirir: _pattern(b'RIFF', 4, b'WAVE')"""
+    pattern = []
+    for part in parts:
+        pattern.extend([_ANY] * part if isinstance(part, int) else part)
+    return tuple(pattern)
+
+
+# (başlangıç ofseti, desen, tür, kategori); desendeki _ANY herhangi bir baytla eşleşir
+SIGNATURES = [
+    (0, _pattern(b'%PDF-'), 'pdf', 'Documents'),
+    (0, _pattern(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'), 'ole', 'Documents'),
+    (0, _pattern(b'PK\x03\x04', 26, b'[Content_Types].xml'), 'office', 'Documents'),
+    (0, _pattern(b'\x89PNG\r\n\x1a\n'), 'png', 'Images'),
+    (0, _pattern(b'\xff\xd8\xff'), 'jpg', 'Images'),
+    (0, _pattern(b'GIF87a'), 'gif', 'Images'),
+    (0, _pattern(b'GIF89a'), 'gif', 'Images'),
+    (0, _pattern(b'II*\x00'), 'tiff', 'Images'),
+    (0, _pattern(b'MM\x00*'), 'tiff', 'Images'),
+    (0, _pattern(b'RIFF', 4, b'WEBP'), 'webp', 'Images'),
+    (0, _pattern(b'\x1aE\xdf\xa3'), 'mkv', 'Videos'),
+    (0, _pattern(b'FLV\x01'), 'flv', 'Videos'),
+    (0, _pattern(b'0&\xb2u\x8ef\xcf\x11'), 'asf', 'Videos'),
+    (0, _pattern(b'RIFF', 4, b'AVI '), 'avi', 'Videos'),
+    (4, _pattern(b'ftyp'), 'mp4', 'Videos'),
+    (4, _pattern(b'ftypM4A'), 'm4a', 'Music'),
+    (0, _pattern(b'ID3'), 'mp3', 'Music'),
+    (0, _pattern(b'fLaC'), 'flac', 'Music'),
+    (0, _pattern(b'OggS'), 'ogg', 'Music'),
+    (0, _pattern(b'RIFF', 4, b'WAVE'), 'wav', 'Music'),
+    (0, _pattern(b'PK\x03\x04'), 'zip', 'Compressed'),
+    (0, _pattern(b'Rar!\x1a\x07'), 'rar', 'Compressed'),
+    (0, _pattern(b"7z\xbc\xaf'\x1c"), '7z', 'Compressed'),
+    (0, _pattern(b'\x1f\x8b'), 'gz', 'Compressed'),
+    (0, _pattern(b'MZ'), 'exe', 'Setups'),
+]
+
+
+def compile_signatures(signatures):
+    """
+    İmzaları ofset başına bir bayt trie'sine derler. En uzun (en özgül)
+    eşleşme kazanır; örn. Office belgeleri düz zip'ten önce gelir.
+    """
+    tries = {}
+    for offset, pattern, kind, category in signatures:
+        node = tries.setdefault(offset, {})
+        for byte in pattern:
+            node = node.setdefault(byte, {})
+        node[_MATCH] = (kind, category, len(pattern))
+    return tries
+
+
+def _walk(node, data, position, best):
+    match = node.get(_MATCH)
+    if match is not None and (best is None or match[2] > best[2]):
+        best = match
+    if position >= len(data):
+        return best
+    child = node.get(data[position])
+    if child is not None:
+        best = _walk(child, data, position + 1, best)
+    child = node.get(_ANY)
+    if child is not None:
+        best = _walk(child, data, position + 1, best)
+    return best
+
+
+class FileClassifier:
+    """
+    Dosyaları kategoriye ayırır. Hızlı yol uzantı eşlemesidir; uzantı
+    bilinmiyorsa ya da şüpheliyse dosyanın ilk baytları okunup imza
+    trie'si ile eşlenir. Sonuçlar (aygıt, inode, boyut, mtime) anahtarıyla
+    önbelleklenir, böylece aynı dosya ikinci kez okunmaz.
+    """
+
+    def __init__(self, extension_map, settings):
+        self.extension_map = extension_map
+        self.enabled = settings['ENABLED']
+        self.header_bytes = settings['HEADER_BYTES']
+        self.cache_size = settings['CACHE_SIZE']
+        self.suspicious = frozenset(settings['SUSPICIOUS_EXTENSIONS'])
+        self._tries = compile_signatures(SIGNATURES)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.reads = 0
+
+    def classify(self, path, st=None):
+        ext = os.path.splitext(path)[1][1:].lower()
+        category = self.extension_map.get(ext)
+        if category is not None and ext not in self.suspicious:
+            return category
+
+        if self.enabled:
+            sniffed = self.sniff(path, st)
+            if sniffed is not None:
+                return sniffed[1]
+        return category or 'Others'
+
+    def sniff(self, path, st=None):
+        """(tür, kategori) ya da tanınmıyorsa None döndürür"""
+        try:
+            if st is None:
+                st = os.stat(path)
+        except OSError:
+            return None
+
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        result = self.match(self._read_header(path))
+
+        with self._lock:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def match(self, header):
+        best = None
+        for offset, trie in self._tries.items():
+            if len(header) > offset:
+                best = _walk(trie, header[offset:], 0, best)
+        return best[:2] if best else None
+
+    def _read_header(self, path):
+        try:
+            # Tamponsuz okuma: yalnızca başlık kadar bayt istenir
+            with open(path, 'rb', buffering=0) as f:
+                self.reads += 1
+                return f.read(self.header_bytes)
+        except OSError:
+            return b''
@@ -0,0 +1,336 @@
+# compression.py
+import os
+import bz2
+import time
+import zlib
+import zipfile
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+import metrics
+
+READ_CHUNK = 1024 * 1024
+
+COMPRESSION_METHODS = {
+    'stored': zipfile.ZIP_STORED,
+    'deflate': zipfile.ZIP_DEFLATED,
+    'bzip2': zipfile.ZIP_BZIP2,
+    'lzma': zipfile.ZIP_LZMA,
+}
+
+# zipfile'ın LZMA üyelerinde kullandığı "EOS işaretçisi var" bayrağı
+_LZMA_EOS_FLAG = 0x02
+
+# ZIP'in DOS tarih alanının gösterebildiği aralık
+_ZIP_MIN_DATE = (1980, 1, 1, 0, 0, 0)
+_ZIP_MAX_DATE = (2107, 12, 31, 23, 59, 59)
+
+
+def is_archive_name(name):
+    return name.startswith('Archived_') and name.lower().endswith(('.zip', '.rar'))
+
+
+def _make_compressor(compress_type, level):
+    if compress_type == zipfile.ZIP_DEFLATED:
+        return zlib.compressobj(level, zlib.DEFLATED, -15)
+    if compress_type == zipfile.ZIP_BZIP2:
+        return bz2.BZ2Compressor(level)
+    if compress_type == zipfile.ZIP_LZMA:
+        return zipfile.LZMACompressor()
+    raise ValueError(f"Unsupported compression type: {compress_type}")
+
+
+def _zip_date_time(mtime):
+    """mtime'ı ZIP'in gösterebildiği aralığa sıkıştırır (strict_timestamps=False gibi)"""
+    return min(max(time.localtime(mtime)[:6], _ZIP_MIN_DATE), _ZIP_MAX_DATE)
+
+
+def compress_file(path, compress_type, level):
+    """
+    Dosyayı zip üyesi biçiminde sıkıştırır (işçi süreçte çalışır).
+    (boyut, crc, sıkıştırılmış veri) döndürür.
+    """
+    compressor = _make_compressor(compress_type, level)
+    crc = 0
+    size = 0
+    chunks = []
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            chunks.append(compressor.compress(chunk))
+    chunks.append(compressor.flush())
+    return size, crc, b''.join(chunks)
+
+
+class Candidate:
+    __slots__ = ('path', 'name', 'size', 'mtime_ns', 'mtime')
+
+    def __init__(self, path, size, mtime_ns):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.mtime = mtime_ns / 1e9
+
+
+class RotatingArchiveWriter:
+    """
+    Sıkıştırılmış üyeleri tek bir yazıcıdan sırayla arşive ekler. Arşiv
+    boyut ya da üye sınırına ulaşınca kapatılır, doğrulanır ve yenisi açılır.
+    Kapatılan arşivdeki her üyenin CRC'si okunarak doğrulandıktan sonra
+    kaynak dosya silinir. on_archive(yol, ZipInfo listesi) her kapatılan
+    arşiv için çağrılır (arşiv kataloğu).
+    """
+
+    def __init__(self, directory, compress_type, level, max_bytes, max_members, on_archive=None):
+        self.directory = directory
+        self.compress_type = compress_type
+        self.level = level
+        self.max_bytes = max_bytes
+        self.max_members = max_members
+        self.on_archive = on_archive
+        self.archives = []
+        self.removed_bytes = 0
+        self.removed_files = 0
+        self._zip = None
+        self._path = None
+        self._members = []
+        self._sequence = 0
+        self._timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    def _open(self):
+        while True:
+            self._sequence += 1
+            path = self.directory / f'Archived_{self._timestamp}_{self._sequence:03d}.zip'
+            try:
+                # 'x': mevcut bir arşive asla eklenmez. 1980 öncesi mtime'lar
+                # hata vermek yerine ZIP'in en erken tarihine çekilir
+                self._zip = zipfile.ZipFile(path, 'x', allowZip64=True, strict_timestamps=False)
+                break
+            except FileExistsError:
+                continue
+        self._path = path
+        self._members = []
+        self.archives.append(path)
+
+    def _rotate_if_full(self):
+        if self._zip is None:
+            self._open()
+        elif (len(self._members) >= self.max_members
+              or self._zip.fp.tell() >= self.max_bytes):
+            self._close_and_verify()
+            self._open()
+
+    def add_compressed(self, candidate, size, crc, data):
+        """İşçide sıkıştırılmış veriyi yeniden sıkıştırmadan üye olarak yazar"""
+        if size != candidate.size:
+            logging.error(f"File changed while compressing, skipped: {candidate.name}")
+            return
+        if len(data) >= size:
+            # Sıkışmayan veriler (jpg, zip...) saklanarak yazılır
+            self.add_file(candidate, compress_type=zipfile.ZIP_STORED)
+            return
+
+        self._rotate_if_full()
+        zinfo = zipfile.ZipInfo(candidate.name, _zip_date_time(candidate.mtime))
+        zinfo.compress_type = self.compress_type
+        zinfo.file_size = size
+        zinfo.compress_size = len(data)
+        zinfo.CRC = crc
+        zinfo.external_attr = 0o600 << 16
+        if self.compress_type == zipfile.ZIP_LZMA:
+            zinfo.flag_bits |= _LZMA_EOS_FLAG
+
+        # zipfile hazır sıkıştırılmış veri için genel bir API sunmuyor;
+        # ZipFile.write'ın yaptığı gibi yerel başlık + veri yazılıp
+        # merkezi dizin kaydı eklenir
+        zipf = self._zip
+        zinfo.header_offset = zipf.fp.tell()
+        zipf.fp.write(zinfo.FileHeader(False))
+        zipf.fp.write(data)
+        zipf.filelist.append(zinfo)
+        zipf.NameToInfo[zinfo.filename] = zinfo
+        zipf.start_dir = zipf.fp.tell()
+        self._members.append((candidate, crc))
+
+    def add_file(self, candidate, compress_type=None):
+        """Büyük dosyaları parça parça okuyarak doğrudan arşive yazar"""
+        self._rotate_if_full()
+        compress_type = self.compress_type if compress_type is None else compress_type
+        self._zip.write(
+            candidate.path, arcname=candidate.name,
+            compress_type=compress_type, compresslevel=self.level
+        )
+        self._members.append((candidate, self._zip.getinfo(candidate.name).CRC))
+
+    def close(self):
+        if self._zip is not None:
+            self._close_and_verify()
+            self._zip = None
+
+    def _close_and_verify(self):
+        self._zip.close()
+        removed = set()
+        try:
+            with zipfile.ZipFile(self._path) as archive:
+                for candidate, crc in self._members:
+                    if self._verify_and_remove(archive, candidate, crc):
+                        removed.add(candidate.name)
+        except (OSError, zipfile.BadZipFile) as e:
+            logging.error(f"Archive verification failed, sources kept: {self._path} - {e}")
+            return
+        if self.on_archive is not None:
+            # Merkezi dizin yazıcının belleğinde; arşiv yeniden okunmaz. Kaynağı
+            # yerinde kalan üyeler kataloğa girmez, aramada iki kez çıkmasınlar
+            infos = [info for info in self._zip.infolist() if info.filename in removed]
+            self.on_archive(self._path, infos)
+
+    def _verify_and_remove(self, archive, candidate, crc):
+        """Üye doğrulanıp kaynak silindiyse True döndürür"""
+        try:
+            info = archive.getinfo(candidate.name)
+            if info.CRC != crc or info.file_size != candidate.size:
+                raise zipfile.BadZipFile('CRC/size mismatch')
+            # Tam okuma, zipfile'ın veri CRC kontrolünü tetikler
+            with archive.open(info) as member:
+                while member.read(READ_CHUNK):
+                    pass
+
+            st = os.stat(candidate.path)
+            if st.st_size != candidate.size or st.st_mtime_ns != candidate.mtime_ns:
+                logging.warning(f"File changed after archiving, kept: {candidate.name}")
+                return False
+            os.unlink(candidate.path)
+            self.removed_bytes += candidate.size
+            self.removed_files += 1
+            logging.info(f"Compressed and removed: {candidate.name}")
+            return True
+        except (OSError, KeyError, zipfile.BadZipFile) as e:
+            logging.error(f"Error compressing {candidate.name}: {e}")
+            return False
+
+
+class CompressionEngine:
+    """
+    Old dizinindeki eski dosyaları arşivler: tek bir os.scandir geçişiyle
+    adaylar seçilir, dosyalar süreç havuzunda paralel sıkıştırılır ve tek
+    bir yazıcı bunları dönen (rotating) arşivlere yazar.
+    """
+
+    def __init__(self, settings, governor, on_archive=None):
+        self.governor = governor
+        self.on_archive = on_archive
+        self.compress_type = COMPRESSION_METHODS[settings['METHOD']]
+        self.level = settings['LEVEL']
+        self.max_workers = settings['MAX_WORKERS']
+        self.max_archive_bytes = settings['MAX_ARCHIVE_MB'] * 1024 * 1024
+        self.max_archive_files = settings['MAX_ARCHIVE_FILES']
+        self.parallel_max_bytes = settings['PARALLEL_MAX_MB'] * 1024 * 1024
+
+    def find_candidates(self, directory, days_threshold):
+        cutoff = time.time() - days_threshold * 86400
+        candidates = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if is_archive_name(entry.name):
+                    continue
+                try:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if st.st_mtime < cutoff:
+                    candidates.append(Candidate(entry.path, st.st_size, st.st_mtime_ns))
+        return candidates
+
+    def compress_directory(self, directory, days_threshold):
+        return self.compress_candidates(directory, self.find_candidates(directory, days_threshold))
+
+    def compress_candidates(self, directory, candidates):
+        """Verilen adayları (ör. onaylanmış bir plandan) directory'deki yeni arşivlere yazar"""
+        start = time.perf_counter()
+        if not candidates:
+            logging.info("No files to compress in Old folder.")
+            return []
+
+        writer = RotatingArchiveWriter(
+            directory, self.compress_type, self.level,
+            self.max_archive_bytes, self.max_archive_files, self.on_archive
+        )
+        try:
+            if self.compress_type == zipfile.ZIP_STORED:
+                for candidate in candidates:
+                    self.governor.acquire()
+                    self._add(writer.add_file, candidate)
+            else:
+                self._compress_parallel(candidates, writer)
+        finally:
+            writer.close()
+
+        elapsed = time.perf_counter() - start
+        archived_bytes = sum(path.stat().st_size for path in writer.archives if path.exists())
+        mb_per_sec = writer.removed_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+        ratio = archived_bytes / writer.removed_bytes if writer.removed_bytes else 0.0
+        metrics.inc('compressed_files_total', writer.removed_files)
+        metrics.inc('compressed_input_bytes_total', writer.removed_bytes)
+        metrics.inc('compressed_archive_bytes_total', archived_bytes)
+        if writer.removed_bytes:
+            metrics.set_gauge('compression_ratio', ratio)
+        logging.info(
+            f"Compression completed: {writer.removed_files} files, "
+            f"{writer.removed_bytes / (1024 * 1024):.1f} MB in {elapsed:.1f}s "
+            f"({mb_per_sec:.1f} MB/s, ratio {ratio:.2f}). "
+            f"Archives: {', '.join(path.name for path in writer.archives)}",
+            extra={
+                'op': 'compress', 'path': directory, 'count': writer.removed_files,
+                'bytes': writer.removed_bytes, 'duration': elapsed,
+            }
+        )
+        return writer.archives
+
+    def _compress_parallel(self, candidates, writer):
+        small = [c for c in candidates if c.size <= self.parallel_max_bytes]
+        large = [c for c in candidates if c.size > self.parallel_max_bytes]
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            queue = deque(small)
+            in_flight = {}
+            # Bellekte bekleyen sıkıştırılmış veri sınırlı tutulur
+            limit = self.max_workers * 2
+            while queue or in_flight:
+                while queue and len(in_flight) < limit:
+                    candidate = queue.popleft()
+                    self.governor.acquire()
+                    future = pool.submit(compress_file, candidate.path, self.compress_type, self.level)
+                    in_flight[future] = candidate
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    candidate = in_flight.pop(future)
+                    try:
+                        size, crc, data = future.result()
+                    except Exception as e:
+                        logging.error(f"Error compressing {candidate.name}: {e}")
+                        continue
+                    self._add(writer.add_compressed, candidate, size, crc, data)
+
+        # Büyük dosyalar yazıcıda akış halinde sıkıştırılır
+        for candidate in large:
+            self.governor.acquire()
+            self._add(writer.add_file, candidate)
+
+    @staticmethod
+    def _add(write, candidate, *args):
+        # Yazma hatası (disk dolu, arşiv kaldırıldı) yalnızca bu adayı atlar;
+        # kaynak yerinde kalır, kalan adaylar işlenmeye devam eder
+        try:
+            write(candidate, *args)
+        except (OSError, ValueError) as e:
+            logging.error(f"Error compressing {candidate.name}, source kept: {e}")
@@ -1,25 +1,314 @@
 # config.py
 import os
+import json
+import threading
+import logging
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+
+from rules import RuleEngine
+
+
+class ConfigError(ValueError):
+    pass
+
+
+# Ayar dosyasında yalnızca bu değerlerden biri kabul edilir
+SETTING_CHOICES = {
+    ('COMPRESSION_SETTINGS', 'METHOD'): ('stored', 'deflate', 'bzip2', 'lzma'),
+    ('DEDUP_SETTINGS', 'POLICY'): ('off', 'hardlink', 'trash'),
+    ('LOG_SETTINGS', 'LEVEL'): ('DEBUG', 'INFO', 'WARNING', 'ERROR'),
+    ('TRANSFER_SETTINGS', 'VERIFY'): ('size', 'hash'),
+}
+
+# Sayısal ayarların geçerli aralığı (en az, en çok; None: sınırsız). Burada
+# olmayan sayısal ayarlar negatif olamaz
+SETTING_RANGES = {
+    ('RESOURCE_LIMITS', 'MAX_CPU'): (1, 100),
+    ('RESOURCE_LIMITS', 'MAX_RAM'): (1, 100),
+    ('GOVERNOR_SETTINGS', 'SAMPLE_INTERVAL'): (0.1, None),
+    ('GOVERNOR_SETTINGS', 'SMOOTHING'): (0.01, 1),
+    ('GOVERNOR_SETTINGS', 'THROTTLE_START'): (0, 0.99),
+    ('GOVERNOR_SETTINGS', 'MAX_OPS_PER_SEC'): (1, None),
+    ('GOVERNOR_SETTINGS', 'MIN_OPS_PER_SEC'): (0.1, None),
+    ('SEARCH_SETTINGS', 'MAX_RESULTS'): (1, None),
+    ('SEARCH_SETTINGS', 'BATCH_SIZE'): (1, None),
+    ('WATCHER_SETTINGS', 'MAX_WORKERS'): (1, None),
+    ('WATCHER_SETTINGS', 'POLL_INTERVAL'): (0.05, None),
+    ('WATCHER_SETTINGS', 'BATCH_SIZE'): (1, None),
+    ('WATCHER_SETTINGS', 'RECONCILE_INTERVAL'): (1, None),
+    ('COMPRESSION_SETTINGS', 'LEVEL'): (1, 9),
+    ('COMPRESSION_SETTINGS', 'MAX_WORKERS'): (1, None),
+    ('COMPRESSION_SETTINGS', 'MAX_ARCHIVE_MB'): (1, None),
+    ('COMPRESSION_SETTINGS', 'MAX_ARCHIVE_FILES'): (1, None),
+    ('TRANSFER_SETTINGS', 'MAX_TRANSFERS'): (1, None),
+    ('TRANSFER_SETTINGS', 'CHUNK_MB'): (1, None),
+    ('LIFECYCLE_SETTINGS', 'SCAN_INTERVAL'): (1, None),
+    ('LIFECYCLE_SETTINGS', 'BATCH_SIZE'): (1, None),
+    ('COORDINATION_SETTINGS', 'HEARTBEAT_INTERVAL'): (1, None),
+    ('COORDINATION_SETTINGS', 'LEASE_SECONDS'): (2, None),
+    ('COORDINATION_SETTINGS', 'VIRTUAL_NODES'): (1, None),
+    ('PLANNER_SETTINGS', 'BATCH_SIZE'): (1, None),
+    ('PLANNER_SETTINGS', 'MAX_DEVICES'): (1, None),
+    ('DEDUP_SETTINGS', 'PARTIAL_BYTES'): (1, None),
+    ('JOURNAL_SETTINGS', 'FSYNC_INTERVAL'): (0.01, None),
+    ('JOURNAL_SETTINGS', 'FSYNC_BATCH'): (1, None),
+    ('JOURNAL_SETTINGS', 'MAX_MB'): (1, None),
+    ('JOURNAL_SETTINGS', 'KEEP_BATCHES'): (1, None),
+    ('JOURNAL_SETTINGS', 'SESSION_IDLE_SECONDS'): (1, None),
+    ('JOURNAL_SETTINGS', 'SESSION_MAX_SECONDS'): (1, None),
+    ('JOURNAL_SETTINGS', 'SESSION_MAX_MOVES'): (1, None),
+    ('TRASH_SETTINGS', 'BATCH_SIZE'): (1, None),
+    ('TRASH_SETTINGS', 'CHECK_INTERVAL'): (1, None),
+    ('CLASSIFIER_SETTINGS', 'HEADER_BYTES'): (1, None),
+    ('DAEMON_SETTINGS', 'BACKLOG_NICE'): (-20, 19),
+    ('LOG_SETTINGS', 'MAX_MB'): (1, None),
+    ('METRICS_SETTINGS', 'HTTP_PORT'): (0, 65535),
+}
+
+# Alt anahtarları varsayılanlarla aynı türde olması gereken ayar sözlükleri
+SETTINGS_SECTIONS = (
+    'RESOURCE_LIMITS', 'GOVERNOR_SETTINGS', 'SEARCH_SETTINGS', 'WATCHER_SETTINGS',
+    'COMPRESSION_SETTINGS', 'DEDUP_SETTINGS', 'JOURNAL_SETTINGS', 'TRASH_SETTINGS',
+    'CLASSIFIER_SETTINGS', 'DAEMON_SETTINGS', 'LOG_SETTINGS', 'METRICS_SETTINGS',
+    'TRANSFER_SETTINGS', 'LIFECYCLE_SETTINGS', 'COORDINATION_SETTINGS', 'PLANNER_SETTINGS',
+)
+
+
+@lru_cache(maxsize=8)
+def _extension_map(categories):
+    # Aynı kategori tanımı için tüm anlık görüntüler tek bir eşlemeyi paylaşır
+    return MappingProxyType({
+        ext: category
+        for category, extensions in categories
+        for ext in extensions
+    })
+
+
+@lru_cache(maxsize=8)
+def _rule_engine(rules_json):
+    return RuleEngine(json.loads(rules_json))
+
+
+def _is_type_of(value, default):
+    if isinstance(default, bool):
+        return isinstance(value, bool)
+    if isinstance(default, (int, float)):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if isinstance(default, list):
+        return isinstance(value, list) and all(isinstance(item, str) for item in value)
+    return isinstance(value, type(default))
+
+
+def setting_range(key, name):
+    """Sayısal ayarın geçerli aralığı (en az, en çok; None: sınırsız)"""
+    return SETTING_RANGES.get((key, name), (0, None))
+
+
+def _in_range(value, key, name):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return True
+    low, high = setting_range(key, name)
+    return value >= low and (high is None or value <= high)
+
+
+def _range_text(key, name):
+    low, high = setting_range(key, name)
+    return f"between {low} and {high}" if high is not None else f"at least {low}"
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
 
 class Config:
-    def __init__(self):
-        # Dinamik path tanımları
-        self.HOME_PATH = Path.home()
+    def __init__(self, home_path=None, load=True):
+        # Dinamik path tanımları (home_path: testler/benchmark için farklı kök)
+        self.HOME_PATH = Path(home_path) if home_path else Path.home()
         self.DESKTOP_PATH = self.HOME_PATH / 'Desktop'
-        
+        self.CONFIG_FILE = self.HOME_PATH / '.file_organizer_config.json'
+
+        # Uygulama durum dosyaları ve günlük izlenen dizinlerin dışında tutulur
+        self.DATA_DIR = self.HOME_PATH / '.file_organizer'
+
         # Ana dizinler
         self.BASE_DIRS = {
             'OLD': self.DESKTOP_PATH / 'Old',
             'TRASH': self.DESKTOP_PATH / 'Trash', 
             'FILES': self.DESKTOP_PATH / 'Files',
-            'LOG': self.DESKTOP_PATH / 'Files' / 'FileOrganizer_Log.txt' 
+            'LOG': self.DATA_DIR / 'logs' / 'organizer.jsonl'
         }
 
+        self.INDEX_PATH = self.DATA_DIR / 'file_index.db'
+        self.DEDUP_PATH = self.DATA_DIR / 'dedup.db'
+        self.JOURNAL_PATH = self.DATA_DIR / 'journal.jsonl'
+        self.TRASH_INDEX_PATH = self.DATA_DIR / 'trash.db'
+        self.CHECKPOINT_PATH = self.DATA_DIR / 'checkpoint.json'
+        self.DAEMON_STATUS_PATH = self.DATA_DIR / 'daemon.json'
+        self.METRICS_PATH = self.DATA_DIR / 'metrics.json'
+        self.LIFECYCLE_PATH = self.DATA_DIR / 'lifecycle.db'
+        self.ARCHIVE_CATALOG_PATH = self.DATA_DIR / 'archives.db'
+        self.PLAN_PATH = self.DATA_DIR / 'plan.jsonl'
+
         # Kaynak limitleri
         self.RESOURCE_LIMITS = {
             'MAX_CPU': 50,
-            'MAX_RAM': 70
+            'MAX_RAM': 70,
+            'MAX_DISK_MBPS': 0  # 0: disk G/Ç limiti yok
+        }
+
+        # Kaynak yöneticisi: yük limitlerin THROTTLE_START oranını geçince
+        # işlem hızı MAX_OPS_PER_SEC'ten MIN_OPS_PER_SEC'e doğru düşürülür
+        self.GOVERNOR_SETTINGS = {
+            'SAMPLE_INTERVAL': 1.0,
+            'SMOOTHING': 0.3,
+            'THROTTLE_START': 0.8,
+            'MAX_OPS_PER_SEC': 500,
+            'MIN_OPS_PER_SEC': 5,
+            'MAX_PAUSE_SECONDS': 30
+        }
+
+        # Arama ayarları
+        self.SEARCH_SETTINGS = {
+            'MAX_RESULTS': 1000,
+            'DEBOUNCE_MS': 250,
+            'BATCH_SIZE': 200
+        }
+
+        # Dosya izleyici olay hattı ayarları
+        self.WATCHER_SETTINGS = {
+            'MAX_WORKERS': 4,
+            'SETTLE_SECONDS': 2,
+            'POLL_INTERVAL': 0.5,
+            'BATCH_SIZE': 100,
+            'RECONCILE_INTERVAL': 300,
+            'RECONCILE_GRACE': 10,
+            # Yarım indirmeler ve Office kilit dosyaları düzenlenmez
+            'INCLUDE': ['*'],
+            'EXCLUDE': ['*.crdownload', '*.part', '*.partial', '~$*']
+        }
+
+        # Files dışında izlenecek bırakma klasörleri, ör.
+        # {'PATH': '~/Downloads', 'RECURSIVE': True, 'INCLUDE': ['*'], 'EXCLUDE': ['*.iso']}
+        # INCLUDE/EXCLUDE verilmezse WATCHER_SETTINGS'tekiler kullanılır
+        self.WATCH_ROOTS = []
+
+        # Old dizini sıkıştırma ayarları (METHOD: stored, deflate, bzip2, lzma)
+        self.COMPRESSION_SETTINGS = {
+            'METHOD': 'deflate',
+            'LEVEL': 6,
+            'MAX_WORKERS': 2,
+            'MAX_ARCHIVE_MB': 1024,
+            'MAX_ARCHIVE_FILES': 10000,
+            'PARALLEL_MAX_MB': 64
+        }
+
+        # Başka aygıta taşıma: MAX_TRANSFERS eşzamanlı kopya, CHUNK_MB'lık
+        # çekirdek içi parçalar; VERIFY 'size' ya da 'hash' (kaynak silinmeden önce)
+        self.TRANSFER_SETTINGS = {
+            'MAX_TRANSFERS': 2,
+            'CHUNK_MB': 8,
+            'VERIFY': 'size',
+            'FSYNC': True
+        }
+
+        # Yaşam döngüsü: Files/<kategori> altında DEFAULT_DAYS gündür (kategoriye
+        # özel eşik LIFECYCLE_AGE_DAYS'te) erişilmeyen dosyalar Old'a taşınır.
+        # İlk tarama START_DELAY, sonrakiler SCAN_INTERVAL saniyede bir yapılır
+        self.LIFECYCLE_SETTINGS = {
+            'ENABLED': True,
+            'DEFAULT_DAYS': 180,
+            'SCAN_INTERVAL': 3600,
+            'START_DELAY': 300,
+            'BATCH_SIZE': 200,
+            'BATCH_PAUSE': 0.5
+        }
+
+        # Kategori başına yaş eşiği (gün); 0 o kategoriyi hiç yaşlandırmaz
+        self.LIFECYCLE_AGE_DAYS = {
+            'Setups': 60,
+            'Others': 90
+        }
+
+        # Çok örnekli çalışma: aynı paylaşımlı ağacı düzenleyen süreçler DIR'deki
+        # (boşsa Files'ın yanındaki .organizer-cluster) kira dosyalarıyla eşgüdümlenir.
+        # Dosyalar örnekler arasında paylaştırılır; sıkıştırma ve yaşlandırma liderde
+        # yürür. LEASE_SECONDS boyunca kalp atışı gelmeyen örnek ölü sayılır
+        self.COORDINATION_SETTINGS = {
+            'ENABLED': False,
+            'DIR': '',
+            'HEARTBEAT_INTERVAL': 5,
+            'LEASE_SECONDS': 30,
+            'VIRTUAL_NODES': 64
+        }
+
+        # Planla/uygula modu (planner.py): plan BATCH_SIZE'lık toplu işlerle,
+        # kaynak aygıt başına bir iş parçacığında (en fazla MAX_DEVICES) uygulanır
+        self.PLANNER_SETTINGS = {
+            'BATCH_SIZE': 500,
+            'MAX_DEVICES': 4
+        }
+
+        # Yinelenen dosya ayarları (POLICY: off, hardlink, trash)
+        self.DEDUP_SETTINGS = {
+            'POLICY': 'trash',
+            'PARTIAL_BYTES': 64 * 1024
+        }
+
+        # Taşıma günlüğü: fsync FSYNC_BATCH kayıtta ya da FSYNC_INTERVAL
+        # saniyede bir toplu yapılır; MAX_MB aşılınca son KEEP_BATCHES iş tutulur.
+        # İzleyici taşımalarının oturum işi boşluk, süre ya da sayı sınırında yenilenir
+        self.JOURNAL_SETTINGS = {
+            'FSYNC_INTERVAL': 0.5,
+            'FSYNC_BATCH': 256,
+            'MAX_MB': 64,
+            'KEEP_BATCHES': 50,
+            'SESSION_IDLE_SECONDS': 600,
+            'SESSION_MAX_SECONDS': 3600,
+            'SESSION_MAX_MOVES': 1000
+        }
+
+        # Çöp saklama süresi (geliş zamanından itibaren) ve arka plan silme ayarları
+        self.TRASH_SETTINGS = {
+            'RETENTION_DAYS': 1,
+            'BATCH_SIZE': 500,
+            'BATCH_PAUSE': 0.05,
+            'CHECK_INTERVAL': 3600
+        }
+
+        # Günlük: JSONL kayıtlar ayrı bir iş parçacığında yazılır; dosya MAX_MB'ı
+        # aşınca ya da ROTATE_HOURS saatte bir döndürülür, BACKUPS kopya tutulur.
+        # CONSOLE açıksa (ör. systemd altında) kayıtlar stderr'e de yazılır
+        self.LOG_SETTINGS = {
+            'LEVEL': 'INFO',
+            'MAX_MB': 10,
+            'BACKUPS': 5,
+            'ROTATE_HOURS': 24,
+            'CONSOLE': False
+        }
+
+        # Ölçümler: HTTP_PORT > 0 ise 127.0.0.1'de /metrics uç noktası açılır,
+        # DUMP_INTERVAL > 0 ise METRICS_PATH'e periyodik olarak yazılır.
+        # SPANS açıksa her zamanlanan işlem ayrıca DEBUG düzeyinde günlüğe düşer
+        self.METRICS_SETTINGS = {
+            'ENABLED': True,
+            'SPANS': False,
+            'HTTP_PORT': 0,
+            'DUMP_INTERVAL': 60
+        }
+
+        # Başsız servis: açılıştaki birikmiş iş (düzenleme, sıkıştırma, çöp)
+        # izleme başladıktan sonra BACKLOG_NICE önceliğiyle arka planda yapılır.
+        # Yeniden başlatmada yalnızca son taramadan CHECKPOINT_MARGIN saniye
+        # öncesinden beri değişen dosyalar düzenlenir
+        self.DAEMON_SETTINGS = {
+            'BACKLOG_NICE': 10,
+            'CHECKPOINT_MARGIN': 60
         }
 
         # Dosya kategorileri ve uzantıları
@@ -33,8 +322,218 @@ class Config:
             "Others": []
         }
 
-        self.EXTENSION_MAP = {
-            ext: category 
-            for category, extensions in self.FILE_CATEGORIES.items() 
-            for ext in extensions
-        }
\ No newline at end of file
+        # İçerik tabanlı sınıflandırma: uzantısı olmayan, bilinmeyen ya da
+        # şüpheli uzantılı dosyalarda ilk HEADER_BYTES bayt okunur
+        self.CLASSIFIER_SETTINGS = {
+            'ENABLED': True,
+            'HEADER_BYTES': 64,
+            'CACHE_SIZE': 100000,
+            'SUSPICIOUS_EXTENSIONS': ['', 'tmp', 'dat', 'bin', 'download', 'crdownload', 'part']
+        }
+
+        # Kullanıcı kuralları (ayar dosyasındaki RULES listesi), ör.
+        # {"name": "Ekran görüntüleri", "glob": "Screenshot*", "extensions": ["png"],
+        #  "destination": "Images/Screenshots/{year}/{month}"}
+        # Koşullar: extensions, glob | regex, min_size, max_size, min_age_days,
+        # max_age_days, source (dizin globu), types (içerikten tanınan tür)
+        self.RULES = []
+
+        self._frozen = False
+        if load:
+            try:
+                self.load_file()
+            except ConfigError as e:
+                logging.error(f"Config file ignored, using defaults: {e}")
+        self._derive()
+
+    def __setattr__(self, name, value):
+        if getattr(self, '_frozen', False):
+            raise AttributeError(f"Config snapshot is read-only: {name}")
+        super().__setattr__(name, value)
+
+    def _derive(self):
+        # Türetilmiş yapılar önbellekten gelir; her Config() yeniden kurmaz
+        self.EXTENSION_MAP = _extension_map(tuple(
+            (category, tuple(extensions)) for category, extensions in self.FILE_CATEGORIES.items()
+        ))
+
+    def rule_engine(self):
+        """Derlenmiş kurallar; aynı RULES için önbellekteki motor döner"""
+        return _rule_engine(json.dumps(self.RULES, sort_keys=True, default=dict))
+
+    def freeze(self):
+        """Ayarları salt okunur yapar; yayınlanan anlık görüntüler değiştirilemez"""
+        for name, value in vars(self).items():
+            if isinstance(value, (dict, list)):
+                super().__setattr__(name, _freeze(value))
+        super().__setattr__('_frozen', True)
+        return self
+
+    def load_file(self):
+        """
+        Ayar dosyasını doğrulayarak varsayılanların üzerine uygular. Dosya
+        okunamaz ya da JSON değilse ConfigError; tek tek geçersiz değerler
+        günlüğe yazılıp atlanır (varsayılan kalır).
+        """
+        try:
+            with open(self.CONFIG_FILE, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            raise ConfigError(f"cannot read {self.CONFIG_FILE}: {e}")
+        if not isinstance(data, dict):
+            raise ConfigError(f"{self.CONFIG_FILE} must contain a JSON object")
+
+        for key, value in data.items():
+            try:
+                self._apply(key, value)
+            except ConfigError as e:
+                logging.error(f"Invalid config value {key}: {e}")
+
+    def _apply(self, key, value):
+        if key in SETTINGS_SECTIONS:
+            if not isinstance(value, dict):
+                raise ConfigError('must be an object')
+            section = dict(getattr(self, key))
+            for name, item in value.items():
+                if name not in section:
+                    logging.error(f"Unknown config setting {key}.{name} ignored")
+                elif not _is_type_of(item, section[name]):
+                    logging.error(f"Config setting {key}.{name} has wrong type, default kept")
+                elif item not in SETTING_CHOICES.get((key, name), (item,)):
+                    logging.error(f"Config setting {key}.{name} must be one of "
+                                  f"{', '.join(SETTING_CHOICES[(key, name)])}, default kept")
+                elif not _in_range(item, key, name):
+                    logging.error(f"Config setting {key}.{name} must be {_range_text(key, name)}, default kept")
+                else:
+                    section[name] = item
+            setattr(self, key, section)
+        elif key == 'BASE_DIRS':
+            if not isinstance(value, dict) or not all(isinstance(v, str) and v for v in value.values()):
+                raise ConfigError('must map directory names to paths')
+            unknown = set(value) - set(self.BASE_DIRS)
+            if unknown:
+                raise ConfigError(f"unknown directories: {', '.join(sorted(unknown))}")
+            self.BASE_DIRS = {
+                **self.BASE_DIRS,
+                **{name: Path(path).expanduser() for name, path in value.items()}
+            }
+        elif key == 'FILE_CATEGORIES':
+            if not isinstance(value, dict) or not all(
+                isinstance(extensions, list) and all(isinstance(ext, str) for ext in extensions)
+                for extensions in value.values()
+            ):
+                raise ConfigError('must map category names to extension lists')
+            self.FILE_CATEGORIES = {
+                category: [ext.lower().lstrip('.') for ext in extensions]
+                for category, extensions in value.items()
+            }
+            self.FILE_CATEGORIES.setdefault('Others', [])
+        elif key == 'LIFECYCLE_AGE_DAYS':
+            if not isinstance(value, dict) or not all(
+                _is_type_of(days, 0) and days >= 0 for days in value.values()
+            ):
+                raise ConfigError('must map category names to a number of days (0: never)')
+            self.LIFECYCLE_AGE_DAYS = value
+        elif key == 'WATCH_ROOTS':
+            if not isinstance(value, list) or not all(
+                isinstance(root, dict) and isinstance(root.get('PATH'), str) for root in value
+            ):
+                raise ConfigError("must be a list of objects with a PATH")
+            self.WATCH_ROOTS = value
+        elif key == 'RULES':
+            # Kuralların ayrıntılı doğrulaması RuleEngine'de; geçersiz kural atlanır
+            if not isinstance(value, list):
+                raise ConfigError('must be a list')
+            self.RULES = value
+        else:
+            logging.error(f"Unknown config key {key} ignored")
+
+
+class ConfigStore:
+    """
+    Geçerli yapılandırmanın salt okunur anlık görüntüsünü tutar. Ayar
+    dosyası POLL_INTERVAL'da bir stat ile izlenir; değişince yeni bir
+    anlık görüntü oluşturulur, tek bir atama ile yayınlanır ve abonelere
+    bildirilir. Okunamayan (ör. yarım yazılmış) dosya yayınlanmaz.
+    """
+
+    POLL_INTERVAL = 2.0
+
+    def __init__(self, home_path=None):
+        self.home_path = home_path
+        self.current = Config(home_path).freeze()
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._signature = self._file_signature()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='config-watch', daemon=True)
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.current.CONFIG_FILE)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _run(self):
+        while not self._stopping.wait(self.POLL_INTERVAL):
+            signature = self._file_signature()
+            if signature != self._signature:
+                self._signature = signature
+                self.reload()
+
+    def reload(self):
+        config = Config(self.home_path, load=False)
+        try:
+            config.load_file()
+        except ConfigError as e:
+            logging.error(f"Config reload skipped: {e}")
+            return self.current
+        config._derive()
+        config.freeze()
+
+        with self._lock:
+            self.current = config
+        logging.info(f"Configuration reloaded from {config.CONFIG_FILE}")
+        for callback in self._subscribers:
+            try:
+                callback(config)
+            except Exception as e:
+                logging.error(f"Config subscriber error: {e}")
+        return config
+
+    def save(self, updates):
+        """
+        Verilen üst düzey anahtarları ayar dosyasına yazar (diğer anahtarlar
+        korunur) ve yeni anlık görüntüyü hemen yayınlar.
+        """
+        config_file = self.current.CONFIG_FILE
+        with self._lock:
+            try:
+                with open(config_file, encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            if not isinstance(data, dict):
+                # Nesne olmayan dosya zaten yok sayılıyor (load_file); üzerine yazılır
+                data = {}
+            data.update(updates)
+
+            # Yarım yazılmış dosya izleyiciye görünmesin diye atomik değiştirme
+            temp_file = config_file.with_name(config_file.name + '.tmp')
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+            os.replace(temp_file, config_file)
+            self._signature = self._file_signature()
+        return self.reload()
\ No newline at end of file
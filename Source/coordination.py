@@ -0,0 +1,284 @@
+# coordination.py
+"""
+Aynı paylaşımlı ağacı (ör. ağ üzerinden bağlanmış Files/Old/Trash)
+düzenleyen birden çok sürecin eşgüdümü. Yalnızca paylaşımlı dizindeki
+dosyalar kullanılır; sunucu ya da ek bağımlılık gerekmez.
+
+    <DIR>/members/<örnek>.member   her HEARTBEAT_INTERVAL'da dokunulur
+    <DIR>/leases/<iş>.lease        tekil işin (sıkıştırma, yaşlandırma) sahibi
+
+Zaman karşılaştırmaları yerel saatle değil, paylaşımlı dosya sisteminin
+yazdığı mtime'larla yapılır: örneğin kendi kalp atışı dosyasının mtime'ı
+"şimdi" kabul edilir, böylece makineler arası saat kayması kiraları
+etkilemez. LEASE_SECONDS boyunca dokunulmamış üye ölü sayılır.
+
+Dosyalar canlı üyeler arasında, dosya adının tutarlı özeti (consistent
+hash, üye başına VIRTUAL_NODES sanal düğüm) ile paylaştırılır; bir üye
+gelip gittiğinde yalnızca onun payına düşen adlar el değiştirir.
+"""
+import os
+import json
+import time
+import uuid
+import bisect
+import socket
+import hashlib
+import logging
+import threading
+from pathlib import Path
+
+import metrics
+
+
+def _hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Üye kimliklerinden kurulan tutarlı özet halkası"""
+
+    def __init__(self, members, virtual_nodes):
+        points = sorted(
+            (_hash(f'{member}#{replica}'), member)
+            for member in members
+            for replica in range(virtual_nodes)
+        )
+        self.members = frozenset(members)
+        self._hashes = [point for point, _ in points]
+        self._owners = [member for _, member in points]
+
+    def owner(self, key):
+        if not self._hashes:
+            return None
+        position = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[position]
+
+
+class Coordinator:
+    """
+    Üyelik, yol paylaştırma ve tekil işler için lider seçimi. Kira
+    dosyası O_EXCL ile oluşturulur ve sahibi tarafından her kalp atışında
+    dokunularak yenilenir. Süresi dolmuş kira, kendisine özel bir ada
+    yeniden adlandırılarak devralınır; yeniden adlandırılan dosya gözlenen
+    bayat kira değilse (bu arada başkası almışsa) geri konur. Lider, kirası
+    son LEASE_SECONDS / 2 içinde yenilenmediyse kendini lider saymaz.
+    """
+
+    def __init__(self, settings, shared_dir, instance_id=None):
+        self.directory = Path(shared_dir)
+        self.heartbeat_interval = settings['HEARTBEAT_INTERVAL']
+        self.lease_seconds = settings['LEASE_SECONDS']
+        self.virtual_nodes = settings['VIRTUAL_NODES']
+        self.instance_id = instance_id or f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}'
+
+        self.members_dir = self.directory / 'members'
+        self.leases_dir = self.directory / 'leases'
+        self.member_path = self.members_dir / f'{self.instance_id}.member'
+
+        self.ring = HashRing([self.instance_id], self.virtual_nodes)
+        self._jobs = set()
+        # iş -> (kira içeriği, son başarılı yenileme; time.monotonic)
+        self._leases = {}
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='coordination', daemon=True)
+        metrics.add_collector('coordination', self._metrics)
+
+    def subscribe(self, callback):
+        """Canlı üye kümesi değişince callback(ring) çağrılır"""
+        self._subscribers.append(callback)
+
+    def register_job(self, job):
+        """Liderliği bu örnekte yürütülecek tekil iş; kirası kalp atışlarıyla istenir"""
+        with self._lock:
+            self._jobs.add(job)
+
+    def start(self):
+        self.members_dir.mkdir(parents=True, exist_ok=True)
+        self.leases_dir.mkdir(parents=True, exist_ok=True)
+        # İlk kalp atışı izleme başlamadan yapılır; diğer üyeler hemen görülür
+        self.heartbeat()
+        self._thread.start()
+        logging.info(f"Coordination started as {self.instance_id} with {len(self.ring.members)} live instances")
+
+    def stop(self):
+        """Kiraları ve üyeliği bırakır; diğer örnekler beklemeden devralır"""
+        self._stopping.set()
+        with self._lock:
+            leases = dict(self._leases)
+            self._leases.clear()
+        for job, (content, _) in leases.items():
+            path = self._lease_path(job)
+            if self._read(path) == content:
+                self._unlink(path)
+        self._unlink(self.member_path)
+
+    def owns(self, path):
+        """Dosyayı bu örnek mi düzenler (adın halkadaki sahibi)"""
+        return self.ring.owner(os.path.basename(str(path))) == self.instance_id
+
+    def is_leader(self, job):
+        with self._lock:
+            lease = self._leases.get(job)
+        return lease is not None and time.monotonic() - lease[1] < self.lease_seconds / 2
+
+    def _metrics(self):
+        with self._lock:
+            jobs = list(self._jobs)
+        return [('coordination_live_instances', len(self.ring.members), {})] + [
+            ('coordination_leader', int(self.is_leader(job)), {'job': job}) for job in jobs
+        ]
+
+    def _run(self):
+        while not self._stopping.wait(self.heartbeat_interval):
+            try:
+                self.heartbeat()
+            except Exception as e:
+                logging.error(f"Coordination heartbeat error: {e}")
+
+    def heartbeat(self):
+        now = self._touch_member()
+        if now is None:
+            return
+        self._update_members(now)
+        with self._lock:
+            jobs = list(self._jobs)
+        for job in jobs:
+            self._renew_lease(job, now)
+
+    def _touch_member(self):
+        """Üyelik dosyasına dokunur ve paylaşımlı dosya sisteminin zamanını döndürür"""
+        try:
+            try:
+                os.utime(self.member_path)
+            except FileNotFoundError:
+                # İlk açılış ya da ölü sanılıp silinmişiz
+                with open(self.member_path, 'w', encoding='utf-8') as f:
+                    json.dump({'host': socket.gethostname(), 'pid': os.getpid()}, f)
+            return os.stat(self.member_path).st_mtime
+        except OSError as e:
+            logging.error(f"Coordination membership write error: {e}")
+            return None
+
+    def _update_members(self, now):
+        live = {self.instance_id}
+        try:
+            with os.scandir(self.members_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.member'):
+                        continue
+                    member = entry.name[:-len('.member')]
+                    try:
+                        fresh = entry.stat().st_mtime >= now - self.lease_seconds
+                    except OSError:
+                        continue
+                    if fresh:
+                        live.add(member)
+                    elif member != self.instance_id:
+                        # Ölü üyenin dosyası temizlenir; geri gelirse yeniden oluşturur
+                        self._unlink(entry.path)
+        except OSError as e:
+            logging.error(f"Coordination membership read error: {e}")
+            return
+
+        if live == self.ring.members:
+            return
+        joined = live - self.ring.members
+        left = self.ring.members - live
+        self.ring = HashRing(live, self.virtual_nodes)
+        logging.info(
+            f"Coordination membership changed: {len(live)} live instances"
+            f"{f', joined {sorted(joined)}' if joined else ''}{f', left {sorted(left)}' if left else ''}"
+        )
+        for callback in self._subscribers:
+            try:
+                callback(self.ring)
+            except Exception as e:
+                logging.error(f"Coordination subscriber error: {e}")
+
+    def _lease_path(self, job):
+        return self.leases_dir / f'{job}.lease'
+
+    def _renew_lease(self, job, now):
+        path = self._lease_path(job)
+        with self._lock:
+            held = self._leases.get(job)
+
+        current = self._read(path)
+        if held is not None and current == held[0]:
+            try:
+                os.utime(path)
+                with self._lock:
+                    self._leases[job] = (held[0], time.monotonic())
+                return True
+            except FileNotFoundError:
+                current = None
+
+        if held is not None:
+            # Kira başka bir örneğe geçmiş ya da silinmiş
+            with self._lock:
+                self._leases.pop(job, None)
+            logging.warning(f"Lost leadership of {job}")
+
+        if current is not None:
+            try:
+                stale = os.stat(path).st_mtime < now - self.lease_seconds
+            except FileNotFoundError:
+                stale = True
+            if not stale or not self._take_over(path, current):
+                return False
+        return self._create_lease(job, path)
+
+    def _take_over(self, path, observed):
+        """Bayat kirayı kaldırır; bu arada başkası kirayı yenilediyse geri koyar"""
+        tombstone = path.with_name(f'{path.name}.{self.instance_id}.stale')
+        try:
+            os.rename(path, tombstone)
+        except FileNotFoundError:
+            return True
+        except OSError as e:
+            logging.error(f"Lease takeover error for {path.name}: {e}")
+            return False
+        if self._read(tombstone) != observed:
+            # Yeni sahibin kirasını aldık: aynı dosya (aynı mtime) geri bağlanır
+            try:
+                os.link(tombstone, path)
+            except OSError:
+                pass
+            self._unlink(tombstone)
+            return False
+        self._unlink(tombstone)
+        logging.info(f"Expired lease {path.name} taken over")
+        return True
+
+    def _create_lease(self, job, path):
+        content = json.dumps({'owner': self.instance_id, 'token': uuid.uuid4().hex})
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return False
+        except OSError as e:
+            logging.error(f"Lease create error for {path.name}: {e}")
+            return False
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        with self._lock:
+            self._leases[job] = (content, time.monotonic())
+        logging.info(f"Became leader of {job}")
+        return True
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
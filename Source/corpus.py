@@ -0,0 +1,88 @@
+# corpus.py
+import os
+import time
+import random
+
+# Türkçe karakterli örnek dosya adı parçaları
+TURKISH_WORDS = [
+    'şirket', 'rapor', 'ığdır', 'çizelge', 'gönderi', 'özet', 'ücret',
+    'İstanbul', 'Işık', 'sözleşme', 'fatura', 'görüşme', 'ödeme', 'çıktı',
+]
+ASCII_WORDS = [
+    'report', 'invoice', 'download', 'image', 'setup', 'backup', 'notes',
+    'photo', 'video', 'track', 'draft', 'final', 'scan', 'export',
+]
+# Kullanıcıların en sık tekrar tekrar indirdiği adlar (çakışma senaryosu)
+COMMON_NAMES = ['download.pdf', 'image.png', 'setup.exe', 'document.docx', 'video.mp4']
+
+EXTENSIONS = [
+    'pdf', 'docx', 'txt', 'xlsx', 'jpg', 'png', 'gif', 'mp4', 'mkv', 'mp3',
+    'wav', 'zip', 'rar', 'exe', 'msi', '', 'tmp', 'xyz',
+]
+
+# (olasılık, en küçük, en büyük) bayt
+SIZE_PROFILES = {
+    'empty': [(1.0, 0, 0)],
+    'small': [(0.9, 0, 4 * 1024), (0.1, 4 * 1024, 64 * 1024)],
+    'mixed': [(0.7, 0, 16 * 1024), (0.25, 16 * 1024, 1024 * 1024), (0.05, 1024 * 1024, 8 * 1024 * 1024)],
+}
+
+
+def _pick_size(rng, profile):
+    roll = rng.random()
+    for probability, low, high in SIZE_PROFILES[profile]:
+        if roll < probability:
+            return rng.randint(low, high)
+        roll -= probability
+    return 0
+
+
+def _make_name(rng, index, collision_ratio, turkish_ratio):
+    if rng.random() < collision_ratio:
+        return rng.choice(COMMON_NAMES)
+    words = TURKISH_WORDS if rng.random() < turkish_ratio else ASCII_WORDS
+    stem = '_'.join(rng.sample(words, rng.randint(1, 3)))
+    ext = rng.choice(EXTENSIONS)
+    return f'{stem}_{index}.{ext}' if ext else f'{stem}_{index}'
+
+
+def generate_corpus(directory, file_count, seed=0, collision_ratio=0.1,
+                    turkish_ratio=0.3, size_profile='small', min_age_days=0, max_age_days=0):
+    """
+    directory altına tekrarlanabilir (aynı seed ile aynı) sentetik dosyalar
+    üretir. Çakışan adlar alt dizinlere yazılır ki hepsi aynı ada sahip olabilsin.
+    max_age_days > 0 ise mtime'lar [min_age_days, max_age_days] gün geriye dağıtılır.
+    Oluşturulan dosya yollarının listesini döndürür.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    payload = rng.randbytes(64 * 1024)
+    now = time.time()
+
+    paths = []
+    used = set()
+    for index in range(file_count):
+        name = _make_name(rng, index, collision_ratio, turkish_ratio)
+        target_dir = directory
+        if name in used:
+            target_dir = os.path.join(directory, f'dup_{index}')
+            os.makedirs(target_dir, exist_ok=True)
+        else:
+            used.add(name)
+
+        path = os.path.join(target_dir, name)
+        size = _pick_size(rng, size_profile)
+        with open(path, 'wb') as f:
+            # İlk 64 KB sıkıştırılabilir/rastgele karışık veri, kalanı seyrek
+            head = min(size, len(payload))
+            if head:
+                f.write(payload[:head // 2] + bytes(head - head // 2))
+            if size > head:
+                f.truncate(size)
+
+        if max_age_days:
+            mtime = now - rng.uniform(min_age_days, max_age_days) * 86400
+            os.utime(path, (mtime, mtime))
+        paths.append(path)
+    return paths
+
@@ -0,0 +1,205 @@
+# dedup.py
+import os
+import mmap
+import hashlib
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+
+HASH_CHUNK = 1024 * 1024
+
+
+def partial_hash(path, size, partial_bytes):
+    """Dosyanın başından ve sonundan partial_bytes kadarının özeti"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(size.to_bytes(8, 'little'))
+    with open(path, 'rb') as f:
+        digest.update(f.read(partial_bytes))
+        if size > partial_bytes:
+            f.seek(max(partial_bytes, size - partial_bytes))
+            digest.update(f.read(partial_bytes))
+    return digest.hexdigest()
+
+
+def full_hash(path):
+    """Tam içerik özeti; dosya mmap ile eşlenip parça parça işlenir"""
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, len(mapped), HASH_CHUNK):
+                        digest.update(view[offset:offset + HASH_CHUNK])
+                finally:
+                    view.release()
+        except (ValueError, OSError):
+            # Boş ya da eşlenemeyen dosyalar (ör. bazı ağ sürücüleri)
+            f.seek(0)
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Fingerprint:
+    """Bir dosya için hesaplanmış (ya da henüz hesaplanmamış) özetler"""
+    __slots__ = ('size', 'mtime_ns', 'partial', 'full')
+
+    def __init__(self, size, mtime_ns, partial=None, full=None):
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.partial = partial
+        self.full = full
+
+
+class DedupIndex:
+    """
+    İçerik tabanlı yinelenen dosya indeksi (boyut -> kısmi özet -> tam özet).
+    Aynı boyutta kayıtlı dosya yoksa yeni dosya hiç okunmaz; kısmi özet
+    eşleşmezse tam okuma yapılmaz. Özetler kalıcıdır ve gerektikçe hesaplanır.
+    """
+
+    def __init__(self, db_path, partial_bytes):
+        self.db_path = Path(db_path)
+        self.partial_bytes = partial_bytes
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    partial TEXT,
+                    full TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS files_size ON files (size)')
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def seed(self, directories):
+        """
+        Mevcut dosyaları yalnızca boyut/mtime ile (okumadan) bir kez indeksler.
+        Sonraki güncellemeler taşımalarla artımlı olarak yapılır.
+        """
+        conn = self._connect()
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone():
+            return
+
+        rows = []
+        stack = [str(directory) for directory in directories]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                st = entry.stat(follow_symlinks=False)
+                                rows.append((entry.path, st.st_size, st.st_mtime_ns))
+                        except OSError:
+                            continue
+            except OSError as e:
+                logging.error(f"Dedup index scan error: {e}")
+
+        with self._write_lock, conn:
+            conn.executemany(
+                'INSERT OR IGNORE INTO files (path, size, mtime_ns) VALUES (?, ?, ?)', rows
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('seeded', '1')")
+        logging.info(f"Dedup index seeded with {len(rows)} files")
+
+    def find_duplicate(self, path):
+        """
+        (eşleşen mevcut dosya ya da None, yeni dosyanın Fingerprint'i) döndürür.
+        Hesaplanan özetler kaydedilebilmesi için Fingerprint içinde taşınır.
+        """
+        st = os.stat(path)
+        fingerprint = Fingerprint(st.st_size, st.st_mtime_ns)
+
+        conn = self._connect()
+        candidates = conn.execute(
+            'SELECT path, mtime_ns, partial, full FROM files WHERE size = ?',
+            (fingerprint.size,)
+        ).fetchall()
+        if not candidates:
+            return None, fingerprint
+
+        fingerprint.partial = partial_hash(path, fingerprint.size, self.partial_bytes)
+        for candidate_path, mtime_ns, partial, full in candidates:
+            if candidate_path == str(path):
+                continue
+            try:
+                candidate_st = os.stat(candidate_path)
+            except OSError:
+                self.remove(candidate_path)
+                continue
+
+            if candidate_st.st_size != fingerprint.size:
+                self._update(candidate_path, Fingerprint(candidate_st.st_size, candidate_st.st_mtime_ns))
+                continue
+            if candidate_st.st_mtime_ns != mtime_ns:
+                # Dosya değişmiş; eski özetler geçersiz
+                partial = full = None
+                mtime_ns = candidate_st.st_mtime_ns
+
+            candidate = Fingerprint(fingerprint.size, mtime_ns, partial, full)
+            if candidate.partial is None:
+                candidate.partial = partial_hash(candidate_path, candidate.size, self.partial_bytes)
+                self._update(candidate_path, candidate)
+            if candidate.partial != fingerprint.partial:
+                continue
+
+            # Kısmi özet dosyanın tamamını kapsıyorsa tam okuma gereksiz
+            if fingerprint.size <= 2 * self.partial_bytes:
+                return Path(candidate_path), fingerprint
+
+            if fingerprint.full is None:
+                fingerprint.full = full_hash(path)
+            if candidate.full is None:
+                candidate.full = full_hash(candidate_path)
+                self._update(candidate_path, candidate)
+            if candidate.full == fingerprint.full:
+                return Path(candidate_path), fingerprint
+
+        return None, fingerprint
+
+    def record(self, path, fingerprint):
+        self._update(str(path), fingerprint)
+
+    def _update(self, path, fingerprint):
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO files (path, size, mtime_ns, partial, full) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        (str(path), fingerprint.size, fingerprint.mtime_ns,
+                         fingerprint.partial, fingerprint.full)
+                    )
+        except sqlite3.Error as e:
+            logging.error(f"Dedup index update error for {path}: {e}")
+
+    def remove(self, path):
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute('DELETE FROM files WHERE path = ?', (str(path),))
+        except sqlite3.Error as e:
+            logging.error(f"Dedup index remove error for {path}: {e}")
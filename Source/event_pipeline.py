@@ -0,0 +1,212 @@
+# event_pipeline.py
+import os
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+
+class EventPipeline:
+    """
+    Watcher olaylarını dört aşamada işler:
+    1. Aynı yol için gelen olaylar tek bir bekleyen kayıtta birleştirilir
+    2. Dosyanın boyutu ve mtime'ı SETTLE_SECONDS boyunca değişmeyene kadar beklenir
+    3. Hazır dosyalar BATCH_SIZE'lık gruplara ayrılır
+    4. Gruplar MAX_WORKERS iş parçacıklı bir havuzda işlenir
+    """
+
+    def __init__(self, handler, settings):
+        self.handler = handler
+        self.settle_seconds = settings['SETTLE_SECONDS']
+        self.poll_interval = settings['POLL_INTERVAL']
+        self.batch_size = settings['BATCH_SIZE']
+        max_workers = settings['MAX_WORKERS']
+
+        # path -> (olay sırası, (size, mtime_ns, stable_since) ya da None)
+        self._pending = {}
+        # path -> ilk olayın zamanı (olay gecikmesi ölçümü için; birleşmede korunur)
+        self._first_seen = {}
+        # Bir işçiye verilmiş ve henüz bitmemiş yollar
+        self._active = set()
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+        # Kuyrukta bekleyen grup sayısı sınırlı tutulur (geri basınç)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='organizer')
+        self._slots = threading.BoundedSemaphore(max_workers * 2)
+
+        self._counters = {
+            'events': 0,
+            'coalesced': 0,
+            'vanished': 0,
+            'batches': 0,
+            'processed': 0,
+            'failed': 0,
+        }
+        self._queued_files = 0
+        self._in_flight = 0
+        self._started_at = time.monotonic()
+        # İlk olayın işlendiği an (soğuk başlangıç gecikmesi ölçümü için)
+        self.first_processed_at = None
+        self.first_processed = threading.Event()
+        self._last_report = (time.monotonic(), 0)
+
+        self._thread = threading.Thread(target=self._run, name='event-pipeline', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def submit(self, path):
+        """Oluşturma/değişiklik/taşıma olayını kaydeder; yeni olay bekleme süresini sıfırlar"""
+        with self._lock:
+            self._counters['events'] += 1
+            if path in self._pending:
+                self._counters['coalesced'] += 1
+            else:
+                self._first_seen[path] = time.monotonic()
+            self._seq += 1
+            self._pending[path] = (self._seq, None)
+        self._wakeup.set()
+
+    def discard(self, path):
+        with self._lock:
+            self._pending.pop(path, None)
+            self._first_seen.pop(path, None)
+
+    def is_pending(self, path):
+        """Yol bekliyor ya da şu anda işleniyor mu"""
+        with self._lock:
+            return path in self._pending or path in self._active
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['pending'] = len(self._pending)
+            stats['queued'] = self._queued_files
+            stats['in_flight'] = self._in_flight
+        elapsed = time.monotonic() - self._started_at
+        stats['files_per_sec'] = stats['processed'] / elapsed if elapsed > 0 else 0.0
+        return stats
+
+    def _run(self):
+        while not self._stopping.is_set():
+            ready = self._collect_ready()
+            for start in range(0, len(ready), self.batch_size):
+                self._dispatch(ready[start:start + self.batch_size])
+            self._report()
+
+            with self._lock:
+                idle = not self._pending
+            # Bekleyen dosya yoksa yeni bir olaya kadar uyu
+            self._wakeup.wait(None if idle else self.poll_interval)
+            self._wakeup.clear()
+
+    def _collect_ready(self):
+        with self._lock:
+            snapshot = list(self._pending.items())
+
+        # stat çağrıları kilit dışında yapılır
+        now = time.monotonic()
+        ready = []
+        updates = []
+        vanished = []
+        for path, (seq, signature) in snapshot:
+            try:
+                st = os.stat(path)
+            except OSError:
+                vanished.append((path, seq))
+                continue
+
+            size_mtime = (st.st_size, st.st_mtime_ns)
+            if signature is None or signature[:2] != size_mtime:
+                updates.append((path, seq, (*size_mtime, now)))
+            elif now - signature[2] >= self.settle_seconds:
+                ready.append((path, seq))
+
+        with self._lock:
+            # Bu arada aynı yol için yeni bir olay geldiyse kayıt değişmemiş sayılmaz
+            def unchanged(path, seq):
+                entry = self._pending.get(path)
+                return entry is not None and entry[0] == seq
+
+            for path, seq in vanished:
+                if unchanged(path, seq):
+                    del self._pending[path]
+                    self._first_seen.pop(path, None)
+                    self._counters['vanished'] += 1
+            for path, seq, signature in updates:
+                if unchanged(path, seq):
+                    self._pending[path] = (seq, signature)
+
+            ready_paths = []
+            for path, seq in ready:
+                # Aynı yol hâlâ işleniyorsa yeni olay onun bitmesini bekler
+                # (geç gelen olay aynı dosyanın ikinci kez taşınmasına yol açmaz)
+                if unchanged(path, seq) and path not in self._active:
+                    del self._pending[path]
+                    ready_paths.append((path, self._first_seen.pop(path, now)))
+                    self._active.add(path)
+            self._queued_files += len(ready_paths)
+        return ready_paths
+
+    def _dispatch(self, batch):
+        # Havuz doluysa yer açılana kadar bekle; bu sırada yeni olaylar
+        # _pending içinde birleşmeye devam eder
+        while not self._slots.acquire(timeout=self.poll_interval):
+            if self._stopping.is_set():
+                with self._lock:
+                    self._active.difference_update(path for path, _ in batch)
+                return
+        with self._lock:
+            self._counters['batches'] += 1
+        self._executor.submit(self._process_batch, batch)
+
+    def _process_batch(self, batch):
+        try:
+            for path, first_seen in batch:
+                with self._lock:
+                    self._queued_files -= 1
+                    self._in_flight += 1
+                try:
+                    self.handler(path)
+                    succeeded = True
+                except Exception as e:
+                    logging.error(f"Event pipeline error for {path}: {e}")
+                    succeeded = False
+                with self._lock:
+                    self._in_flight -= 1
+                    self._active.discard(path)
+                    self._counters['processed' if succeeded else 'failed'] += 1
+                # Olay gecikmesi: ilk olaydan işlenmenin bitişine (SETTLE_SECONDS dahil)
+                metrics.observe('watch_event_lag_seconds', time.monotonic() - first_seen)
+                metrics.inc('watch_events_processed_total' if succeeded else 'watch_events_failed_total')
+                if succeeded and self.first_processed_at is None:
+                    self.first_processed_at = time.time()
+                    self.first_processed.set()
+        finally:
+            self._slots.release()
+
+    def _report(self, interval=60):
+        now = time.monotonic()
+        last_time, last_processed = self._last_report
+        if now - last_time < interval:
+            return
+        stats = self.stats()
+        if stats['processed'] != last_processed:
+            rate = (stats['processed'] - last_processed) / (now - last_time)
+            logging.info(
+                f"Watcher pipeline: {stats['processed']} processed ({rate:.1f} files/s), "
+                f"{stats['pending']} pending, {stats['queued']} queued, "
+                f"{stats['failed']} failed, {stats['coalesced']} coalesced"
+            )
+        self._last_report = (now, stats['processed'])
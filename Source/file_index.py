@@ -0,0 +1,365 @@
+# file_index.py
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+import logging
+from functools import lru_cache
+from pathlib import Path
+
+from transfer import PART_PREFIX
+
+# Türkçe büyük/küçük I harfleri casefold'dan önce tek bir forma indirgenir;
+# böylece I, ı, İ ve i aynı anahtara düşer
+TR_FOLD_TABLE = str.maketrans({'I': 'i', 'İ': 'i', 'ı': 'i'})
+
+
+@lru_cache(maxsize=65536)
+def fold_text(text):
+    """
+    Metni karşılaştırma anahtarına çevirir: Türkçe duyarlı casefold ve
+    aksanların kaldırılması. Tek geçişte çalışır, maliyeti uzunlukla doğrusaldır.
+    """
+    text = unicodedata.normalize('NFKD', text.translate(TR_FOLD_TABLE).casefold())
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+class FileIndex:
+    """
+    Files dizinindeki dosya adlarının SQLite üzerinde tutulan kalıcı indeksi.
+    İlk açılışta bir kez oluşturulur, sonra FileManager ve FileWatcher
+    tarafından artımlı olarak güncellenir. Dışarıdan yapılan değişiklikler
+    refresh() ile yalnızca mtime'ı değişen dizinler taranarak yakalanır.
+    """
+
+    SCHEMA_VERSION = '2'
+
+    # Bu süreden daha yeni dizin mtime'ları kaydedilmez; aynı zaman
+    # diliminde yapılan değişiklikler bir sonraki refresh'te yakalanır
+    MTIME_GRACE_NS = 2 * 1_000_000_000
+
+    def __init__(self, db_path, root):
+        self.db_path = Path(db_path)
+        self.root = Path(root)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._fts = False
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._create_schema()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            meta = dict(conn.execute('SELECT key, value FROM meta'))
+
+            # Şema ya da kök dizin değiştiyse indeks baştan oluşturulur
+            if (meta.get('version') != self.SCHEMA_VERSION
+                    or meta.get('root') != str(self.root)):
+                conn.execute('DROP TABLE IF EXISTS files_fts')
+                conn.execute('DROP TABLE IF EXISTS files')
+                conn.execute('DROP TABLE IF EXISTS dirs')
+                conn.execute('DELETE FROM meta')
+                conn.executemany('INSERT INTO meta (key, value) VALUES (?, ?)', [
+                    ('version', self.SCHEMA_VERSION),
+                    ('root', str(self.root)),
+                ])
+
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT NOT NULL UNIQUE,
+                    dir TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    key TEXT NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS files_dir ON files (dir)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS dirs (
+                    path TEXT PRIMARY KEY,
+                    parent TEXT,
+                    mtime INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent)')
+
+            # Alt dize araması için trigram FTS; SQLite desteklemiyorsa düz tabloya düşülür
+            try:
+                conn.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+                        key, content='files', content_rowid='id', tokenize='trigram'
+                    )
+                ''')
+                self._create_fts_triggers(conn)
+                self._fts = True
+            except sqlite3.OperationalError as e:
+                logging.warning(f"Trigram FTS desteklenmiyor, düz aramaya geçiliyor: {e}")
+
+    def _create_fts_triggers(self, conn):
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+                INSERT INTO files_fts (rowid, key) VALUES (new.id, new.key);
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+                INSERT INTO files_fts (files_fts, rowid, key) VALUES ('delete', old.id, old.key);
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS files_au AFTER UPDATE ON files BEGIN
+                INSERT INTO files_fts (files_fts, rowid, key) VALUES ('delete', old.id, old.key);
+                INSERT INTO files_fts (rowid, key) VALUES (new.id, new.key);
+            END
+        ''')
+
+    def _drop_fts_triggers(self, conn):
+        for trigger in ('files_ai', 'files_ad', 'files_au'):
+            conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+
+    def is_built(self):
+        row = self._connect().execute('SELECT 1 FROM dirs LIMIT 1').fetchone()
+        return row is not None
+
+    def ensure_built(self):
+        if not self.is_built():
+            self.refresh()
+
+    def refresh(self):
+        """
+        İndeksi disk ile eşitler. Sadece mtime'ı değişen dizinler taranır;
+        değişmeyen bir dizin için tek bir stat çağrısı yapılır.
+        """
+        start = time.perf_counter()
+        scanned = 0
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    known = dict(conn.execute('SELECT path, mtime FROM dirs'))
+
+                    # İlk oluşturmada satır başına FTS tetikleyicisi yerine
+                    # trigram indeksi tek seferde yeniden kurulur (çok daha hızlı)
+                    bulk = self._fts and not known
+                    if bulk:
+                        self._drop_fts_triggers(conn)
+                    stack = [(str(self.root), None)]
+                    while stack:
+                        directory, parent = stack.pop()
+                        try:
+                            mtime = os.stat(directory).st_mtime_ns
+                        except OSError:
+                            self._drop_tree(conn, directory)
+                            continue
+
+                        if known.get(directory) == mtime:
+                            stack.extend(
+                                (sub, directory) for (sub,) in conn.execute(
+                                    'SELECT path FROM dirs WHERE parent = ?', (directory,)
+                                )
+                            )
+                            continue
+
+                        try:
+                            subdirs = self._rescan_dir(conn, directory)
+                        except OSError as e:
+                            logging.error(f"File index scan error for {directory}: {e}")
+                            continue
+
+                        scanned += 1
+                        stack.extend((sub, directory) for sub in subdirs)
+                        if time.time_ns() - mtime < self.MTIME_GRACE_NS:
+                            mtime = 0
+                        conn.execute(
+                            'INSERT INTO dirs (path, parent, mtime) VALUES (?, ?, ?) '
+                            'ON CONFLICT(path) DO UPDATE SET parent = excluded.parent, mtime = excluded.mtime',
+                            (directory, parent, mtime)
+                        )
+
+                    if bulk:
+                        conn.execute("INSERT INTO files_fts (files_fts) VALUES ('rebuild')")
+                        self._create_fts_triggers(conn)
+            logging.info(
+                f"File index refreshed: {scanned} directories rescanned "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+        except sqlite3.Error as e:
+            logging.error(f"File index refresh error: {e}")
+
+    def _rescan_dir(self, conn, directory):
+        files = set()
+        subdirs = set()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.add(entry.path)
+                    elif entry.is_file() and not entry.name.startswith(PART_PREFIX):
+                        # Aktarımların yarım kopyaları kullanıcı dosyası değildir
+                        files.add(entry.name)
+                except OSError:
+                    continue
+
+        indexed = {name for (name,) in conn.execute('SELECT name FROM files WHERE dir = ?', (directory,))}
+        removed = indexed - files
+        if removed:
+            conn.executemany(
+                'DELETE FROM files WHERE path = ?',
+                [(os.path.join(directory, name),) for name in removed]
+            )
+        conn.executemany(
+            'INSERT INTO files (path, dir, name, key) VALUES (?, ?, ?, ?)',
+            [
+                (os.path.join(directory, name), directory, name, fold_text(name))
+                for name in files - indexed
+            ]
+        )
+
+        known_subdirs = {sub for (sub,) in conn.execute('SELECT path FROM dirs WHERE parent = ?', (directory,))}
+        for sub in known_subdirs - subdirs:
+            self._drop_tree(conn, sub)
+        return subdirs
+
+    def _drop_tree(self, conn, path):
+        prefix = path + os.sep
+        conn.execute(
+            'DELETE FROM files WHERE dir = ? OR substr(dir, 1, ?) = ?',
+            (path, len(prefix), prefix)
+        )
+        conn.execute(
+            'DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?',
+            (path, len(prefix), prefix)
+        )
+
+    def set_root(self, root):
+        """Files dizini değiştiğinde eski kökün kayıtlarını bırakıp yenisini tarar"""
+        root = Path(root)
+        if root == self.root:
+            return
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    self._drop_tree(conn, str(self.root))
+                self.root = root
+        except sqlite3.Error as e:
+            logging.error(f"File index root change error: {e}")
+            return
+        self.refresh()
+
+    def add(self, path):
+        path = Path(path)
+        if self.root not in path.parents or path.name.startswith(PART_PREFIX):
+            return
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute(
+                        'INSERT INTO files (path, dir, name, key) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT(path) DO UPDATE SET key = excluded.key',
+                        (str(path), str(path.parent), path.name, fold_text(path.name))
+                    )
+        except sqlite3.Error as e:
+            logging.error(f"File index add error for {path}: {e}")
+
+    def remove(self, path):
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute('DELETE FROM files WHERE path = ?', (str(path),))
+                    self._drop_tree(conn, str(path))
+        except sqlite3.Error as e:
+            logging.error(f"File index remove error for {path}: {e}")
+
+    def move(self, src_path, dest_path):
+        self.remove(src_path)
+        self.add(dest_path)
+
+    def move_many(self, moves):
+        """(kaynak, hedef) çiftlerini tek bir işlemde uygular (toplu düzenleme için)"""
+        if not moves:
+            return
+        removed = [(str(src),) for src, _ in moves]
+        added = [
+            (str(dest), str(dest.parent), dest.name, fold_text(dest.name))
+            for _, dest in moves
+            if self.root in dest.parents
+        ]
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany('DELETE FROM files WHERE path = ?', removed)
+                    conn.executemany(
+                        'INSERT INTO files (path, dir, name, key) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT(path) DO UPDATE SET key = excluded.key',
+                        added
+                    )
+        except sqlite3.Error as e:
+            logging.error(f"File index bulk update error: {e}")
+
+    def search(self, term, limit=None):
+        """Anahtarında, terimin katlanmış halini içeren dosya yollarını döndürür"""
+        return [path for batch in self.iter_search(term, limit) for path in batch]
+
+    def iter_search(self, term, limit=None, batch_size=500, should_stop=None):
+        """
+        Sonuçları batch_size'lık listeler halinde üretir. should_stop True
+        döndürdüğünde sorgu SQLite seviyesinde de kesilir ve üretim durur.
+        """
+        term = fold_text(term)
+        if not term:
+            return
+
+        conn = self._connect()
+        params = [term]
+        if self._fts and len(term) >= 3:
+            # Trigram indeksi adayları daraltır, instr kesin eşleşmeyi doğrular
+            # (LIKE içindeki '_' ve '%' joker karakter olarak yorumlanır)
+            query = (
+                'SELECT files.path FROM files_fts '
+                'JOIN files ON files.id = files_fts.rowid '
+                'WHERE files_fts.key LIKE ? AND instr(files.key, ?) > 0'
+            )
+            params.insert(0, f'%{term}%')
+        else:
+            query = 'SELECT path FROM files WHERE instr(key, ?) > 0'
+
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        if should_stop is not None:
+            # Uzun taramalar sırasında da iptal kontrolü (sıfır dışı dönüş sorguyu keser)
+            conn.set_progress_handler(should_stop, 10000)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                if should_stop is not None and should_stop():
+                    return
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield [Path(path) for (path,) in rows]
+        except sqlite3.OperationalError as e:
+            if should_stop is None or not should_stop():
+                logging.error(f"File index search error: {e}")
+        except sqlite3.Error as e:
+            logging.error(f"File index search error: {e}")
+        finally:
+            if should_stop is not None:
+                conn.set_progress_handler(None, 0)
@@ -1,20 +1,79 @@
 # file_manager.py
 import os
-import shutil
-import zipfile
-from datetime import datetime, timedelta
-import psutil
+import time
+import threading
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import wait as wait_futures
 from pathlib import Path
 import logging
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
-from config import Config
+from file_index import FileIndex
+from name_registry import NameRegistry
+from dedup import DedupIndex
+from classifier import FileClassifier
+from governor import ResourceGovernor
+from journal import MoveJournal
+from trash_index import TrashIndex, TrashExpiry
+from transfer import TransferEngine
+from lifecycle import LifecycleManager
+from logging_setup import setup_logging, is_log_file
+import metrics
+from metrics import MetricsExporter
+
+# Tek bir örnekte yürüyen işlerin (Old sıkıştırma, yaşlandırma) kira adı
+MAINTENANCE_JOB = 'maintenance'
+# Old'da bu kadar günden eski dosyalar arşivlenir
+COMPRESS_AFTER_DAYS = 30
 
 class FileManager:
     def __init__(self, config):
         self.config = config
         self.create_directories() 
         self.setup_logging()  
+        metrics.configure(config.METRICS_SETTINGS)
+        self.governor = ResourceGovernor(config.RESOURCE_LIMITS, config.GOVERNOR_SETTINGS)
+        self.governor.start()
+        self.index = FileIndex(config.INDEX_PATH, config.BASE_DIRS['FILES'])
+        self.names = NameRegistry()
+        # Paylaşımlı ağaçta başka örnekler de varsa dosyalar onlarla paylaştırılır
+        self.coordinator = None
+        if config.COORDINATION_SETTINGS['ENABLED']:
+            from coordination import Coordinator
+            self.coordinator = Coordinator(config.COORDINATION_SETTINGS, self._coordination_dir())
+            self.coordinator.register_job(MAINTENANCE_JOB)
+            self.coordinator.start()
+        self.transfers = TransferEngine(config.TRANSFER_SETTINGS, self.governor)
+        # Sıkıştırma motoru (zipfile, süreç havuzu) ve arşiv kataloğu ilk kullanımda yüklenir
+        self._compressor = None
+        self._compressor_lock = threading.Lock()
+        self._archives = None
+        self._archives_lock = threading.Lock()
+        self.classifier = FileClassifier(config.EXTENSION_MAP, config.CLASSIFIER_SETTINGS)
+        self.rules = config.rule_engine()
+        self.dedup = DedupIndex(config.DEDUP_PATH, config.DEDUP_SETTINGS['PARTIAL_BYTES'])
+        self.journal = MoveJournal(config.JOURNAL_PATH, config.JOURNAL_SETTINGS)
+        self.trash = TrashIndex(config.TRASH_INDEX_PATH)
+        # Çöp geliş zamanları yereldir; her örnek kendi payındaki öğeleri indeksler
+        self.trash_expiry = TrashExpiry(
+            self.trash, config.TRASH_SETTINGS, self.governor,
+            trash_dir=config.BASE_DIRS['TRASH'], owns=self.owns,
+            on_expired=lambda: self.names.invalidate(config.BASE_DIRS['TRASH'])
+        )
+        self.trash_expiry.start()
+        if self.coordinator is not None:
+            # Ölen ya da ayrılan örneğin çöp payı, dizin yeniden karşılaştırılınca
+            # yeni sahibinin indeksine girer ve onun tarafından süresi dolunca silinir
+            self.coordinator.subscribe(lambda ring: self.trash_expiry.rescan())
+        self.lifecycle = LifecycleManager(self)
+        self.lifecycle.start()
+        # Geri alma ile Files'a dönen dosyalar bir süre izleyici tarafından
+        # yeniden düzenlenmez: yol -> bekleme süresinin bittiği an
+        self.restored = {}
+        self._restored_lock = threading.Lock()
+        self.metrics_exporter = MetricsExporter(config.METRICS_SETTINGS, config.METRICS_PATH)
+        self.metrics_exporter.start()
+        metrics.add_collector('governor', self._governor_metrics)
+        self.recover_journal()
 
     def create_directories(self):
         for key, path in self.config.BASE_DIRS.items():
@@ -27,180 +86,577 @@ class FileManager:
         for category in self.config.FILE_CATEGORIES:
             (self.config.BASE_DIRS['FILES'] / category).mkdir(exist_ok=True)
 
+    def _coordination_dir(self):
+        directory = self.config.COORDINATION_SETTINGS['DIR']
+        if directory:
+            return Path(directory).expanduser()
+        return self.config.BASE_DIRS['FILES'].parent / '.organizer-cluster'
+
+    def owns(self, path):
+        """Dosyayı bu örnek mi düzenler; eşgüdüm kapalıysa her zaman"""
+        return self.coordinator is None or self.coordinator.owns(path)
+
+    def is_leader(self):
+        """Tekil bakım işleri (sıkıştırma, yaşlandırma) bu örnekte mi yürür"""
+        return self.coordinator is None or self.coordinator.is_leader(MAINTENANCE_JOB)
+
     def setup_logging(self):
-      log_file = self.config.BASE_DIRS['LOG']
-      
-      log_file.parent.mkdir(parents=True, exist_ok=True)
-      
-      logging.basicConfig(
-          filename=str(log_file),
-          level=logging.INFO,
-          format='%(asctime)s - %(levelname)s: %(message)s',
-          filemode='a'  
-      )
-
-      # Log dosyasının boyutunu sınırla (opsiyonel)
-      try:
-          max_log_size = 10 * 1024 * 1024  # 10 MB
-          if log_file.exists() and log_file.stat().st_size > max_log_size:
-              # Log dosyasını yedekle
-              backup_log = log_file.with_name(f'FileOrganizer_Log_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.txt')
-              log_file.rename(backup_log)
-      except Exception as e:
-          print(f"Log dosyası yönetimi hatası: {e}")
+        # Kayıtlar kuyruk üzerinden ayrı bir iş parçacığında JSONL olarak yazılır
+        setup_logging(self.config.BASE_DIRS['LOG'], self.config.LOG_SETTINGS)
+
+    def apply_config(self, config):
+        """
+        Yeni yapılandırma anlık görüntüsünü yeniden başlatmadan uygular.
+        Yalnızca değişen bileşenler yeniden kurulur; Files dizini
+        değişmedikçe hiçbir dizin yeniden taranmaz.
+        """
+        previous = self.config
+        self.config = config
+        self.create_directories()
+        self.setup_logging()
+        self.governor.limits = config.RESOURCE_LIMITS
+        self.trash_expiry.retention = config.TRASH_SETTINGS['RETENTION_DAYS'] * 86400
+        self.trash_expiry.trash_dir = config.BASE_DIRS['TRASH']
+        # Türetilmiş yapılar önbellekten geldiği için kimlik karşılaştırması yeterli
+        if (config.EXTENSION_MAP is not previous.EXTENSION_MAP
+                or config.CLASSIFIER_SETTINGS != previous.CLASSIFIER_SETTINGS):
+            self.classifier = FileClassifier(config.EXTENSION_MAP, config.CLASSIFIER_SETTINGS)
+        self.rules = config.rule_engine()
+        if config.COMPRESSION_SETTINGS != previous.COMPRESSION_SETTINGS:
+            self._compressor = None
+        if config.TRANSFER_SETTINGS != previous.TRANSFER_SETTINGS:
+            # Süren aktarımlar eski havuzda tamamlanır
+            self.transfers.shutdown(wait=False, interrupt=False)
+            self.transfers = TransferEngine(config.TRANSFER_SETTINGS, self.governor, previous=self.transfers)
+        if config.BASE_DIRS['FILES'] != previous.BASE_DIRS['FILES']:
+            self.index.set_root(config.BASE_DIRS['FILES'])
+            self.lifecycle.index.set_root(config.BASE_DIRS['FILES'])
+        metrics.configure(config.METRICS_SETTINGS)
+        if config.COORDINATION_SETTINGS != previous.COORDINATION_SETTINGS:
+            logging.warning("Coordination settings change takes effect after restart")
+        if config.METRICS_SETTINGS != previous.METRICS_SETTINGS:
+            self.metrics_exporter.stop()
+            self.metrics_exporter = MetricsExporter(config.METRICS_SETTINGS, config.METRICS_PATH)
+            self.metrics_exporter.start()
+        logging.info("Configuration applied")
+
+    def close(self):
+        """
+        Arka plan iş parçacıklarını durdurur ve günlüğü kapatır. Süren
+        aktarımlar bir sonraki parçada durur, yarım kalanlar sonraki açılışta
+        sürdürülür. Kayıt sistemi sürecindir; stop_logging çağıranda kalır.
+        """
+        self.transfers.shutdown()
+        self.governor.stop()
+        self.trash_expiry.stop()
+        self.lifecycle.stop()
+        if self.coordinator is not None:
+            self.coordinator.stop()
+        self.journal.close()
+        self.metrics_exporter.stop()
+
+    def _governor_metrics(self):
+        governor = self.governor
+        return [
+            ('governor_cpu_percent', governor.cpu, {}),
+            ('governor_ram_percent', governor.ram, {}),
+            ('governor_disk_mbps', governor.disk_mbps, {}),
+            ('governor_pressure', governor.pressure, {}),
+            ('governor_paused', int(governor.paused), {}),
+            ('governor_throttled', int(governor.throttled), {}),
+            ('governor_wait_seconds', governor.wait_seconds, {}),
+        ]
+
+    @property
+    def compressor(self):
+        with self._compressor_lock:
+            if self._compressor is None:
+                from compression import CompressionEngine
+                self._compressor = CompressionEngine(
+                    self.config.COMPRESSION_SETTINGS, self.governor, on_archive=self.archives.add_archive
+                )
+            return self._compressor
+
+    @property
+    def archives(self):
+        """Old'daki arşivlerin aranabilir üye kataloğu"""
+        with self._archives_lock:
+            if self._archives is None:
+                from archive_catalog import ArchiveCatalog
+                self._archives = ArchiveCatalog(self.config.ARCHIVE_CATALOG_PATH)
+            return self._archives
+
+    def build_indexes(self):
+        """Arama, arşiv, yinelenen dosya ve çöp indekslerini ilk kullanımda oluşturur"""
+        with metrics.span('build_indexes'):
+            self.index.ensure_built()
+            self.archives.refresh(self.config.BASE_DIRS['OLD'])
+            self.trash_expiry.reconcile()
+            self.dedup.seed(
+                self.config.BASE_DIRS['FILES'] / category
+                for category in self.config.FILE_CATEGORIES
+            )
 
     def can_perform_io(self):
-        cpu_usage = psutil.cpu_percent()
-        ram_usage = psutil.virtual_memory().percent
-        return (cpu_usage < self.config.RESOURCE_LIMITS['MAX_CPU'] and 
-                ram_usage < self.config.RESOURCE_LIMITS['MAX_RAM'])
+        # Anlık değil, yönetici tarafından yumuşatılmış yük kullanılır
+        return self.governor.can_perform_io()
 
-    def categorize_files_in_directory(self, directory=None):
+    def categorize_files_in_directory(self, directory=None, since=None):
         """
         Belirli bir dizindeki tüm dosyaları kategorilere ayırır.
-        Eğer dizin belirtilmezse, Files klasörünü kullanır.
+        Eğer dizin belirtilmezse, Files klasörünü kullanır. since verilirse
+        yalnızca o zamandan sonra değişen ya da dizine gelen (ctime) dosyalar
+        düzenlenir.
+        Dizin tek bir os.scandir geçişiyle okunur ve dosyalar hedef kategoriye
+        göre gruplanır. Aynı aygıttaki taşımalar rename ile yapılır, başka
+        aygıta gidenler aktarım havuzunda paralel kopyalanır ve sonunda
+        hepsinin bitmesi beklenir.
         """
         if directory is None:
             directory = self.config.BASE_DIRS['FILES']
         
         directory = Path(directory)
         
-        files_to_categorize = [
-            f for f in directory.iterdir() 
-            if f.is_file() 
-            and f.parent.name not in self.config.FILE_CATEGORIES
-            and f.name != 'FileOrganizer_Log.txt'  # Exclude log file
-        ]
+        # Kategori dizinlerinin kendisi yeniden düzenlenmez
+        if directory.name in self.config.FILE_CATEGORIES:
+            return
         
-        for file in files_to_categorize:
-            try:
-                self.move_to_category(str(file))
-            except Exception as e:
-                logging.error(f"Kategorilendirme hatası: {file} - {e}")
+        start = time.perf_counter()
+        groups = defaultdict(list)
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if is_log_file(entry.path, self.config.BASE_DIRS['LOG']) or not self.owns(entry.path):
+                    continue
+                try:
+                    # DirEntry tür bilgisini önbellekler; dosya başına tek stat
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if since is not None and max(st.st_mtime, st.st_ctime) < since:
+                    continue
+                # Başka aygıta kopyası süren dosya ikinci kez verilmez
+                if self.transfers.is_transferring(entry.path):
+                    continue
+                category = self._destination(entry.path, st)
+                groups[category].append(Path(entry.path))
+        
+        moved, cross_device = self.categorize_files(groups, f'categorize {directory}')
+        
+        total = sum(len(files) for files in groups.values())
+        elapsed = time.perf_counter() - start
+        metrics.observe('categorize_seconds', elapsed)
+        if total:
+            logging.info(
+                f"Categorized {moved}/{total} files from {directory} in {elapsed:.2f}s "
+                f"({total / elapsed:.0f} files/s, {cross_device} cross-device)",
+                extra={'op': 'categorize', 'path': directory, 'count': moved, 'duration': elapsed}
+            )
+
+    def categorize_files(self, groups, label):
+        """
+        Kategori -> dosya listesi gruplarını tek bir toplu iş olarak taşır ve
+        başka aygıta giden kopyaların bitmesini bekler. (taşınan, başka
+        aygıta kopyalanan) sayılarını döndürür.
+        """
+        moved = []
+        cross_device = []
+        # Niyet kayıtları bu iş parçacığında yazıldığı için havuzdaki
+        # aktarımlar da bu toplu işe aittir
+        with self.journal.batch(label):
+            for category, files in groups.items():
+                for file in files:
+                    pending = self._categorize_one(file, category, moved)
+                    if pending is not None:
+                        cross_device.append(pending)
+        wait_futures(cross_device)
+        
+        self.index.move_many(moved)
+        self.lifecycle.index.touch_many(dest for _, dest in moved)
+        return len(moved), len(cross_device)
+
+    def _categorize_one(self, file, category, moved):
+        """Aktarım havuza verildiyse Future, değilse None döndürür"""
+        try:
+            # list.append iş parçacıkları arasında güvenlidir
+            dest_path, pending = self._place_in_category(
+                file, category, wait=False, then=lambda dest_path: moved.append((file, dest_path))
+            )
+        except FileNotFoundError:
+            # Bu arada izleyici tarafından taşınmış ya da kullanıcı tarafından silinmiş
+            logging.info(f"Skipped, file no longer exists: {file}")
+            return None
+        except Exception as e:
+            logging.error(f"Kategorilendirme hatası: {file} - {e}")
+            self.move_to_trash(file)
+            return None
+        return pending
 
     def move_to_category(self, file_path):
         try:
             file = Path(file_path)
             
-            # Skip log file
-            if file.name == 'FileOrganizer_Log.txt':
+            if is_log_file(file, self.config.BASE_DIRS['LOG']):
                 return
                 
-            file_ext = file.suffix[1:].lower() if file.suffix else ''
-            
-            category = self.config.EXTENSION_MAP.get(file_ext, 'Others')
-            
-            dest_dir = self.config.BASE_DIRS['FILES'] / category
-            
-            dest_path = dest_dir / self._unique_filename(dest_dir, file.name)
+            category = self._destination(str(file))
             
-            shutil.move(str(file), str(dest_path))
-            logging.info(f"Moved {file.name} to {category}")
+            # Başka aygıta kopya havuzda sürer; izleyici işçisi beklemez
+            dest_path, _ = self._place_in_category(file, category, wait=False, then=self.lifecycle.touch)
+            if dest_path is not None:
+                self.index.move(file, dest_path)
+        except FileNotFoundError:
+            # Bu arada başka bir tarama tarafından taşınmış ya da silinmiş
+            logging.info(f"Skipped, file no longer exists: {file_path}")
         except Exception as e:
             logging.error(f"Category move error for {file_path}: {e}")
             self.move_to_trash(file_path)
 
+    def _place_in_category(self, file, category, wait=True, then=None):
+        """
+        Dosyayı kategori dizinine taşır (yinelenen dosya kontrolü dahil).
+        (hedef yol, Future ya da None) döndürür; dosya çöpe gönderildiyse
+        hedef None'dır. wait False ise başka aygıta kopya aktarım havuzunda
+        sürer ve Future döner. then(hedef yol) taşıma başarıyla bitince
+        çağrılır.
+        """
+        if self.transfers.is_transferring(file):
+            logging.info(f"Skipped, transfer already in progress: {file}")
+            return None, None
+        dest_dir = self._category_dir(category)
+        
+        self.governor.acquire()
+        start = time.perf_counter()
+        duplicate, fingerprint = self._find_duplicate(file)
+        size = fingerprint.size if fingerprint is not None else None
+        if duplicate is not None:
+            metrics.inc('duplicates_total', policy=self.config.DEDUP_SETTINGS['POLICY'])
+        if duplicate is not None and self.config.DEDUP_SETTINGS['POLICY'] == 'trash':
+            logging.info(f"Duplicate of {duplicate}, moving to trash: {file.name}",
+                         extra={'op': 'duplicate', 'path': file, 'dest': duplicate, 'bytes': size})
+            self.move_to_trash(file)
+            return None, None
+        
+        op = 'link' if duplicate is not None else 'move'
+
+        def finished():
+            # Kural şablonlu hedeflerde (Images/2024/05) etiket üst kategoridir
+            top_category = category.split(os.sep, 1)[0]
+            metrics.inc('files_moved_total', category=top_category)
+            if size is not None:
+                metrics.inc('bytes_moved_total', size, category=top_category)
+            metrics.observe('move_seconds', time.perf_counter() - start, op=op)
+            if fingerprint is not None:
+                self.dedup.record(dest_path, fingerprint)
+            if then is not None:
+                then(dest_path)
+
+        pending = None
+        dest_path = dest_dir / self._unique_filename(dest_dir, file.name)
+        if duplicate is not None:
+            self._link_duplicate(file, duplicate, dest_path, fingerprint)
+            logging.info(f"Linked duplicate {file.name} to {duplicate} in {category}", extra={
+                'op': op, 'path': file, 'dest': dest_path, 'bytes': size,
+                'duration': time.perf_counter() - start,
+            })
+        else:
+            pending = self._move_file(file, dest_path, wait=wait, then=finished)
+            if pending is None:
+                logging.info(f"Moved {file.name} to {category}", extra={
+                    'op': op, 'path': file, 'dest': dest_path, 'bytes': size,
+                    'duration': time.perf_counter() - start,
+                })
+            else:
+                logging.info(f"Transferring {file.name} to {category} on another device")
+        if duplicate is not None:
+            finished()
+        return dest_path, pending
+
+    def _destination(self, path, st=None):
+        """
+        Files altındaki göreli hedef: önce kullanıcı kuralları (ör.
+        Images/2024/05), uymazsa kategori. Uzantı bilinmiyorsa ya da
+        şüpheliyse içerik başlığına bakılır. Kural değerlendirilemezse de
+        kategoriye dönülür; şablon hatası dosyayı çöpe göndermez.
+        """
+        try:
+            destination = self.rules.destination(path, st, self.classifier)
+        except Exception as e:
+            logging.error(f"Rule evaluation error for {path}, using category: {e}")
+            destination = None
+        if destination is not None:
+            return destination
+        return self.classifier.classify(path, st)
+
+    def _category_dir(self, category):
+        path = self.config.BASE_DIRS['FILES'] / category
+        # Kural şablonlarından gelen alt dizinler ilk kullanımda oluşturulur
+        if category not in self.config.FILE_CATEGORIES:
+            path.mkdir(parents=True, exist_ok=True)
+        return path
+
     def move_to_trash(self, file_path):
         try:
             file = Path(file_path)
-            dest_path = self.config.BASE_DIRS['TRASH'] / self._unique_filename(
-                self.config.BASE_DIRS['TRASH'], file.name
-            )
-            shutil.move(str(file), str(dest_path))
-            logging.info(f"Moved to trash: {file.name}")
+            trash_dir = self.config.BASE_DIRS['TRASH']
+            dest_path = trash_dir / self._unique_filename(trash_dir, file.name)
+
+            def finished():
+                self.trash.record(dest_path)
+                metrics.inc('trash_moved_total')
+                logging.info(f"Moved to trash: {file.name}", extra={'op': 'trash', 'path': file, 'dest': dest_path})
+
+            # Çöp başka aygıttaysa kopya aktarım havuzunda sürer
+            self._move_file(file, dest_path, wait=False, then=finished)
+            self.index.remove(file)
+            self.dedup.remove(file)
         except Exception as e:
             logging.error(f"Trash move error: {e}")
 
+    def _find_duplicate(self, file):
+        if self.config.DEDUP_SETTINGS['POLICY'] == 'off':
+            return None, None
+        try:
+            return self.dedup.find_duplicate(file)
+        except OSError as e:
+            logging.error(f"Duplicate check error for {file}: {e}")
+            return None, None
+
+    def _link_duplicate(self, file, duplicate, dest_path, fingerprint):
+        """Yinelenen dosyayı, mevcut kopyaya sabit bağlantı (hardlink) olarak saklar"""
+        entry = self.journal.intent(file, dest_path)
+        try:
+            os.unlink(dest_path)
+            os.link(duplicate, dest_path)
+        except OSError as e:
+            # Dosya sistemi hardlink desteklemiyorsa normal taşımaya dön
+            self.journal.abort(entry)
+            logging.warning(f"Hardlink failed for {file.name}, moving instead: {e}")
+            self._move_file(file, dest_path)
+            return
+        os.unlink(file)
+        self.journal.done(entry)
+        # Bağlantı mevcut dosyanın inode'unu (ve mtime'ını) paylaşır
+        fingerprint.mtime_ns = os.stat(dest_path).st_mtime_ns
+
     def _unique_filename(self, directory, filename):
-        path = directory / filename
-        counter = 1
-        while path.exists():
-            name, ext = path.stem, path.suffix
-            path = directory / f"{name}_{counter}{ext}"
-            counter += 1
-        return path.name
-
-    def compress_old_files(self, days_threshold=30):
-      try:
-          old_dir = self.config.BASE_DIRS['OLD']
-          current_time = datetime.now()
-
-          existing_rars = list(old_dir.glob('*.rar'))
-          
-          files_to_compress = [
-              f for f in old_dir.iterdir() 
-              if f.is_file() 
-              and (current_time - datetime.fromtimestamp(f.stat().st_mtime)).days > days_threshold 
-              and f not in existing_rars
-          ]
-
-          if not files_to_compress:
-              logging.info("No files to compress in Old folder.")
-              return
-
-          if existing_rars:
-              latest_rar = max(existing_rars, key=lambda x: x.stat().st_mtime)
-          else:
-              latest_rar = old_dir / f'Archived_{current_time.strftime("%Y%m%d_%H%M%S")}.rar'
-
-          winrar_path = r"C:\Program Files\WinRAR\WinRAR.exe"  # Kendi WinRAR yolunuzu ekleyin
-          
-          with zipfile.ZipFile(latest_rar, 'a') as zipf:
-              for file in files_to_compress:
-                  try:
-                      zipf.write(file, arcname=file.name)
-                      file.unlink()  # Orijinal dosyayı sil
-                      logging.info(f"Compressed and removed: {file.name}")
-                  except Exception as e:
-                      logging.error(f"Error compressing {file.name}: {e}")
-
-          logging.info(f"Compression completed. Archive: {latest_rar}")
-
-      except Exception as e:
-          logging.error(f"Compression error: {e}")
+        """
+        Dizinde çakışmayan bir ad döndürür (ad, ad_1, ad_2 ...). Ad, boş bir
+        yer tutucu dosyayla sahiplenilir; _move_file bu dosyanın üzerine yazar.
+        """
+        return self.names.reserve(directory, filename)
 
-    def clean_trash(self):
-        trash_path = self.config.BASE_DIRS['TRASH']
-        now = datetime.now()
+    def _move_file(self, src_path, dest_path, wait=True, then=None):
+        """
+        Aynı aygıtta rename; başka aygıtta TransferEngine ile doğrulanmış
+        kopya. wait False ise kopya havuzda sürer ve Future döner, aksi
+        halde (ya da rename yettiyse) None döner. then() taşıma başarıyla
+        günlüğe işlendikten sonra, Future tamamlanmadan önce çağrılır.
+        """
+        # Niyet taşımadan önce günlüğe yazılır; çökme sonrası recover_journal tamamlar
+        entry = self.journal.intent(src_path, dest_path)
+        try:
+            # Aynı aygıtta atomik; Windows'ta da yer tutucunun üzerine yazar
+            if self.transfers.rename(src_path, dest_path):
+                self.journal.done(entry)
+                if then is not None:
+                    then()
+                return None
+        except OSError:
+            self.journal.abort(entry)
+            self.names.release(dest_path.parent, dest_path.name)
+            raise
+
+        metrics.inc('cross_device_moves_total')
+        if wait:
+            try:
+                self.transfers.copy_move(src_path, dest_path)
+            except Exception:
+                self.journal.abort(entry)
+                self.names.release(dest_path.parent, dest_path.name)
+                raise
+            self.journal.done(entry)
+            if then is not None:
+                then()
+            return None
+
+        try:
+            return self.transfers.submit(
+                src_path, dest_path,
+                lambda error: self._finish_transfer(entry, src_path, dest_path, error, then)
+            )
+        except Exception:
+            self.journal.abort(entry)
+            self.names.release(dest_path.parent, dest_path.name)
+            raise
+
+    def _finish_transfer(self, entry, src_path, dest_path, error, then):
+        if error is None:
+            self.journal.done(entry)
+            if then is not None:
+                try:
+                    then()
+                except Exception as e:
+                    logging.error(f"Post-transfer bookkeeping error for {dest_path}: {e}")
+            return
+        # Kaynak yerinde kalır; yarım kopya bir sonraki denemede sürdürülür
+        self.journal.abort(entry)
+        self.names.release(dest_path.parent, dest_path.name)
+        self.index.move(dest_path, src_path)
+        logging.error(f"Transfer failed, source kept: {src_path} -> {dest_path}: {error}")
+
+    def recover_journal(self):
+        """
+        Önceki çalışmada yarım kalan taşımaları tamamlar ya da geri sarar.
+        Hedef ad NameRegistry ile sahiplenildiği için hedefteki dosya bize
+        aittir: kaynak hâlâ duruyorsa hedef (yer tutucu ya da yarım kopya)
+        silinir, kaynak yoksa taşıma tamamlanmış sayılır.
+        """
+        for entry, src, dst in self.journal.pending():
+            src_path, dest_path = Path(src), Path(dst)
+            try:
+                if src_path.exists():
+                    if dest_path.exists():
+                        os.unlink(dest_path)
+                    self.journal.abort(entry)
+                    logging.info(f"Rolled back interrupted move: {src_path.name}")
+                elif dest_path.exists():
+                    self.journal.done(entry)
+                    self.transfers.discard_partial(src_path, dest_path.parent)
+                    self.index.move(src_path, dest_path)
+                    if dest_path.parent == self.config.BASE_DIRS['TRASH']:
+                        self.trash.record(dest_path)
+                    logging.info(f"Completed interrupted move: {src_path.name} -> {dest_path}")
+                else:
+                    self.journal.abort(entry)
+                    logging.error(f"Interrupted move lost both paths: {src_path} -> {dest_path}")
+            except OSError as e:
+                logging.error(f"Journal recovery error for {src_path}: {e}")
+
+    def undo_batch(self, batch_id=None):
+        """
+        Bir toplu işin taşımalarını günlükten ters sırayla geri alır (dizin
+        taraması yapılmaz). batch_id verilmezse geri alınmamış son toplu iş.
+        Geri alma da günlüğe kendi toplu işi olarak yazılır. Geri alınan
+        dosya sayısını döndürür.
+        """
+        if batch_id is None:
+            batch_id = self.journal.last_batch()
+            if batch_id is None:
+                return 0
         
-        for file in trash_path.iterdir():
-            if now - datetime.fromtimestamp(file.stat().st_mtime) > timedelta(days=1):
+        restored = 0
+        with self.journal.batch(f'undo {batch_id}', undo_of=batch_id):
+            for src, dst in self.journal.batch_moves(batch_id):
+                src_path, dest_path = Path(src), Path(dst)
+                if not dest_path.exists():
+                    logging.warning(f"Undo skipped, file no longer exists: {dest_path}")
+                    continue
                 try:
-                    file.unlink() if file.is_file() else shutil.rmtree(file)
+                    self.governor.acquire()
+                    src_path.parent.mkdir(parents=True, exist_ok=True)
+                    # Eski ad bu arada alındıysa ad_1, ad_2 ... kullanılır
+                    target = src_path.parent / self._unique_filename(src_path.parent, src_path.name)
+                    self._hold_restored(target)
+                    self._move_file(dest_path, target)
+                    self.index.move(dest_path, target)
+                    self.lifecycle.touch(target)
+                    self.dedup.remove(dest_path)
+                    self.trash.remove(dest_path)
+                    restored += 1
                 except Exception as e:
-                    logging.error(f"Trash cleanup error: {e}")
+                    logging.error(f"Undo error for {dest_path}: {e}")
+        
+        self.journal.mark_undone(batch_id)
+        metrics.inc('undo_files_total', restored)
+        logging.info(f"Undid batch {batch_id}: {restored} files restored",
+                     extra={'op': 'undo', 'count': restored})
+        return restored
+
+    def _hold_restored(self, path):
+        # En az bir izleyici karşılaştırması dosyayı bu süre içinde görür ve
+        # anlık görüntüye kaydeder; sonrasında yalnızca değişirse yeniden gelir
+        settings = self.config.WATCHER_SETTINGS
+        hold = 2 * (settings['RECONCILE_INTERVAL'] + settings['SETTLE_SECONDS'] + settings['RECONCILE_GRACE'])
+        now = time.monotonic()
+        with self._restored_lock:
+            for expired in [p for p, until in self.restored.items() if until <= now]:
+                del self.restored[expired]
+            self.restored[str(path)] = now + hold
+
+    def is_restored(self, path):
+        """Dosya yakın zamanda geri alma ile mi geldi (izleyici düzenlemez)"""
+        path = str(path)
+        with self._restored_lock:
+            until = self.restored.get(path)
+            if until is None:
+                return False
+            if until <= time.monotonic():
+                del self.restored[path]
+                return False
+            return True
 
-class FileWatcher(FileSystemEventHandler):
-    def __init__(self, file_manager):
-        self.file_manager = file_manager
+    def move_to_old(self, files):
+        """
+        Yaşı dolan dosyaları tek bir toplu iş olarak Old'a taşır (geri
+        alınabilir). Başarıyla taşınan (kaynak, hedef) çiftlerini döndürür.
+        """
+        old_dir = self.config.BASE_DIRS['OLD']
+        moved = []
+        pending = []
+        with self.journal.batch(f'lifecycle {len(files)} files'):
+            for file in files:
+                self.governor.acquire()
+                try:
+                    dest_path = old_dir / self._unique_filename(old_dir, file.name)
+                    # list.append iş parçacıkları arasında güvenlidir
+                    future = self._move_file(
+                        file, dest_path, wait=False,
+                        then=lambda file=file, dest_path=dest_path: moved.append((file, dest_path))
+                    )
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logging.error(f"Lifecycle move error for {file}: {e}")
+                    continue
+                if future is not None:
+                    pending.append(future)
+        wait_futures(pending)
 
-    def on_created(self, event):
-        if not event.is_directory:
-            self.file_manager.move_to_category(event.src_path)
+        self.index.move_many(moved)
+        for file, dest_path in moved:
+            self.dedup.remove(file)
+            logging.debug(f"Aged out to Old: {file.name}", extra={'op': 'age', 'path': file, 'dest': dest_path})
+        return moved
+
+    def age_files(self):
+        """Yaşam döngüsü taramasını arka plan işçisinde hemen başlatır"""
+        self.lifecycle.trigger()
+
+    def compress_old_files(self, days_threshold=COMPRESS_AFTER_DAYS):
+        if not self.is_leader():
+            logging.info("Compression skipped, another instance holds the maintenance lease")
+            return
+        try:
+            with metrics.span('compress'):
+                self.compressor.compress_directory(self.config.BASE_DIRS['OLD'], days_threshold)
+        except Exception as e:
+            logging.error(f"Compression error: {e}")
+
+    def clean_trash(self):
+        """
+        Süresi dolan çöp öğelerinin silinmesini arka plan işçisine bırakır.
+        Çöp dizini taranmaz; yalnızca geliş indeksinde süresi dolanlar silinir.
+        Silinen adlar tekrar kullanılabilsin diye ad kaydı işçide yenilenir.
+        """
+        self.trash_expiry.trigger()
 
 def main():
-    config = Config()
-    file_manager = FileManager(config)
-    
-    file_manager.categorize_files_in_directory()
-    
-    file_manager.compress_old_files()
-    file_manager.clean_trash()
-
-    observer = Observer()
-    observer.schedule(
-        FileWatcher(file_manager), 
-        str(config.BASE_DIRS['FILES']), 
-        recursive=False
-    )
-    
-    try:
-        observer.start()
-        observer.join()
-    except KeyboardInterrupt:
-        observer.stop()
-    
-    observer.join()
+    # Başsız çalışma daemon.py'de: izleme hemen başlar, birikmiş iş arka planda yapılır
+    from daemon import main as daemon_main
+    return daemon_main()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
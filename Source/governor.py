@@ -0,0 +1,196 @@
+# governor.py
+import time
+import threading
+import logging
+
+import psutil
+
+
+class TokenBucket:
+    """Saniyede rate kadar jeton üreten, en fazla capacity jeton biriktiren kova"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self, amount):
+        """Jeton yeterliyse alır ve 0 döndürür; değilse beklenmesi gereken süreyi döndürür"""
+        self._refill()
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        if self.rate <= 0:
+            return None
+        return (amount - self.tokens) / self.rate
+
+
+class ResourceGovernor:
+    """
+    CPU, RAM ve disk G/Ç kullanımını arka planda örnekler, yumuşatılmış
+    (EWMA) bir yük tahmini tutar ve taşıma, sıkıştırma ve temizlik
+    işçilerine yüke göre hızı ayarlanan bir jeton kovası sunar. Yük
+    limitlerin THROTTLE_START oranının altındayken işçiler serbesttir,
+    limitler aşıldığında duraklatılır.
+    """
+
+    def __init__(self, limits, settings):
+        # Yapılandırma anlık görüntüsündeki salt okunur RESOURCE_LIMITS; ayarlar
+        # değişince apply_config yenisini atar, bir sonraki örneklemede geçerli olur
+        self.limits = limits
+        self.sample_interval = settings['SAMPLE_INTERVAL']
+        self.smoothing = settings['SMOOTHING']
+        self.max_rate = settings['MAX_OPS_PER_SEC']
+        self.min_rate = settings['MIN_OPS_PER_SEC']
+        self.max_pause = settings['MAX_PAUSE_SECONDS']
+        self.throttle_start = settings['THROTTLE_START']
+
+        self._bucket = TokenBucket(self.max_rate, max(1, self.max_rate))
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+
+        self.cpu = 0.0
+        self.ram = 0.0
+        self.disk_mbps = 0.0
+        self.pressure = 0.0
+        self.paused = False
+        self.throttled = False
+        # Süren duraklamanın başladığı an; MAX_PAUSE_SECONDS tüm işçiler için buradan sayılır
+        self._paused_since = None
+        self.tokens_used = 0
+        self.wait_seconds = 0.0
+
+        self._last_disk = None
+        self._thread = threading.Thread(target=self._run, name='resource-governor', daemon=True)
+
+    def start(self):
+        # İlk cpu_percent çağrısı anlamsız 0.0 döndürür; ölçüm penceresini başlatır
+        psutil.cpu_percent(interval=None)
+        self._last_disk = self._disk_bytes()
+        self.ram = psutil.virtual_memory().percent
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def _disk_bytes(self):
+        try:
+            counters = psutil.disk_io_counters()
+        except Exception:
+            counters = None
+        if counters is None:
+            return None
+        return time.monotonic(), counters.read_bytes + counters.write_bytes
+
+    def _run(self):
+        while not self._stopping.wait(self.sample_interval):
+            try:
+                self._sample()
+            except Exception as e:
+                logging.error(f"Resource sampling error: {e}")
+
+    def _smooth(self, previous, value):
+        return previous + self.smoothing * (value - previous)
+
+    def _sample(self):
+        cpu = psutil.cpu_percent(interval=None)
+        ram = psutil.virtual_memory().percent
+        disk = self._disk_bytes()
+        disk_mbps = 0.0
+        if disk is not None and self._last_disk is not None:
+            elapsed = disk[0] - self._last_disk[0]
+            if elapsed > 0:
+                disk_mbps = (disk[1] - self._last_disk[1]) / elapsed / (1024 * 1024)
+        self._last_disk = disk
+
+        self.cpu = self._smooth(self.cpu, cpu)
+        self.ram = self._smooth(self.ram, ram)
+        self.disk_mbps = self._smooth(self.disk_mbps, disk_mbps)
+        self._update_rate()
+
+    def _update_rate(self):
+        pressures = [
+            self.cpu / max(1, self.limits['MAX_CPU']),
+            self.ram / max(1, self.limits['MAX_RAM']),
+        ]
+        max_disk = self.limits.get('MAX_DISK_MBPS', 0)
+        if max_disk:
+            pressures.append(self.disk_mbps / max_disk)
+        pressure = max(pressures)
+
+        with self._condition:
+            was_paused = self.paused
+            self.pressure = pressure
+            self.paused = pressure >= 1.0
+            self.throttled = pressure >= self.throttle_start
+            if self.paused and not was_paused:
+                self._paused_since = time.monotonic()
+            elif not self.paused:
+                self._paused_since = None
+            if self.paused:
+                # MAX_PAUSE_SECONDS dolduğunda en düşük hızla devam edilir
+                self._bucket.rate = self.min_rate
+            elif self.throttled:
+                # Yük THROTTLE_START'tan limite doğru çıktıkça hız doğrusal düşer
+                headroom = (1.0 - pressure) / (1.0 - self.throttle_start)
+                self._bucket.rate = max(self.min_rate, self.max_rate * headroom)
+            self._condition.notify_all()
+
+        if self.paused != was_paused:
+            logging.info(
+                f"Resource governor {'paused' if self.paused else 'resumed'}: "
+                f"CPU {self.cpu:.0f}%, RAM {self.ram:.0f}%, disk {self.disk_mbps:.1f} MB/s"
+            )
+
+    def can_perform_io(self):
+        return not self.paused
+
+    def acquire(self, amount=1):
+        """
+        İşçi her G/Ç işleminden önce çağırır. Limitler aşılmışsa duraklama
+        en fazla MAX_PAUSE_SECONDS sürer (kaynak hiç düşmezse işler tamamen
+        durmasın diye), sonra o anki hıza göre jeton alır. Süre çağrı başına
+        değil duraklamanın başından sayılır; uzun süren aşırı yükte işler
+        MIN_OPS_PER_SEC hızıyla sürer.
+        """
+        start = time.monotonic()
+        with self._condition:
+            while self.paused and not self._stopping.is_set():
+                deadline = (self._paused_since or start) + self.max_pause
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            while self.throttled and not self._stopping.is_set():
+                delay = self._bucket.try_take(amount)
+                if delay == 0.0:
+                    break
+                if delay is None:
+                    delay = 1.0 / max(self.min_rate, 1)
+                self._condition.wait(delay)
+
+            self.tokens_used += amount
+            self.wait_seconds += time.monotonic() - start
+
+    def state(self):
+        with self._condition:
+            return {
+                'cpu': round(self.cpu, 1),
+                'ram': round(self.ram, 1),
+                'disk_mbps': round(self.disk_mbps, 2),
+                'pressure': round(self.pressure, 2),
+                'paused': self.paused,
+                'throttled': self.throttled,
+                'rate': round(self._bucket.rate, 1),
+                'tokens_used': self.tokens_used,
+                'wait_seconds': round(self.wait_seconds, 2),
+            }
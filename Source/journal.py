@@ -0,0 +1,313 @@
+# journal.py
+import os
+import json
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class _Batch:
+    __slots__ = ('id', 'label', 'time', 'moves', 'undone', 'undo_of')
+
+    def __init__(self, batch_id, label, timestamp, undo_of=None):
+        self.id = batch_id
+        self.label = label
+        self.time = timestamp
+        # Tamamlanan taşımalar sırayla: (kayıt no, kaynak, hedef)
+        self.moves = []
+        self.undone = False
+        # Geri alma toplu işiyse geri aldığı işin numarası
+        self.undo_of = undo_of
+
+    def record(self):
+        record = {'op': 'batch', 'batch': self.id, 'label': self.label, 'time': self.time}
+        if self.undo_of is not None:
+            record['undo_of'] = self.undo_of
+        return record
+
+
+class MoveJournal:
+    """
+    Taşıma işlemleri için yalnızca sona eklenen (append-only) JSONL günlüğü.
+    Her taşımadan önce bir niyet ("intent"), sonra "done" ya da "abort"
+    kaydı yazılır. Kayıtlar her yazımda işletim sistemine aktarılır
+    (süreç çökmesine dayanıklı); fsync ise FSYNC_BATCH kayıtta bir ya da
+    FSYNC_INTERVAL saniyede bir toplu yapılır.
+
+    Taşımalar toplu işlere (batch) ayrılır; bir toplu işin tamamı günlük
+    ters sırayla oynatılarak, dizinler yeniden taranmadan geri alınabilir.
+    Toplu iş dışındaki taşımalar (izleyici) bir oturum işine yazılır; bu iş
+    SESSION_IDLE_SECONDS boşluktan, SESSION_MAX_SECONDS süreden ya da
+    SESSION_MAX_MOVES taşımadan sonra yenisiyle değiştirilir. Böylece tek
+    bir geri alma en fazla yakın zamandaki bir oturumu geri çevirir.
+    """
+
+    def __init__(self, path, settings):
+        self.path = Path(path)
+        self.fsync_interval = settings['FSYNC_INTERVAL']
+        self.fsync_batch = settings['FSYNC_BATCH']
+        self.max_bytes = settings['MAX_MB'] * 1024 * 1024
+        self.keep_batches = settings['KEEP_BATCHES']
+        self.session_idle = settings['SESSION_IDLE_SECONDS']
+        self.session_max_age = settings['SESSION_MAX_SECONDS']
+        self.session_max_moves = settings['SESSION_MAX_MOVES']
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._batches = {}
+        self._pending = {}
+        self._next_id = 1
+        self._next_batch = 1
+        self._session_batch = None
+        self._session_used = 0.0
+        self._unsynced = 0
+        self._file = None
+        # Günlük bu boyutu aşınca yazım sırasında sıkıştırılır; sıkıştırma sonrası
+        # hâlâ büyükse eşik iki katına çıkar, her yazımda yeniden sıkıştırılmaz
+        self._compact_at = self.max_bytes
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._load()
+        if self.path.exists() and self.path.stat().st_size > self.max_bytes:
+            self._compact()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+        self._stopping = threading.Event()
+        self._flusher = threading.Thread(target=self._run_flusher, name='journal-fsync', daemon=True)
+        self._flusher.start()
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        # Çökme sırasında yarım kalmış son satır atılır
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            logging.warning(f"Journal had a torn tail, truncating {len(data) - end} bytes")
+            with open(self.path, 'r+b') as f:
+                f.truncate(end)
+
+        for line in data[:end].splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError) as e:
+                logging.error(f"Skipping bad journal record: {e}")
+
+    def _apply(self, record):
+        op = record['op']
+        if op == 'batch':
+            batch_id = record['batch']
+            self._batches[batch_id] = _Batch(batch_id, record['label'], record['time'], record.get('undo_of'))
+            self._next_batch = max(self._next_batch, batch_id + 1)
+        elif op == 'intent':
+            self._pending[record['id']] = (record['batch'], record['src'], record['dst'])
+            self._next_id = max(self._next_id, record['id'] + 1)
+        elif op == 'done':
+            intent = self._pending.pop(record['id'], None)
+            if intent is not None and intent[0] in self._batches:
+                self._batches[intent[0]].moves.append((record['id'], intent[1], intent[2]))
+        elif op == 'abort':
+            self._pending.pop(record['id'], None)
+        elif op == 'undone':
+            if record['batch'] in self._batches:
+                self._batches[record['batch']].undone = True
+
+    def _compact(self):
+        """
+        Yalnızca son KEEP_BATCHES toplu işi ve bekleyen niyetleri tutarak
+        günlüğü yeniden yazar. Açık günlük dosyası varsa _lock tutulurken
+        çağrılır; dosya kapatılıp yeni günlük yeniden açılır.
+        """
+        keep = sorted(self._batches)[-self.keep_batches:]
+        kept_ids = set(keep)
+        records = []
+        for batch_id in keep:
+            batch = self._batches[batch_id]
+            records.append(batch.record())
+            for entry_id, src, dst in batch.moves:
+                records.append({'op': 'intent', 'id': entry_id, 'batch': batch.id, 'src': src, 'dst': dst})
+                records.append({'op': 'done', 'id': entry_id})
+            if batch.undone:
+                records.append({'op': 'undone', 'batch': batch.id})
+        for entry_id, (batch_id, src, dst) in self._pending.items():
+            # Toplu iş kaydı olmayan niyet (kesilmiş ya da elle düzenlenmiş günlük)
+            # yine de tutulur; kurtarma yalnızca niyete bakar
+            if batch_id not in kept_ids and batch_id in self._batches:
+                kept_ids.add(batch_id)
+                records.append(self._batches[batch_id].record())
+            records.append({'op': 'intent', 'id': entry_id, 'batch': batch_id, 'src': src, 'dst': dst})
+
+        temp_path = self.path.with_suffix('.compact')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        reopen = self._file is not None
+        if reopen:
+            # Windows'ta açık dosyanın üzerine os.replace yapılamaz
+            self._file.close()
+        try:
+            os.replace(temp_path, self.path)
+        finally:
+            if reopen:
+                self._file = open(self.path, 'a', encoding='utf-8')
+                self._unsynced = 0
+        self._batches = {batch_id: self._batches[batch_id] for batch_id in sorted(kept_ids)}
+        self._compact_at = max(self.max_bytes, size * 2)
+        logging.info(f"Journal compacted to {len(self._batches)} batches")
+
+    def _append(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._file.write(line)
+            # Kayıt işletim sistemine geçer; disk senkronu toplu yapılır
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_batch:
+                self._sync_locked()
+            if self._file.tell() > self._compact_at:
+                # Uzun süre çalışan süreçte günlük MAX_MB'ı aşmasın
+                try:
+                    self._compact()
+                except OSError as e:
+                    self._compact_at *= 2
+                    logging.error(f"Journal compaction error: {e}")
+
+    def _sync_locked(self):
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def _run_flusher(self):
+        while not self._stopping.wait(self.fsync_interval):
+            try:
+                with self._lock:
+                    self._sync_locked()
+            except (OSError, ValueError) as e:
+                logging.error(f"Journal fsync error: {e}")
+
+    def close(self):
+        self._stopping.set()
+        with self._lock:
+            if not self._file.closed:
+                self._sync_locked()
+                self._file.close()
+
+    def begin_batch(self, label, undo_of=None):
+        with self._lock:
+            batch_id = self._next_batch
+            self._next_batch += 1
+            batch = _Batch(batch_id, label, time.time(), undo_of)
+            self._batches[batch_id] = batch
+        self._append(batch.record())
+        return batch_id
+
+    @contextmanager
+    def batch(self, label, undo_of=None):
+        """
+        Bu iş parçacığındaki taşımaları yeni bir toplu işe toplar. undo_of
+        verilirse iş o toplu işin geri alınmasıdır; last_batch() onu atlar.
+        """
+        with self.in_batch(self.begin_batch(label, undo_of)) as batch_id:
+            yield batch_id
+
+    @contextmanager
+    def in_batch(self, batch_id):
+        """Var olan bir toplu işe katılır (ör. havuz iş parçacıklarından)"""
+        previous = getattr(self._local, 'batch', None)
+        self._local.batch = batch_id
+        try:
+            yield batch_id
+        finally:
+            self._local.batch = previous
+
+    def current_batch(self):
+        batch_id = getattr(self._local, 'batch', None)
+        if batch_id is not None:
+            return batch_id
+        # Toplu iş dışındaki taşımalar (izleyici) süresi dolana kadar aynı oturum işine yazılır
+        now = time.time()
+        with self._lock:
+            session = self._batches.get(self._session_batch)
+            if session is not None and not self._session_expired(session, now):
+                self._session_used = now
+                return session.id
+            self._session_batch = None
+        session_batch = self.begin_batch('watch')
+        with self._lock:
+            if self._session_batch is None:
+                self._session_batch = session_batch
+                self._session_used = now
+            return self._session_batch
+
+    def _session_expired(self, session, now):
+        return (
+            session.undone
+            or now - self._session_used >= self.session_idle
+            or now - session.time >= self.session_max_age
+            or len(session.moves) >= self.session_max_moves
+        )
+
+    def intent(self, src, dst):
+        """Taşımadan önce çağrılır; done/abort için kayıt numarası döndürür"""
+        batch_id = self.current_batch()
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._pending[entry_id] = (batch_id, str(src), str(dst))
+        self._append({'op': 'intent', 'id': entry_id, 'batch': batch_id, 'src': str(src), 'dst': str(dst)})
+        return entry_id
+
+    def done(self, entry_id):
+        with self._lock:
+            intent = self._pending.pop(entry_id, None)
+            if intent is not None and intent[0] in self._batches:
+                self._batches[intent[0]].moves.append((entry_id, intent[1], intent[2]))
+        self._append({'op': 'done', 'id': entry_id})
+
+    def abort(self, entry_id):
+        with self._lock:
+            self._pending.pop(entry_id, None)
+        self._append({'op': 'abort', 'id': entry_id})
+
+    def pending(self):
+        """Sonucu yazılmamış niyetler: (kayıt no, kaynak, hedef)"""
+        with self._lock:
+            return [(entry_id, src, dst) for entry_id, (_, src, dst) in sorted(self._pending.items())]
+
+    def batches(self):
+        """(no, etiket, zaman, taşıma sayısı, geri alındı mı) listesi, eskiden yeniye"""
+        with self._lock:
+            return [
+                (batch.id, batch.label, batch.time, len(batch.moves), batch.undone)
+                for batch in self._batches.values()
+            ]
+
+    def last_batch(self):
+        """Geri alınmamış, taşıma içeren en son toplu işin numarası (geri alma işleri hariç)"""
+        with self._lock:
+            for batch_id in sorted(self._batches, reverse=True):
+                batch = self._batches[batch_id]
+                if batch.moves and not batch.undone and batch.undo_of is None:
+                    return batch_id
+        return None
+
+    def batch_moves(self, batch_id):
+        """Toplu işin tamamlanan taşımaları, geri alma için ters sırada"""
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                raise KeyError(f"Unknown journal batch: {batch_id}")
+            return [(src, dst) for _, src, dst in reversed(batch.moves)]
+
+    def mark_undone(self, batch_id):
+        with self._lock:
+            self._batches[batch_id].undone = True
+        self._append({'op': 'undone', 'batch': batch_id})
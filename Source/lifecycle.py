@@ -0,0 +1,401 @@
+# lifecycle.py
+import os
+import time
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+
+import metrics
+from transfer import PART_PREFIX
+
+
+def last_seen(st):
+    """Erişim, içerik ya da konum değişikliğinin (ctime: taşıma, yeniden adlandırma) en yenisi"""
+    return max(st.st_atime, st.st_mtime, st.st_ctime)
+
+
+class LifecycleIndex:
+    """
+    Files/<kategori> altındaki her dosyanın son görülme zamanını tutan
+    kalıcı indeks. Düzenleyicinin kendi taşımaları touch() ile hemen
+    işlenir; dışarıdan yapılan değişiklikler refresh() ile, FileIndex'te
+    olduğu gibi yalnızca mtime'ı değişen dizinler listelenerek yakalanır.
+    (category, last_seen) indeksi sayesinde yaşı dolan dosyalar ağaç
+    dolaşılmadan, en eskiden başlayarak okunur.
+    """
+
+    SCHEMA_VERSION = '1'
+
+    # Bu süreden daha yeni dizin mtime'ları kaydedilmez; aynı zaman
+    # diliminde yapılan değişiklikler bir sonraki refresh'te yakalanır
+    MTIME_GRACE_NS = 2 * 1_000_000_000
+
+    def __init__(self, db_path, root):
+        self.db_path = Path(db_path)
+        self.root = Path(root)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._create_schema()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            meta = dict(conn.execute('SELECT key, value FROM meta'))
+
+            # Şema ya da kök dizin değiştiyse indeks bir sonraki refresh'te baştan kurulur
+            if (meta.get('version') != self.SCHEMA_VERSION
+                    or meta.get('root') != str(self.root)):
+                self._reset(conn)
+
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    dir TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    last_seen REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS files_dir ON files (dir)')
+            conn.execute('CREATE INDEX IF NOT EXISTS files_due ON files (category, last_seen)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS dirs (
+                    path TEXT PRIMARY KEY,
+                    parent TEXT,
+                    mtime INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent)')
+
+    def _reset(self, conn):
+        conn.execute('DROP TABLE IF EXISTS files')
+        conn.execute('DROP TABLE IF EXISTS dirs')
+        conn.execute('DELETE FROM meta')
+        conn.executemany('INSERT INTO meta (key, value) VALUES (?, ?)', [
+            ('version', self.SCHEMA_VERSION),
+            ('root', str(self.root)),
+        ])
+
+    def set_root(self, root):
+        """Files dizini değiştiğinde eski kökün kayıtları bırakılır"""
+        root = Path(root)
+        if root == self.root:
+            return
+        try:
+            with self._write_lock:
+                self.root = root
+                conn = self._connect()
+                with conn:
+                    self._reset(conn)
+            self._create_schema()
+        except sqlite3.Error as e:
+            logging.error(f"Lifecycle index root change error: {e}")
+
+    def category_of(self, path):
+        """Files/<kategori>/... altındaki dosyanın kategorisi; Files'ın kendisindeyse None"""
+        try:
+            parts = Path(path).relative_to(self.root).parts
+        except ValueError:
+            return None
+        return parts[0] if len(parts) > 1 else None
+
+    def touch(self, path, seen=None):
+        self.touch_many([path], seen)
+
+    def touch_many(self, paths, seen=None):
+        """Dosyaları görülmüş sayar (varsayılan: şimdi); daha yeni bir zaman geri alınmaz"""
+        seen = time.time() if seen is None else seen
+        rows = []
+        for path in paths:
+            category = self.category_of(path)
+            if category is not None:
+                rows.append((str(path), os.path.dirname(str(path)), category, seen))
+        if not rows:
+            return
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        'INSERT INTO files (path, dir, category, last_seen) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT(path) DO UPDATE SET last_seen = max(last_seen, excluded.last_seen)',
+                        rows
+                    )
+        except sqlite3.Error as e:
+            logging.error(f"Lifecycle index update error: {e}")
+
+    def update_seen(self, rows):
+        """(yol, son görülme) çiftlerini yazar"""
+        if not rows:
+            return
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        'UPDATE files SET last_seen = ? WHERE path = ?',
+                        [(seen, str(path)) for path, seen in rows]
+                    )
+        except sqlite3.Error as e:
+            logging.error(f"Lifecycle index update error: {e}")
+
+    def remove_many(self, paths):
+        if not paths:
+            return
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany('DELETE FROM files WHERE path = ?', [(str(path),) for path in paths])
+        except sqlite3.Error as e:
+            logging.error(f"Lifecycle index remove error: {e}")
+
+    def categories(self):
+        return [row[0] for row in self._connect().execute('SELECT DISTINCT category FROM files')]
+
+    def due(self, category, cutoff, limit):
+        """Kategoride cutoff'tan beri görülmemiş en eski limit kadar dosyanın yolu"""
+        rows = self._connect().execute(
+            'SELECT path FROM files WHERE category = ? AND last_seen < ? ORDER BY last_seen LIMIT ?',
+            (category, cutoff, limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def refresh(self):
+        """
+        İndeksi disk ile eşitler. Sadece mtime'ı değişen dizinler taranır;
+        değişmeyen bir dizin için tek bir stat çağrısı yapılır. Yeni bulunan
+        dosyanın son görülme zamanı kendi stat bilgisinden alınır.
+        """
+        start = time.perf_counter()
+        scanned = 0
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    known = dict(conn.execute('SELECT path, mtime FROM dirs'))
+                    stack = [(str(self.root), None)]
+                    while stack:
+                        directory, parent = stack.pop()
+                        try:
+                            mtime = os.stat(directory).st_mtime_ns
+                        except OSError:
+                            self._drop_tree(conn, directory)
+                            continue
+
+                        if known.get(directory) == mtime:
+                            stack.extend(
+                                (sub, directory) for (sub,) in conn.execute(
+                                    'SELECT path FROM dirs WHERE parent = ?', (directory,)
+                                )
+                            )
+                            continue
+
+                        try:
+                            subdirs = self._rescan_dir(conn, directory)
+                        except OSError as e:
+                            logging.error(f"Lifecycle scan error for {directory}: {e}")
+                            continue
+
+                        scanned += 1
+                        stack.extend((sub, directory) for sub in subdirs)
+                        if time.time_ns() - mtime < self.MTIME_GRACE_NS:
+                            mtime = 0
+                        conn.execute(
+                            'INSERT INTO dirs (path, parent, mtime) VALUES (?, ?, ?) '
+                            'ON CONFLICT(path) DO UPDATE SET parent = excluded.parent, mtime = excluded.mtime',
+                            (directory, parent, mtime)
+                        )
+            logging.info(
+                f"Lifecycle index refreshed: {scanned} directories rescanned "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+        except sqlite3.Error as e:
+            logging.error(f"Lifecycle index refresh error: {e}")
+
+    def _rescan_dir(self, conn, directory):
+        # Files kökündeki dosyalar henüz düzenlenmemiştir; yalnızca kategori dizinleri izlenir
+        category = self.category_of(os.path.join(directory, '_'))
+        files = {}
+        subdirs = set()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.add(entry.path)
+                    elif category is not None and entry.is_file() and not entry.name.startswith(PART_PREFIX):
+                        files[entry.name] = entry
+                except OSError:
+                    continue
+
+        indexed = {
+            os.path.basename(path)
+            for (path,) in conn.execute('SELECT path FROM files WHERE dir = ?', (directory,))
+        }
+        removed = indexed - files.keys()
+        if removed:
+            conn.executemany(
+                'DELETE FROM files WHERE path = ?',
+                [(os.path.join(directory, name),) for name in removed]
+            )
+        rows = []
+        for name in files.keys() - indexed:
+            try:
+                rows.append((files[name].path, directory, category, last_seen(files[name].stat())))
+            except OSError:
+                continue
+        conn.executemany(
+            'INSERT OR IGNORE INTO files (path, dir, category, last_seen) VALUES (?, ?, ?, ?)', rows
+        )
+
+        known_subdirs = {sub for (sub,) in conn.execute('SELECT path FROM dirs WHERE parent = ?', (directory,))}
+        for sub in known_subdirs - subdirs:
+            self._drop_tree(conn, sub)
+        return subdirs
+
+    def _drop_tree(self, conn, path):
+        prefix = path + os.sep
+        conn.execute(
+            'DELETE FROM files WHERE dir = ? OR substr(dir, 1, ?) = ?',
+            (path, len(prefix), prefix)
+        )
+        conn.execute(
+            'DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?',
+            (path, len(prefix), prefix)
+        )
+
+
+class LifecycleManager:
+    """
+    Files'taki dosyaları yaşlandırıp Old'a gönderir. SCAN_INTERVAL'da bir
+    (ilk kez START_DELAY sonra) indeksi artımlı olarak tazeler ve her
+    kategoride eşiği (LIFECYCLE_AGE_DAYS, yoksa DEFAULT_DAYS; 0 hiçbir
+    zaman) aşan dosyaları en eskiden başlayarak BATCH_SIZE'lık toplu
+    işlerle Old'a taşır. Aday taşınmadan önce yeniden stat edilir; bu
+    arada erişilmişse yalnızca zamanı güncellenir. Taşıma olduysa Old
+    sıkıştırması aynı iş parçacığında başlatılır.
+    """
+
+    def __init__(self, file_manager):
+        self.file_manager = file_manager
+        self.index = LifecycleIndex(file_manager.config.LIFECYCLE_PATH, file_manager.config.BASE_DIRS['FILES'])
+        self.aged = 0
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='lifecycle', daemon=True)
+
+    @property
+    def config(self):
+        # Eşikler her turda güncel yapılandırma anlık görüntüsünden okunur
+        return self.file_manager.config
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+
+    def trigger(self):
+        self._wake.set()
+
+    def touch(self, path):
+        self.index.touch(path)
+
+    def _run(self):
+        delay = self.config.LIFECYCLE_SETTINGS['START_DELAY']
+        while not self._stopping.is_set():
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+            delay = self.config.LIFECYCLE_SETTINGS['SCAN_INTERVAL']
+            # Paylaşımlı ağaçta yalnızca bakım lideri yaşlandırır
+            if not self.config.LIFECYCLE_SETTINGS['ENABLED'] or not self.file_manager.is_leader():
+                continue
+            try:
+                self.run_once()
+            except Exception as e:
+                logging.error(f"Lifecycle error: {e}")
+
+    def max_age(self, category):
+        """Kategorinin saniye cinsinden yaş eşiği; yaşlandırılmıyorsa None"""
+        days = self.config.LIFECYCLE_AGE_DAYS.get(category, self.config.LIFECYCLE_SETTINGS['DEFAULT_DAYS'])
+        return days * 86400 if days > 0 else None
+
+    def run_once(self):
+        """İndeksi tazeler, yaşı dolan dosyaları Old'a taşır; taşınan sayısını döndürür"""
+        start = time.perf_counter()
+        with metrics.span('lifecycle'):
+            self.index.refresh()
+            aged = 0
+            for category in self.index.categories():
+                if self._stopping.is_set():
+                    break
+                max_age = self.max_age(category)
+                if max_age is not None:
+                    aged += self._age_category(category, max_age)
+
+        if aged:
+            self.aged += aged
+            logging.info(
+                f"Lifecycle moved {aged} files to Old in {time.perf_counter() - start:.1f}s",
+                extra={'op': 'age', 'count': aged, 'duration': time.perf_counter() - start}
+            )
+            self.file_manager.compress_old_files()
+        return aged
+
+    def _age_category(self, category, max_age):
+        settings = self.config.LIFECYCLE_SETTINGS
+        batch_size = settings['BATCH_SIZE']
+        aged = 0
+        while not self._stopping.is_set():
+            cutoff = time.time() - max_age
+            batch = self.index.due(category, cutoff, batch_size)
+            if not batch:
+                break
+
+            expired = []
+            refreshed = []
+            gone = []
+            for path in batch:
+                try:
+                    seen = last_seen(os.stat(path))
+                except FileNotFoundError:
+                    gone.append(path)
+                    continue
+                except OSError as e:
+                    logging.error(f"Lifecycle stat error for {path}: {e}")
+                    continue
+                if seen >= cutoff:
+                    refreshed.append((path, seen))
+                else:
+                    expired.append(Path(path))
+
+            self.index.remove_many(gone)
+            self.index.update_seen(refreshed)
+            moved = self.file_manager.move_to_old(expired) if expired else []
+            self.index.remove_many([src for src, _ in moved])
+            aged += len(moved)
+
+            # Taşınamayan dosyalar bir sonraki turda yeniden denenir
+            if len(batch) < batch_size or not (gone or refreshed or moved):
+                break
+            self._stopping.wait(settings['BATCH_PAUSE'])
+
+        if aged:
+            metrics.inc('files_aged_total', aged, category=category)
+        return aged
@@ -0,0 +1,135 @@
+# logging_setup.py
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+# Kayıtlara extra={...} ile eklenebilecek yapılandırılmış alanlar
+RECORD_FIELDS = ('op', 'path', 'dest', 'bytes', 'duration', 'count')
+
+_lock = threading.Lock()
+_listener = None
+_queue_handler = None
+_current = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Her kaydı tek satırlık bir JSON nesnesi olarak yazar (JSONL)"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        for field in RECORD_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value if isinstance(value, (int, float)) else str(value)
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class SizeTimeRotatingHandler(RotatingFileHandler):
+    """
+    Dosya max_bytes'ı aşınca ya da max_age saniyeden eskiyse döndürür.
+    Döndürmeyi dosyayı açık tutan işleyicinin kendisi yapar: akış önce
+    kapatılır, sonra yeniden adlandırılır (Windows'ta da güvenli).
+    """
+
+    def __init__(self, filename, max_bytes, backups, max_age):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backups, encoding='utf-8', delay=True)
+        self.max_age = max_age
+        try:
+            opened = os.stat(self.baseFilename).st_mtime
+        except OSError:
+            opened = time.time()
+        self.rollover_at = opened + max_age if max_age else None
+
+    def shouldRollover(self, record):
+        if self.rollover_at is not None and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        if self.max_age:
+            self.rollover_at = time.time() + self.max_age
+
+
+def is_log_file(path, log_path):
+    """Günlük dosyası ya da döndürülmüş kopyası mı (log.txt, log.txt.1 ...)"""
+    path, log_path = Path(path), Path(log_path)
+    return path.parent == log_path.parent and (
+        path.name == log_path.name or path.name.startswith(log_path.name + '.')
+    )
+
+
+def setup_logging(log_path, settings):
+    """
+    Kök kaydediciye bir QueueHandler bağlar; kayıtlar ayrı bir iş
+    parçacığındaki QueueListener tarafından diske yazılır, böylece
+    taşıma yapan iş parçacıkları dosya yazımını beklemez. Aynı ayarlarla
+    tekrar çağrılırsa bir şey yapmaz; ayarlar değiştiyse dinleyici
+    yeni işleyicilerle yeniden başlatılır.
+    """
+    global _listener, _queue_handler, _current
+    log_path = Path(log_path)
+    key = (str(log_path), tuple(sorted(settings.items())))
+    with _lock:
+        if key == _current:
+            return
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        handlers = [SizeTimeRotatingHandler(
+            log_path,
+            settings['MAX_MB'] * 1024 * 1024,
+            settings['BACKUPS'],
+            settings['ROTATE_HOURS'] * 3600,
+        )]
+        handlers[0].setFormatter(JsonFormatter())
+        if settings['CONSOLE']:
+            console = logging.StreamHandler(sys.stderr)
+            console.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s: %(message)s'))
+            handlers.append(console)
+
+        root = logging.getLogger()
+        _stop_locked()
+        # Kuyruk sınırsızdır; taşıma iş parçacığı hiçbir zaman yazımı beklemez
+        log_queue = queue.SimpleQueue()
+        _queue_handler = QueueHandler(log_queue)
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        root.addHandler(_queue_handler)
+        root.setLevel(settings['LEVEL'])
+        _current = key
+
+
+def _stop_locked():
+    global _listener, _queue_handler, _current
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        # Kuyruktaki kayıtlar yazılır, sonra dosya kapatılır
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    _current = None
+
+
+def stop_logging():
+    with _lock:
+        _stop_locked()
+
+
+atexit.register(stop_logging)
@@ -1,22 +1,26 @@
 # main.py
 import os
 import sys
-import json
+import time
 from pathlib import Path
-import unicodedata
+import tempfile
 import subprocess
+import threading
+import multiprocessing
 
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QSystemTrayIcon, QMenu, 
                             QWidget, QVBoxLayout, QFormLayout, QLineEdit, 
                             QSpinBox, QPushButton, QLabel, QFileDialog, 
-                            QListWidget, QHBoxLayout, QDialog, QGraphicsDropShadowEffect,
-                            QDialogButtonBox)
+                            QListWidget, QListWidgetItem, QHBoxLayout, QDialog, QGraphicsDropShadowEffect,
+                            QDialogButtonBox, QPlainTextEdit)
 from PyQt5.QtGui import QIcon, QColor, QPalette, QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 
-from config import Config
-from file_manager import FileManager, FileWatcher
-from watchdog.observers import Observer
+from config import ConfigStore, setting_range
+from file_manager import FileManager
+from watch_manager import WatchManager
+from logging_setup import stop_logging
+import metrics
 
 class DarkPalette:
     @staticmethod
@@ -60,10 +64,89 @@ class DarkPalette:
             }
         """)
 
+class SearchWorker(QThread):
+    """
+    Aramaları arka planda çalıştırır ve sonuçları parça parça gönderir.
+    Yalnızca en son istenen arama işlenir; yeni bir istek geldiğinde
+    eskisi nesil (generation) numarası üzerinden iptal edilir. Files'taki
+    sonuçlardan sonra kalan kotayla arşiv kataloğu aranır.
+    """
+    batch_ready = pyqtSignal(int, list)
+    archived_ready = pyqtSignal(int, list)
+    search_finished = pyqtSignal(int, int)
+
+    def __init__(self, index, max_results, batch_size, archives=None, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.archives = archives
+        self.max_results = max_results
+        self.batch_size = batch_size
+        self._condition = threading.Condition()
+        self._pending = None
+        self._generation = 0
+        self._running = True
+
+    def submit(self, generation, text):
+        with self._condition:
+            self._generation = generation
+            self._pending = (generation, text) if text else None
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self.wait()
+
+    def _is_stale(self, generation):
+        return not self._running or generation != self._generation
+
+    def run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and self._running:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                generation, text = self._pending
+                self._pending = None
+
+            total = 0
+            start = time.perf_counter()
+            for batch in self.index.iter_search(
+                text, self.max_results, self.batch_size,
+                should_stop=lambda: self._is_stale(generation)
+            ):
+                if not total:
+                    metrics.observe('search_first_result_seconds', time.perf_counter() - start)
+                total += len(batch)
+                self.batch_ready.emit(generation, [str(path) for path in batch])
+
+            if self.archives is not None and total < self.max_results:
+                for batch in self.archives.iter_search(
+                    text, self.max_results - total, self.batch_size,
+                    should_stop=lambda: self._is_stale(generation)
+                ):
+                    if not total:
+                        metrics.observe('search_first_result_seconds', time.perf_counter() - start)
+                    total += len(batch)
+                    self.archived_ready.emit(generation, batch)
+
+            if not self._is_stale(generation):
+                metrics.observe('search_seconds', time.perf_counter() - start)
+                metrics.inc('search_queries_total')
+                self.search_finished.emit(generation, total)
+            else:
+                metrics.inc('search_cancelled_total')
+
 class SearchDialog(QDialog):
-    def __init__(self, base_dir, parent=None):
+    def __init__(self, index, search_settings, archives=None, parent=None):
         super().__init__(parent)
-        self.base_dir = base_dir
+        self.index = index
+        self.archives = archives
+        self.max_results = search_settings['MAX_RESULTS']
+        self._generation = 0
+        self._result_count = 0
         self.setWindowTitle('Dosya Arama')
         self.setGeometry(300, 300, 600, 500)
         
@@ -98,103 +181,80 @@ class SearchDialog(QDialog):
         
         self.setLayout(layout)
 
+        # Arama arka planda yürür; yazarken her tuşta değil, kısa bir
+        # bekleme sonrası son metinle başlatılır
+        self.search_worker = SearchWorker(
+            index, self.max_results, search_settings['BATCH_SIZE'], archives, self
+        )
+        self.search_worker.batch_ready.connect(self._add_results)
+        self.search_worker.archived_ready.connect(self._add_archived_results)
+        self.search_worker.search_finished.connect(self._finish_search)
+        self.search_worker.start()
 
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(search_settings['DEBOUNCE_MS'])
+        self.debounce_timer.timeout.connect(self._start_search)
 
-    def _get_turkish_variations(self, text):
-        """Verilen metin için tüm varyasyonları ve normalize edilmiş versiyonları oluşturur"""
-        variations = set()
-        
-        # Normalize edilmiş ve çeşitli varyasyonlar
-        variations.add(text.lower())
-        
-        # Türkçe karakter eşleşmeleri ve dönüşümleri
-        tr_chars_map = {
-            'i': ['i', 'ı', 'İ', 'I'],
-            'ı': ['i', 'ı', 'İ', 'I'],
-            'İ': ['i', 'ı', 'İ', 'I'],
-            'I': ['i', 'ı', 'İ', 'I'],
-            'ğ': ['g', 'ğ'],
-            'g': ['g', 'ğ'],
-            'ü': ['u', 'ü'],
-            'u': ['u', 'ü'],
-            'ş': ['s', 'ş'],
-            's': ['s', 'ş'],
-            'ö': ['o', 'ö'],
-            'o': ['o', 'ö'],
-            'ç': ['c', 'ç'],
-            'c': ['c', 'ç']
-        }
-
-        # Tüm olası karakter kombinasyonlarını oluştur
-        def generate_variations(current_text, index):
-            if index == len(current_text):
-                variations.add(current_text.lower())
-                return
-            
-            char = current_text[index]
-            # Mevcut karakterin tüm olası varyasyonlarını dene
-            for replacement in tr_chars_map.get(char, [char]):
-                new_text = current_text[:index] + replacement + current_text[index+1:]
-                generate_variations(new_text, index + 1)
-
-        generate_variations(text, 0)
-        
-        # Normalize edilmiş versiyonları da ekle
-        normalized_variations = set()
-        for variation in variations:
-            # Aksanları kaldır ve küçük harfe çevir
-            normalized = unicodedata.normalize('NFKD', variation).encode('ascii', 'ignore').decode('utf-8').lower()
-            normalized_variations.add(normalized)
-        
-        variations.update(normalized_variations)
-        
-        return variations
     def perform_search(self, text):
+        # Yeni nesil numarası, sürmekte olan eski aramayı geçersiz kılar
+        self._generation += 1
+        self._result_count = 0
         self.result_list.clear()
+        self.search_worker.submit(self._generation, '')
+
         if not text:
+            self.debounce_timer.stop()
             self.result_count_label.setText('Toplam Sonuç: 0')
             return
-        
-        # Normalize arama metni
-        normalized_search_text = unicodedata.normalize('NFKD', text.lower())
-        normalized_search_text = ''.join(
-            char for char in normalized_search_text 
-            if not unicodedata.combining(char)
-        )
-        
-        results = self._search_files(self.base_dir, normalized_search_text)
-        
-        for file_path in results:
-            self.result_list.addItem(str(file_path))
-        
-        self.result_count_label.setText(f'Toplam Sonuç: {len(results)}')
 
-    def _search_files(self, directory, search_term):
-        results = []
-        
-        # Arama teriminin tüm varyasyonlarını al
-        search_variations = self._get_turkish_variations(search_term)
-        
-        for item in Path(directory).rglob('*'):
-            if item.is_file():
-                file_name = item.name
-                
-                # Dosya adının tüm varyasyonlarını al
-                file_variations = self._get_turkish_variations(file_name)
-                
-                # Herhangi bir arama varyasyonu dosya varyasyonlarında varsa ekle
-                if any(
-                    any(search_var in file_var or file_var in search_var 
-                        for file_var in file_variations) 
-                    for search_var in search_variations
-                ):
-                    results.append(item)
-        
-        return results
+        self.result_count_label.setText('Aranıyor...')
+        self.debounce_timer.start()
+
+    def _start_search(self):
+        self.search_worker.submit(self._generation, self.search_input.text())
+
+    def _add_results(self, generation, paths):
+        if generation != self._generation:
+            return
+        self.result_list.addItems(paths)
+        self._result_count += len(paths)
+        self.result_count_label.setText(f'Toplam Sonuç: {self._result_count}...')
+
+    def _add_archived_results(self, generation, members):
+        if generation != self._generation:
+            return
+        for member in members:
+            # Arşivdeki üye Old/Archived_....zip/ad olarak gösterilir; açılırken çıkarılır
+            item = QListWidgetItem(f'{member.path}  [arşivde]')
+            item.setData(Qt.UserRole, member)
+            self.result_list.addItem(item)
+        self._result_count += len(members)
+        self.result_count_label.setText(f'Toplam Sonuç: {self._result_count}...')
+
+    def _finish_search(self, generation, total):
+        if generation != self._generation:
+            return
+        if total >= self.max_results:
+            self.result_count_label.setText(
+                f'Toplam Sonuç: {total}+ (ilk {self.max_results} sonuç gösteriliyor)'
+            )
+        else:
+            self.result_count_label.setText(f'Toplam Sonuç: {total}')
+
+    def stop_search(self):
+        self.debounce_timer.stop()
+        self.search_worker.stop()
   
     def open_file(self, item):
         file_path = item.text()
         try:
+            member = item.data(Qt.UserRole)
+            if member is not None:
+                # Yalnızca bu üye, arşivdeki konumundan okunarak geçici dizine çıkarılır
+                file_path = self.archives.extract(
+                    member, Path(tempfile.gettempdir()) / 'SmartFileOrganizer'
+                )
             subprocess.Popen(f'explorer "{file_path}"')
         except Exception as e:
             print(f"Dosya açma hatası: {e}")
@@ -203,13 +263,52 @@ class SearchDialog(QDialog):
         # Pencereyi gizle, uygulamayı kapatma
         event.ignore()
         self.hide()
+class StatsDialog(QDialog):
+    """Ölçümlerin saniyede bir yenilenen canlı özeti"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('İstatistikler')
+        self.setGeometry(300, 300, 600, 500)
+
+        layout = QVBoxLayout()
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setFont(QFont('Consolas', 10))
+        layout.addWidget(self.text)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.Close)
+        button_box.rejected.connect(self.hide)
+        layout.addWidget(button_box)
+        self.setLayout(layout)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+
+    def refresh(self):
+        lines = metrics.format_summary(metrics.snapshot())
+        self.text.setPlainText('\n'.join(lines) if lines else 'Henüz ölçüm yok')
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
 class SettingsWindow(QMainWindow):
-    def __init__(self, config, file_manager):
+    def __init__(self, config_store):
         super().__init__()
-        self.config = config
-        self.file_manager = file_manager
+        self.config_store = config_store
         self.init_ui()
 
+    @property
+    def config(self):
+        return self.config_store.current
+
     def init_ui(self):
         self.setWindowTitle('Dosya Organizatörü Ayarları')
         self.setGeometry(300, 300, 600, 500)
@@ -229,16 +328,15 @@ class SettingsWindow(QMainWindow):
         form_layout = QFormLayout()
 
         # Resource Limits
-        self.cpu_limit = QSpinBox()
-        self.cpu_limit.setRange(0, 100)
-        self.cpu_limit.setValue(self.config.RESOURCE_LIMITS['MAX_CPU'])
+        self.cpu_limit = self.limit_spin_box('MAX_CPU')
         form_layout.addRow('Maks CPU Kullanımı (%)', self.cpu_limit)
 
-        self.ram_limit = QSpinBox()
-        self.ram_limit.setRange(0, 100)
-        self.ram_limit.setValue(self.config.RESOURCE_LIMITS['MAX_RAM'])
+        self.ram_limit = self.limit_spin_box('MAX_RAM')
         form_layout.addRow('Maks RAM Kullanımı (%)', self.ram_limit)
 
+        self.disk_limit = self.limit_spin_box('MAX_DISK_MBPS', maximum=10000)
+        form_layout.addRow('Maks Disk G/Ç (MB/s, 0 = sınırsız)', self.disk_limit)
+
         # Base Directories
         self.base_dirs = {}
         for key, path in self.config.BASE_DIRS.items():
@@ -263,39 +361,43 @@ class SettingsWindow(QMainWindow):
         button_box.rejected.connect(self.close)
         layout.addWidget(button_box)
 
+    def limit_spin_box(self, name, maximum=100):
+        # Aralık config doğrulamasıyla aynı; kutu kaydedilince reddedilecek değer almaz
+        low, high = setting_range('RESOURCE_LIMITS', name)
+        spin_box = QSpinBox()
+        spin_box.setRange(int(low), int(high) if high is not None else maximum)
+        spin_box.setValue(self.config.RESOURCE_LIMITS[name])
+        return spin_box
+
     def browse_directory(self, key):
         dir_path = QFileDialog.getExistingDirectory(self, f'{key} Dizini Seç')
         if dir_path:
             self.base_dirs[key].setText(dir_path)
 
-    def save_settings(self):
-        # Update resource limits
-        self.config.RESOURCE_LIMITS['MAX_CPU'] = self.cpu_limit.value()
-        self.config.RESOURCE_LIMITS['MAX_RAM'] = self.ram_limit.value()
-
-        # Update base directories
+    def refresh(self):
+        """Pencere açılırken dosyadan yeniden yüklenmiş olabilecek değerleri gösterir"""
+        self.cpu_limit.setValue(self.config.RESOURCE_LIMITS['MAX_CPU'])
+        self.ram_limit.setValue(self.config.RESOURCE_LIMITS['MAX_RAM'])
+        self.disk_limit.setValue(self.config.RESOURCE_LIMITS['MAX_DISK_MBPS'])
         for key, widget in self.base_dirs.items():
-            self.config.BASE_DIRS[key] = Path(widget.text())
+            widget.setText(str(self.config.BASE_DIRS[key]))
 
-        # Save to file
-        self.save_config_to_file()
-        
-        # Recreate directories with new paths
-        self.file_manager.create_directories()
+    def save_settings(self):
+        # Anlık görüntü salt okunurdur; değişiklikler dosyaya yazılır ve
+        # yeni anlık görüntü abonelere (dosya yöneticisi, izleyici) yayınlanır
+        self.config_store.save({
+            'RESOURCE_LIMITS': {
+                **self.config.RESOURCE_LIMITS,
+                'MAX_CPU': self.cpu_limit.value(),
+                'MAX_RAM': self.ram_limit.value(),
+                'MAX_DISK_MBPS': self.disk_limit.value(),
+            },
+            'BASE_DIRS': {key: widget.text() for key, widget in self.base_dirs.items()},
+        })
         
         # Hide window
         self.hide()
 
-    def save_config_to_file(self):
-        config_data = {
-            'RESOURCE_LIMITS': self.config.RESOURCE_LIMITS,
-            'BASE_DIRS': {k: str(v) for k, v in self.config.BASE_DIRS.items()}
-        }
-        
-        config_file = Path.home() / '.file_organizer_config.json'
-        with open(config_file, 'w') as f:
-            json.dump(config_data, f, indent=4)
-
     def closeEvent(self, event):
         # Hide window instead of closing when X button is clicked
         event.ignore()
@@ -306,23 +408,28 @@ class FileOrganizerApp:
         self.app = QApplication(sys.argv)
         DarkPalette.setup(self.app)  # Dark mode uygula
         
-        self.config = Config()
-        self.file_manager = FileManager(self.config)
-        self.observer = Observer()
+        self.config_store = ConfigStore()
+        self.file_manager = FileManager(self.config_store.current)
         
         # Icon path için düzenleme
         icon_path = self.get_resource_path('icon.png')
         
+        self.stats_dialog = StatsDialog()
+        
         # Setup tray icon
         self.tray_icon = QSystemTrayIcon(QIcon(icon_path))
         self.create_tray_menu()
         self.tray_icon.show()
 
         # Create settings window instance
-        self.settings_window = SettingsWindow(self.config, self.file_manager)
+        self.settings_window = SettingsWindow(self.config_store)
 
         # Setup file watcher
         self.setup_file_watcher()
+        
+        # Ayar dosyası değişiklikleri yeniden başlatmadan uygulanır
+        self.config_store.subscribe(self.apply_settings)
+        self.config_store.start()
 
     def get_resource_path(self, relative_path):
         """ PyInstaller ile paketlendiğinde doğru dosya yolunu alır """
@@ -343,32 +450,67 @@ class FileOrganizerApp:
         search_action = menu.addAction('Dosya Ara')
         search_action.triggered.connect(self.show_search_dialog)
         
+        undo_action = menu.addAction('Son İşlemi Geri Al')
+        undo_action.triggered.connect(self.undo_last_batch)
+        
+        stats_action = menu.addAction('İstatistikler')
+        stats_action.triggered.connect(self.stats_dialog.show)
+        
         exit_action = menu.addAction('Çıkış')
         exit_action.triggered.connect(self.quit_app)
         
         self.tray_icon.setContextMenu(menu)
 
     def show_search_dialog(self):
-        search_dialog = SearchDialog(self.config.BASE_DIRS['FILES'])
+        # Dışarıdan yapılan değişiklikleri arka planda indekse yansıt
+        threading.Thread(target=self.file_manager.index.refresh, daemon=True).start()
+        threading.Thread(
+            target=self.file_manager.archives.refresh, args=(self.config.BASE_DIRS['OLD'],), daemon=True
+        ).start()
+        search_dialog = SearchDialog(
+            self.file_manager.index, self.config.SEARCH_SETTINGS, self.file_manager.archives
+        )
         search_dialog.exec_()
+        search_dialog.stop_search()
+
+    def undo_last_batch(self):
+        restored = self.file_manager.undo_batch()
+        self.tray_icon.showMessage(
+            'Smart File Organizer',
+            f'{restored} dosya geri alındı' if restored else 'Geri alınacak işlem yok'
+        )
 
     def show_settings(self):
+        self.settings_window.refresh()
         self.settings_window.show()
 
     def setup_file_watcher(self):
-        self.observer.schedule(
-            FileWatcher(self.file_manager),
-            str(self.config.BASE_DIRS['FILES']),
-            recursive=False
-        )
-        self.observer.start()
+        self.watch_manager = WatchManager(self.file_manager)
+        self.watch_manager.start()
+
+    @property
+    def config(self):
+        return self.config_store.current
+
+    def apply_settings(self, config):
+        previous_root = self.file_manager.config.BASE_DIRS['FILES']
+        self.file_manager.apply_config(config)
+        self.watch_manager.apply_roots()
+        # Yeni Files dizinindeki mevcut dosyalar arka planda düzenlenir
+        if config.BASE_DIRS['FILES'] != previous_root:
+            threading.Thread(
+                target=self.file_manager.categorize_files_in_directory, daemon=True
+            ).start()
 
     def quit_app(self):
-        self.observer.stop()
-        self.observer.join()
+        self.config_store.stop()
+        self.watch_manager.stop()
+        self.file_manager.close()
+        stop_logging()
         self.app.quit()
 
     def run(self):
+        threading.Thread(target=self.file_manager.build_indexes, daemon=True).start()
         self.file_manager.categorize_files_in_directory()
         return self.app.exec_()
 
@@ -377,4 +519,6 @@ def main():
     sys.exit(app.run())
 
 if __name__ == '__main__':
+    # Paketlenmiş .exe içinde sıkıştırma süreç havuzu için gerekli
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,341 @@
+# metrics.py
+"""
+Süreç içi, düşük maliyetli ölçümler: sayaçlar, göstergeler ve sabit
+kovalı histogramlar. Sıcak yoldaki her kayıt tek bir kilitli sözlük
+güncellemesidir; biçimlendirme yalnızca dışa aktarımda yapılır.
+
+    metrics.inc('files_moved_total', category='Images')
+    metrics.observe('move_seconds', 0.004, op='move')
+    with metrics.span('categorize'):
+        ...
+
+Değerler Prometheus metin biçiminde ya da JSON olarak, yerel bir HTTP
+uç noktasından (METRICS_SETTINGS['HTTP_PORT']) veya periyodik olarak
+yazılan dosyalardan (METRICS_PATH) okunabilir.
+"""
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+PREFIX = 'organizer_'
+
+# Saniye cinsinden gecikme kovaları (Prometheus "le" üst sınırları)
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0,
+)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Son kova +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Kova üst sınırına göre yaklaşık yüzdelik (son kovada inf)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+def _finite(value):
+    return None if value == float('inf') else value
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + body + '}'
+
+
+class Registry:
+    def __init__(self):
+        self.enabled = True
+        # Açıksa her span ayrıca bir DEBUG günlük kaydı (op, duration) üretir
+        self.trace_spans = False
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        # ad -> çağrılabilir; dışa aktarımda (ad, değer, etiketler) göstergeleri üretir
+        self._collectors = {}
+
+    def configure(self, settings):
+        self.enabled = settings['ENABLED']
+        self.trace_spans = settings['SPANS']
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Bloğun süresini <name>_seconds histogramına yazar"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.observe(f'{name}_seconds', elapsed, **labels)
+            if self.trace_spans:
+                logging.debug(f"Span {name} took {elapsed * 1000:.1f} ms",
+                              extra={'op': name, 'duration': elapsed})
+
+    def add_collector(self, name, collect):
+        """Aynı adla yeniden eklenen toplayıcı öncekinin yerini alır"""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def _collect(self):
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {
+                key: (histogram.buckets, list(histogram.counts), histogram.sum, histogram.count)
+                for key, histogram in self._histograms.items()
+            }
+            collectors = list(self._collectors.values())
+        # Toplayıcılar kilit dışında çağrılır; kendi bileşenlerinin kilidini alabilirler
+        for collect in collectors:
+            try:
+                for name, value, labels in collect():
+                    gauges[(name, _label_key(labels))] = value
+            except Exception as e:
+                logging.error(f"Metrics collector error: {e}")
+        return counters, gauges, histograms
+
+    def snapshot(self):
+        """JSON'a çevrilebilir anlık görüntü"""
+        counters, gauges, histograms = self._collect()
+
+        def rows(values):
+            return [{'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in sorted(values.items())]
+
+        histogram_rows = []
+        for (name, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+            histogram = Histogram(buckets)
+            histogram.counts, histogram.sum, histogram.count = counts, total, count
+            histogram_rows.append({
+                'name': name,
+                'labels': dict(labels),
+                'count': count,
+                'sum': total,
+                'avg': total / count if count else 0.0,
+                # En büyük kovayı aşan yüzdelik JSON'da null
+                'p50': _finite(histogram.quantile(0.5)),
+                'p95': _finite(histogram.quantile(0.95)),
+                'p99': _finite(histogram.quantile(0.99)),
+                'buckets': dict(zip([str(bound) for bound in buckets] + ['+Inf'], counts)),
+            })
+        return {
+            'time': time.time(),
+            'counters': rows(counters),
+            'gauges': rows(gauges),
+            'histograms': histogram_rows,
+        }
+
+    def prometheus_text(self):
+        counters, gauges, histograms = self._collect()
+        lines = []
+        declared = set()
+
+        def declare(name, kind):
+            if name not in declared:
+                declared.add(name)
+                lines.append(f'# TYPE {PREFIX}{name} {kind}')
+
+        for (name, labels), value in sorted(counters.items()):
+            declare(name, 'counter')
+            lines.append(f'{PREFIX}{name}{_format_labels(labels)} {value}')
+        for (name, labels), value in sorted(gauges.items()):
+            declare(name, 'gauge')
+            lines.append(f'{PREFIX}{name}{_format_labels(labels)} {value}')
+        for (name, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+            declare(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip([str(bound) for bound in buckets] + ['+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f'{PREFIX}{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{PREFIX}{name}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{PREFIX}{name}_count{_format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_summary(data):
+    """snapshot() çıktısını insan okuyabilir satırlara çevirir (tepsi istatistik penceresi)"""
+    def name_of(row):
+        labels = ', '.join(f'{key}={value}' for key, value in row['labels'].items())
+        return f"{row['name']}{{{labels}}}" if labels else row['name']
+
+    def number(value):
+        return f'{value:,.2f}' if isinstance(value, float) else f'{value:,}'
+
+    def millis(value):
+        return 'inf' if value is None else f'{value * 1000:g}'
+
+    lines = []
+    for row in data['counters'] + data['gauges']:
+        lines.append(f"{name_of(row)}: {number(row['value'])}")
+    for row in data['histograms']:
+        lines.append(
+            f"{name_of(row)}: n={row['count']:,} avg={row['avg'] * 1000:.1f} ms "
+            f"p50<={millis(row['p50'])} ms p95<={millis(row['p95'])} ms"
+        )
+    return lines
+
+
+REGISTRY = Registry()
+
+# Modül düzeyi kısayollar: metrics.inc(...), metrics.observe(...) ...
+inc = REGISTRY.inc
+set_gauge = REGISTRY.set
+observe = REGISTRY.observe
+span = REGISTRY.span
+add_collector = REGISTRY.add_collector
+snapshot = REGISTRY.snapshot
+prometheus_text = REGISTRY.prometheus_text
+configure = REGISTRY.configure
+
+
+class MetricsExporter:
+    """
+    Ölçümleri dışarı verir: HTTP_PORT > 0 ise yalnızca 127.0.0.1 üzerinde
+    /metrics (Prometheus metni) ve /metrics.json; DUMP_INTERVAL > 0 ise
+    METRICS_PATH'e JSON ve yanına .prom dosyası (node_exporter textfile
+    toplayıcısı için) periyodik olarak yazılır.
+    """
+
+    def __init__(self, settings, dump_path, registry=REGISTRY):
+        self.registry = registry
+        self.port = settings['HTTP_PORT']
+        self.dump_interval = settings['DUMP_INTERVAL']
+        self.dump_path = Path(dump_path)
+        self._server = None
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run_dumper, name='metrics-dump', daemon=True)
+
+    def start(self):
+        if self.port:
+            self._start_server()
+        if self.dump_interval:
+            self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self.dump_interval:
+            self.dump()
+
+    def _start_server(self):
+        # http.server yalnızca uç nokta açıksa yüklenir
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body = registry.prometheus_text().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif self.path == '/metrics.json':
+                    body = json.dumps(registry.snapshot()).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        except OSError as e:
+            logging.error(f"Metrics endpoint could not start on port {self.port}: {e}")
+            return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+        logging.info(f"Metrics endpoint on http://127.0.0.1:{self.port}/metrics")
+
+    def _run_dumper(self):
+        while not self._stopping.wait(self.dump_interval):
+            self.dump()
+
+    def dump(self):
+        try:
+            self.dump_path.parent.mkdir(parents=True, exist_ok=True)
+            for path, text in (
+                (self.dump_path, json.dumps(self.registry.snapshot())),
+                (self.dump_path.with_suffix('.prom'), self.registry.prometheus_text()),
+            ):
+                temp_path = path.with_name(path.name + '.tmp')
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(temp_path, path)
+        except OSError as e:
+            logging.error(f"Metrics dump error: {e}")
@@ -0,0 +1,118 @@
+# name_registry.py
+import os
+import re
+import threading
+from pathlib import Path
+
+import metrics
+
+# "rapor_12.pdf" gibi daha önce numaralandırılmış adları ayırır
+NUMBERED_STEM = re.compile(r'^(.*)_(\d+)$')
+
+
+class _DirectoryNames:
+    def __init__(self, directory):
+        self.lock = threading.Lock()
+        self.names = set()
+        # (gövde, uzantı) -> denenecek bir sonraki sayaç
+        self.counters = {}
+
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                self.add(entry.name)
+
+    def add(self, name):
+        key = os.path.normcase(name)
+        self.names.add(key)
+
+        path = Path(key)
+        match = NUMBERED_STEM.match(path.stem)
+        if match:
+            counter_key = (match.group(1), path.suffix)
+            number = int(match.group(2))
+            if self.counters.get(counter_key, 1) <= number:
+                self.counters[counter_key] = number + 1
+
+    def contains(self, name):
+        return os.path.normcase(name) in self.names
+
+    def next_free(self, filename):
+        if not self.contains(filename):
+            return filename
+
+        path = Path(filename)
+        stem, ext = path.stem, path.suffix
+        counter_key = (os.path.normcase(stem), os.path.normcase(ext))
+        counter = self.counters.get(counter_key, 1)
+        # Sayaç kayıtlı en büyük numaranın bir fazlasından başladığı için
+        # döngü pratikte tek adımda biter
+        while self.contains(f"{stem}_{counter}{ext}"):
+            counter += 1
+        self.counters[counter_key] = counter + 1
+        return f"{stem}_{counter}{ext}"
+
+
+class NameRegistry:
+    """
+    Hedef dizinlerdeki dosya adlarının bellek içi kaydı. Her dizin ilk
+    kullanımda tek bir os.scandir ile yüklenir ve her taşımada güncellenir;
+    böylece çakışmasız ad, diskte tek tek exists() denemeden bulunur.
+    """
+
+    def __init__(self):
+        self._dirs = {}
+        self._lock = threading.Lock()
+
+    def _get(self, directory):
+        key = os.path.normcase(str(directory))
+        with self._lock:
+            names = self._dirs.get(key)
+            if names is None:
+                names = self._dirs[key] = _DirectoryNames(directory)
+            return names
+
+    def reserve(self, directory, filename):
+        """
+        Dizinde boş bir ad seçer ve diskte boş bir yer tutucu dosya
+        oluşturarak sahiplenir. Kayıt güncel değilse (başka bir süreç aynı
+        adı kullandıysa) exclusive create başarısız olur ve bir sonraki ad denenir.
+        """
+        names = self._get(directory)
+        with names.lock:
+            while True:
+                candidate = names.next_free(filename)
+                if candidate != filename:
+                    metrics.inc('name_collisions_total')
+                names.add(candidate)
+                try:
+                    fd = os.open(
+                        os.path.join(directory, candidate),
+                        os.O_CREAT | os.O_EXCL | os.O_WRONLY
+                    )
+                except FileExistsError:
+                    # Kayıt diskten geride kalmış; yeniden deneme sayılır
+                    metrics.inc('name_probe_retries_total')
+                    continue
+                os.close(fd)
+                return candidate
+
+    def release(self, directory, filename):
+        """Kullanılmayan bir rezervasyonu ve yer tutucusunu geri alır"""
+        try:
+            os.unlink(os.path.join(directory, filename))
+        except OSError:
+            pass
+        self.discard(directory, filename)
+
+    def discard(self, directory, filename):
+        key = os.path.normcase(str(directory))
+        with self._lock:
+            names = self._dirs.get(key)
+        if names is not None:
+            with names.lock:
+                names.names.discard(os.path.normcase(filename))
+
+    def invalidate(self, directory):
+        """Dizin dışarıdan toplu değiştiğinde kaydı bir sonraki kullanımda yeniden yükletir"""
+        with self._lock:
+            self._dirs.pop(os.path.normcase(str(directory)), None)
@@ -0,0 +1,662 @@
+# planner.py
+"""
+Tüm ağaç için planla/uygula modu. Files kökü ve bırakma klasörleri,
+Files/<kategori> ağacı, Old ve Trash tek geçişte sütunlu bir anlık
+görüntüye (dizin, ad, uzantı, boyut, zaman, aygıt, inode) toplanır.
+Kategori, yaş ve ad çakışması kararları dosya başına döngüler yerine
+sütunlar üzerinde toplu olarak (NumPy kuruluysa vektörel) verilir. Plan
+gözden geçirilebilecek bir JSONL dosyasına yazılır ve ayrı bir adımda,
+kaynak aygıta göre gruplanmış toplu işlerle uygulanır.
+
+    python planner.py                   # kuru çalıştırma: özet + plan dosyası
+    python planner.py --apply           # yazılmış planı uygular
+    python planner.py --home /srv/organizer --output /tmp/plan.jsonl
+"""
+import os
+import sys
+import json
+import stat
+import time
+import logging
+import argparse
+import multiprocessing
+from array import array
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # NumPy yoksa aynı kararlar sütunlar üzerinde düz döngüyle verilir
+    np = None
+
+import metrics
+from config import ConfigStore
+from compression import Candidate, is_archive_name
+from lifecycle import last_seen
+from logging_setup import stop_logging
+from transfer import PART_PREFIX
+
+# Girdinin ağaçtaki yeri
+INBOX, FILED, OLD, TRASH = range(4)
+
+# Plan eylemleri; aynı aygıtta bu sırayla uygulanır: önce yer açılır, yaşı
+# dolan dosyalar kategorilerden çıkar, sonra yeni gelenler yerleştirilir
+ACTIONS = ('expire', 'age', 'categorize', 'compress')
+EXPIRE, AGE, CATEGORIZE, COMPRESS = range(len(ACTIONS))
+NO_ACTION = -1
+
+# Yerin zamanı eşiği geçince aldığı eylem (INBOX'taki her dosya düzenlenir)
+_KIND_ACTION = (CATEGORIZE, AGE, COMPRESS, EXPIRE)
+
+
+class _EntryStat:
+    """Kurallar ve sınıflandırıcı için os.stat_result yerine geçen girdi bilgileri"""
+    __slots__ = ('st_size', 'st_mtime', 'st_mtime_ns', 'st_dev', 'st_ino')
+
+    def __init__(self, size, mtime_ns, dev, ino):
+        self.st_size = size
+        self.st_mtime_ns = mtime_ns
+        self.st_mtime = mtime_ns / 1e9
+        self.st_dev = dev
+        self.st_ino = ino
+
+
+class Snapshot:
+    """
+    Ağacın sütunlu anlık görüntüsü. Sayısal sütunlar array.array'de
+    tutulur (girdi başına Python nesnesi yok); NumPy varsa column()
+    bunları kopyalamadan ndarray olarak verir. groups sütunu FILED
+    girdilerde kategori, INBOX girdilerde uzantı kodudur. times sütunu
+    eşikle karşılaştırılan zamandır: FILED'da son görülme, OLD'da mtime,
+    TRASH'te geliş zamanı.
+    """
+
+    def __init__(self):
+        self.dirs = []
+        self.names = []
+        self.exts = []
+        self.categories = []
+        self._dir_codes = {}
+        self._ext_codes = {}
+        self._category_codes = {}
+
+        self.dir_ids = array('q')
+        self.kinds = array('b')
+        self.groups = array('q')
+        self.sizes = array('q')
+        self.mtimes_ns = array('q')
+        self.times = array('d')
+        self.devs = array('Q')
+        self.inos = array('Q')
+        self.nlinks = array('q')
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _code(value, codes, values):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def dir_code(self, path):
+        return self._code(path, self._dir_codes, self.dirs)
+
+    def ext_code(self, name):
+        return self._code(os.path.splitext(name)[1][1:].lower(), self._ext_codes, self.exts)
+
+    def category_code(self, category):
+        return self._code(category, self._category_codes, self.categories)
+
+    def find_dir(self, path):
+        return self._dir_codes.get(path)
+
+    def add(self, kind, group, dir_id, name, st, moment):
+        self.names.append(name)
+        self.dir_ids.append(dir_id)
+        self.kinds.append(kind)
+        self.groups.append(group)
+        self.sizes.append(st.st_size)
+        self.mtimes_ns.append(st.st_mtime_ns)
+        self.times.append(moment)
+        self.devs.append(st.st_dev)
+        self.inos.append(st.st_ino)
+        self.nlinks.append(st.st_nlink)
+
+    def path(self, i):
+        return os.path.join(self.dirs[self.dir_ids[i]], self.names[i])
+
+    def stat(self, i):
+        return _EntryStat(self.sizes[i], self.mtimes_ns[i], self.devs[i], self.inos[i])
+
+    def column(self, name):
+        """Sütun; NumPy varsa ndarray görünümü (tarama bittikten sonra çağrılmalı)"""
+        values = getattr(self, name)
+        if np is None:
+            return values
+        if not values:
+            return np.zeros(0, dtype=values.typecode)
+        return np.frombuffer(values, dtype=values.typecode)
+
+
+class PlanItem:
+    __slots__ = ('action', 'path', 'dest', 'size', 'dev', 'mtime_ns', 'seen', 'renamed')
+
+    def __init__(self, action, path, dest, size, dev, mtime_ns, seen=None, renamed=False):
+        self.action = action
+        self.path = path
+        self.dest = dest
+        self.size = size
+        self.dev = dev
+        self.mtime_ns = mtime_ns
+        self.seen = seen
+        self.renamed = renamed
+
+    def to_json(self):
+        data = {
+            'action': ACTIONS[self.action], 'path': self.path, 'dest': self.dest,
+            'size': self.size, 'dev': self.dev, 'mtime_ns': self.mtime_ns,
+        }
+        if self.seen is not None:
+            data['seen'] = self.seen
+        if self.renamed:
+            data['renamed'] = True
+        return data
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            ACTIONS.index(data['action']), data['path'], data['dest'], data['size'],
+            data['dev'], data['mtime_ns'], data.get('seen'), data.get('renamed', False)
+        )
+
+
+class Plan:
+    """
+    Bir tam geçişin kararları ve eylem başına özet (sayı, bayt). Dosya
+    biçimi JSONL'dir: ilk satır başlık ve özet, sonraki her satır bir
+    eylem; gözden geçirilip elle düzenlenebilir.
+    """
+
+    def __init__(self, created, entries, items, summary, elapsed=0.0, vectorized=False):
+        self.created = created
+        self.entries = entries
+        self.items = items
+        self.summary = summary
+        self.elapsed = elapsed
+        self.vectorized = vectorized
+
+    def save(self, path):
+        # Yarım yazılmış plan uygulanmasın diye geçici dosya + os.replace
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            header = {
+                'created': self.created, 'entries': self.entries, 'elapsed': self.elapsed,
+                'vectorized': self.vectorized, 'summary': self.summary,
+            }
+            f.write(json.dumps(header) + '\n')
+            for item in self.items:
+                f.write(json.dumps(item.to_json(), ensure_ascii=False) + '\n')
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            header = json.loads(f.readline())
+            items = [PlanItem.from_json(json.loads(line)) for line in f if line.strip()]
+        return cls(
+            header['created'], header['entries'], items, header['summary'],
+            header.get('elapsed', 0.0), header.get('vectorized', False)
+        )
+
+    def format_summary(self):
+        """Kuru çalıştırma özeti: eylem başına sayı ve bayt"""
+        def megabytes(value):
+            return f'{value / (1024 * 1024):,.1f} MB'
+
+        created = datetime.fromtimestamp(self.created).strftime('%Y-%m-%d %H:%M:%S')
+        lines = [
+            f"Plan {created}: {self.entries:,} entries scanned in {self.elapsed:.2f}s"
+            f"{' (NumPy)' if self.vectorized else ''}"
+        ]
+        for action in ACTIONS:
+            row = self.summary[action]
+            notes = []
+            if 'renamed' in row:
+                notes.append(f"{row['renamed']:,} renamed")
+            if 'cross_device' in row:
+                notes.append(f"{row['cross_device']:,} cross-device")
+            if 'freed' in row:
+                notes.append(f"{megabytes(row['freed'])} freed")
+            note = f"  ({', '.join(notes)})" if notes else ''
+            lines.append(f"  {action:<10} {row['count']:>10,} {megabytes(row['bytes']):>14}{note}")
+        return lines
+
+
+class Planner:
+    """
+    Anlık görüntüyü toplar ve düzenleyicinin kendi kurallarıyla karar
+    verir: hedef FileManager._destination (uzantısı bilinen dosyalarda
+    uzantı başına bir kez), yaş eşiği LifecycleManager.max_age, Old
+    sıkıştırması COMPRESS_AFTER_DAYS, çöp saklama süresi TrashIndex'teki
+    geliş zamanı. Paylaşımlı ağaçta yalnızca bu örneğin payı planlanır;
+    yaşlandırma ve sıkıştırma yalnızca bakım liderinde.
+    """
+
+    def __init__(self, file_manager):
+        self.file_manager = file_manager
+
+    @property
+    def config(self):
+        return self.file_manager.config
+
+    def build(self, now=None):
+        start = time.perf_counter()
+        now = time.time() if now is None else now
+        with metrics.span('plan'):
+            snapshot = self.scan(now)
+            actions = self._decide(snapshot, now)
+            selected = self._selected(snapshot, actions)
+            items = self._items(snapshot, actions, selected)
+            summary = self._summarize(snapshot, actions, selected, items)
+        elapsed = time.perf_counter() - start
+        plan = Plan(now, len(snapshot), items, summary, elapsed, vectorized=np is not None)
+        logging.info(
+            f"Planned {len(items)} actions over {len(snapshot)} entries in {elapsed:.2f}s",
+            extra={'op': 'plan', 'count': len(items), 'duration': elapsed}
+        )
+        return plan
+
+    def scan(self, now=None):
+        """Tüm kökleri tek geçişte sütunlu anlık görüntüye toplar"""
+        from watch_manager import load_roots
+
+        now = time.time() if now is None else now
+        base_dirs = self.config.BASE_DIRS
+        files_root = str(base_dirs['FILES'])
+        managed = {files_root, str(base_dirs['OLD']), str(base_dirs['TRASH']), str(self.config.DATA_DIR)}
+        snapshot = Snapshot()
+
+        # Bırakma klasörleri: Files kökü alt dizinsiz, ek kökler RECURSIVE'e göre
+        for root in load_roots(self.config):
+            stack = [str(root.path)]
+            while stack:
+                directory = stack.pop()
+                dir_id = snapshot.dir_code(directory)
+                for entry, st in self._entries(directory):
+                    if entry.is_dir(follow_symlinks=False):
+                        if directory != files_root and root.recursive and entry.path not in managed:
+                            stack.append(entry.path)
+                    elif stat.S_ISREG(st.st_mode) and root.matches(entry.name):
+                        snapshot.add(INBOX, snapshot.ext_code(entry.name), dir_id, entry.name, st, st.st_mtime)
+
+        # Düzenlenmiş dosyalar: Files/<kategori>/... (kategori üst dizindir)
+        for entry, _ in self._entries(files_root):
+            if entry.is_dir(follow_symlinks=False) and entry.path not in managed:
+                category = snapshot.category_code(entry.name)
+                stack = [entry.path]
+                while stack:
+                    directory = stack.pop()
+                    dir_id = snapshot.dir_code(directory)
+                    for sub, st in self._entries(directory):
+                        if sub.is_dir(follow_symlinks=False):
+                            stack.append(sub.path)
+                        elif stat.S_ISREG(st.st_mode):
+                            snapshot.add(FILED, category, dir_id, sub.name, st, last_seen(st))
+
+        old_id = snapshot.dir_code(str(base_dirs['OLD']))
+        for entry, st in self._entries(base_dirs['OLD']):
+            if stat.S_ISREG(st.st_mode) and not is_archive_name(entry.name):
+                snapshot.add(OLD, 0, old_id, entry.name, st, st.st_mtime)
+
+        # Çöpte süre geliş zamanından sayılır; indekste olmayan öğeler önce
+        # "şimdi" gelmiş olarak kaydedilir ki sonraki planlarda süreleri dolsun
+        self.file_manager.trash_expiry.reconcile()
+        arrivals = self.file_manager.trash.arrivals()
+        trash_id = snapshot.dir_code(str(base_dirs['TRASH']))
+        for entry, st in self._entries(base_dirs['TRASH'], follow_symlinks=False):
+            snapshot.add(TRASH, 0, trash_id, entry.name, st, arrivals.get(entry.path, now))
+        return snapshot
+
+    @staticmethod
+    def _entries(directory, follow_symlinks=True):
+        """
+        (DirEntry, stat) çiftleri; aktarım parça dosyaları ve okunamayanlar
+        atlanır. Dosya bağlantıları düzenleyicideki gibi hedefleriyle
+        değerlendirilir (dizin bağlantılarına inilmez).
+        """
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.startswith(PART_PREFIX):
+                        continue
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        if follow_symlinks and stat.S_ISLNK(st.st_mode):
+                            st = entry.stat()
+                    except OSError:
+                        continue
+                    yield entry, st
+        except OSError as e:
+            logging.error(f"Plan scan error for {directory}: {e}")
+
+    def _decide(self, snapshot, now):
+        """Her girdinin eylem kodu: zamanı yerinin (ya da kategorisinin) eşiğinden eskiyse"""
+        leader = self.file_manager.is_leader()
+        lifecycle = self.file_manager.lifecycle
+        never = float('-inf')
+        ageing = leader and self.config.LIFECYCLE_SETTINGS['ENABLED']
+        category_cutoffs = []
+        for category in snapshot.categories:
+            max_age = lifecycle.max_age(category) if ageing else None
+            category_cutoffs.append(never if max_age is None else now - max_age)
+
+        from file_manager import COMPRESS_AFTER_DAYS
+        kind_cutoffs = (
+            float('inf'),
+            never,
+            now - COMPRESS_AFTER_DAYS * 86400 if leader else never,
+            now - self.config.TRASH_SETTINGS['RETENTION_DAYS'] * 86400,
+        )
+
+        if np is not None:
+            kinds = snapshot.column('kinds')
+            groups = snapshot.column('groups')
+            limits = np.asarray(kind_cutoffs)[kinds]
+            filed = kinds == FILED
+            if category_cutoffs:
+                limits[filed] = np.asarray(category_cutoffs)[groups[filed]]
+            return np.where(
+                snapshot.column('times') < limits,
+                np.asarray(_KIND_ACTION, dtype=np.int8)[kinds],
+                np.int8(NO_ACTION)
+            )
+        return array('b', [
+            _KIND_ACTION[kind] if moment < (category_cutoffs[group] if kind == FILED else kind_cutoffs[kind])
+            else NO_ACTION
+            for kind, group, moment in zip(snapshot.kinds, snapshot.groups, snapshot.times)
+        ])
+
+    def _selected(self, snapshot, actions):
+        if np is not None:
+            selected = np.flatnonzero(actions != NO_ACTION).tolist()
+        else:
+            selected = [i for i, action in enumerate(actions) if action != NO_ACTION]
+        if self.file_manager.coordinator is not None:
+            owns = self.file_manager.owns
+            selected = [
+                i for i in selected
+                if actions[i] not in (CATEGORIZE, EXPIRE) or owns(snapshot.names[i])
+            ]
+        return selected
+
+    def _destinations(self, snapshot, indices):
+        """
+        Files altındaki göreli hedefler. Kural yoksa ve uzantı bilinip
+        şüpheli değilse hedef uzantı başına bir kez bulunur; diğerleri
+        (kurallar, içerik başlığı) dosya başına.
+        """
+        file_manager = self.file_manager
+        by_ext = [None] * len(snapshot.exts)
+        if not len(file_manager.rules):
+            classifier = file_manager.classifier
+            for code, ext in enumerate(snapshot.exts):
+                category = classifier.extension_map.get(ext)
+                if category is not None and ext not in classifier.suspicious:
+                    by_ext[code] = category
+                elif not classifier.enabled:
+                    by_ext[code] = category or 'Others'
+
+        destinations = []
+        for i in indices:
+            destination = by_ext[snapshot.groups[i]]
+            if destination is None:
+                destination = file_manager._destination(snapshot.path(i), snapshot.stat(i))
+            destinations.append(destination)
+        return destinations
+
+    def _collisions(self, snapshot, actions, indices, destinations):
+        """
+        Hedef dizinde kalacak aynı adlı bir dosya varsa ya da aynı ada birden
+        çok dosya planlandıysa True (yaşlandırılacaklar önce Old'a gider).
+        Asıl ad uygulama sırasında NameRegistry ile alınır.
+        """
+        files_root = str(self.config.BASE_DIRS['FILES'])
+        dest_dirs = {destination: os.path.join(files_root, destination) for destination in set(destinations)}
+        targets = {snapshot.find_dir(path) for path in dest_dirs.values()} - {None}
+
+        existing = set()
+        if targets:
+            if np is not None:
+                in_targets = np.isin(snapshot.column('dir_ids'), list(targets))
+                staying = (snapshot.column('kinds') == FILED) & (actions != AGE)
+                members = np.flatnonzero(in_targets & staying).tolist()
+            else:
+                members = [
+                    i for i, (dir_id, kind, action) in enumerate(zip(snapshot.dir_ids, snapshot.kinds, actions))
+                    if kind == FILED and dir_id in targets and action != AGE
+                ]
+            existing = {
+                (snapshot.dir_ids[i], os.path.normcase(snapshot.names[i])) for i in members
+            }
+
+        planned = set()
+        renamed = []
+        for i, destination in zip(indices, destinations):
+            dir_id = snapshot.find_dir(dest_dirs[destination])
+            key = (dir_id if dir_id is not None else dest_dirs[destination], os.path.normcase(snapshot.names[i]))
+            renamed.append(key in existing or key in planned)
+            planned.add(key)
+        return renamed
+
+    def _items(self, snapshot, actions, selected):
+        categorize = [i for i in selected if actions[i] == CATEGORIZE]
+        destinations = self._destinations(snapshot, categorize)
+        planned = dict(zip(categorize, zip(destinations, self._collisions(snapshot, actions, categorize, destinations))))
+
+        old_dir = str(self.config.BASE_DIRS['OLD'])
+        items = []
+        for i in selected:
+            action = int(actions[i])
+            dest, renamed, seen = None, False, None
+            if action == CATEGORIZE:
+                dest, renamed = planned[i]
+            elif action in (AGE, COMPRESS):
+                dest = old_dir
+                if action == AGE:
+                    seen = snapshot.times[i]
+            items.append(PlanItem(
+                action, snapshot.path(i), dest, snapshot.sizes[i], snapshot.devs[i],
+                snapshot.mtimes_ns[i], seen, renamed
+            ))
+        return items
+
+    def _summarize(self, snapshot, actions, selected, items):
+        """Eylem başına sayı ve bayt; çöpte yalnızca son bağlantısı silinen dosyalar yer açar"""
+        if np is not None:
+            indices = np.asarray(selected, dtype=np.intp)
+            chosen = actions[indices]
+            sizes = snapshot.column('sizes')[indices]
+            count = np.bincount(chosen, minlength=len(ACTIONS)).tolist()
+            size = np.bincount(chosen, weights=sizes, minlength=len(ACTIONS)).astype(np.int64).tolist()
+            freed = int(sizes[(chosen == EXPIRE) & (snapshot.column('nlinks')[indices] == 1)].sum())
+        else:
+            count = [0] * len(ACTIONS)
+            size = [0] * len(ACTIONS)
+            freed = 0
+            for i in selected:
+                action = actions[i]
+                count[action] += 1
+                size[action] += snapshot.sizes[i]
+                if action == EXPIRE and snapshot.nlinks[i] == 1:
+                    freed += snapshot.sizes[i]
+
+        summary = {action: {'count': count[code], 'bytes': size[code]} for code, action in enumerate(ACTIONS)}
+        summary['expire']['freed'] = freed
+
+        devices = {
+            CATEGORIZE: self._device(self.config.BASE_DIRS['FILES']),
+            AGE: self._device(self.config.BASE_DIRS['OLD']),
+        }
+        summary['categorize']['renamed'] = sum(item.renamed for item in items)
+        for action, device in devices.items():
+            summary[ACTIONS[action]]['cross_device'] = sum(
+                1 for item in items if item.action == action and item.dev != device
+            )
+        return summary
+
+    @staticmethod
+    def _device(path):
+        try:
+            return os.stat(path).st_dev
+        except OSError:
+            return None
+
+
+class PlanExecutor:
+    """
+    Planı uygular. Eylemler kaynak aygıta göre gruplanır; her aygıt kendi
+    iş parçacığında (en fazla MAX_DEVICES) sırayla işlenir, böylece farklı
+    disklerdeki işler birbirini beklemez, aynı diskte baş hareketi
+    çoğalmaz. Her toplu iş (BATCH_SIZE) günlükte ayrı bir iştir ve geri
+    alınabilir. Plandan sonra değişen (boyut/mtime) ya da erişilen
+    dosyalar atlanır.
+    """
+
+    def __init__(self, file_manager):
+        self.file_manager = file_manager
+
+    @property
+    def config(self):
+        return self.file_manager.config
+
+    def execute(self, plan):
+        """Uygulanan eylem sayılarını eylem adına göre döndürür"""
+        start = time.perf_counter()
+        by_device = defaultdict(list)
+        for item in plan.items:
+            by_device[item.dev].append(item)
+
+        done = Counter()
+        if by_device:
+            workers = max(1, min(len(by_device), self.config.PLANNER_SETTINGS['MAX_DEVICES']))
+            with metrics.span('plan_apply'), ThreadPoolExecutor(workers, thread_name_prefix='plan') as pool:
+                for result in pool.map(self._run_device, by_device.values()):
+                    done.update(result)
+        skipped = done.pop('skipped', 0)
+
+        elapsed = time.perf_counter() - start
+        for action, count in done.items():
+            metrics.inc('plan_actions_total', count, action=action)
+        logging.info(
+            f"Plan applied in {elapsed:.1f}s on {len(by_device)} devices: "
+            f"{', '.join(f'{done[action]} {action}' for action in ACTIONS)}, {skipped} skipped as changed",
+            extra={'op': 'plan', 'count': sum(done.values()), 'duration': elapsed}
+        )
+        return {action: done[action] for action in ACTIONS}
+
+    def _run_device(self, items):
+        by_action = defaultdict(list)
+        for item in items:
+            by_action[item.action].append(item)
+
+        batch_size = self.config.PLANNER_SETTINGS['BATCH_SIZE']
+        done = Counter()
+        for action, name in enumerate(ACTIONS):
+            todo = by_action.get(action)
+            if not todo:
+                continue
+            if action in (AGE, COMPRESS) and not self.file_manager.is_leader():
+                logging.warning(f"Plan {name} skipped, another instance holds the maintenance lease")
+                continue
+            # Sıkıştırma tek çağrıda: arşivler boyuta göre kendiliğinden döner
+            step = len(todo) if action == COMPRESS else batch_size
+            for start in range(0, len(todo), step):
+                batch = [item for item in todo[start:start + step] if self._unchanged(item)]
+                done['skipped'] += min(step, len(todo) - start) - len(batch)
+                if batch:
+                    try:
+                        done[name] += self._apply(action, batch)
+                    except Exception as e:
+                        logging.error(f"Plan {name} batch error: {e}")
+        return done
+
+    @staticmethod
+    def _unchanged(item):
+        """Dosya plandaki haliyle duruyor mu (yaşlandırmada: bu arada erişilmemiş mi)"""
+        try:
+            # Çöpteki bağlantılar kendileri silinir; diğerleri taramadaki gibi izlenir
+            st = os.lstat(item.path) if item.action == EXPIRE else os.stat(item.path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            logging.error(f"Plan stat error for {item.path}: {e}")
+            return False
+        return st.st_size == item.size and st.st_mtime_ns == item.mtime_ns and (
+            item.seen is None or last_seen(st) <= item.seen
+        )
+
+    def _apply(self, action, batch):
+        file_manager = self.file_manager
+        if action == EXPIRE:
+            return file_manager.trash_expiry.delete([item.path for item in batch])
+
+        if action == CATEGORIZE:
+            groups = defaultdict(list)
+            for item in batch:
+                groups[item.dest].append(Path(item.path))
+            moved, _ = file_manager.categorize_files(groups, f'plan categorize {len(batch)} files')
+            return moved
+
+        if action == AGE:
+            moved = file_manager.move_to_old([Path(item.path) for item in batch])
+            file_manager.lifecycle.index.remove_many([src for src, _ in moved])
+            return len(moved)
+
+        candidates = [Candidate(item.path, item.size, item.mtime_ns) for item in batch]
+        file_manager.compressor.compress_candidates(file_manager.config.BASE_DIRS['OLD'], candidates)
+        # Doğrulanıp arşive yazılan kaynaklar silinmiştir
+        return sum(1 for candidate in candidates if not os.path.lexists(candidate.path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Smart File Organizer whole-tree plan and apply')
+    parser.add_argument('--home', help='home directory to organize (default: current user)')
+    parser.add_argument('--output', help='plan file (default: plan.jsonl in the data directory)')
+    parser.add_argument('--apply', action='store_true',
+                        help='apply the plan written by a previous dry run instead of planning')
+    args = parser.parse_args(argv)
+
+    config = ConfigStore(args.home).current
+    plan_path = Path(args.output) if args.output else config.PLAN_PATH
+    if args.apply and not plan_path.exists():
+        print(f"No plan at {plan_path}; run without --apply first to write one", file=sys.stderr)
+        return 1
+
+    from file_manager import FileManager
+    file_manager = FileManager(config)
+    try:
+        if args.apply:
+            plan = Plan.load(plan_path)
+            done = PlanExecutor(file_manager).execute(plan)
+            print('Applied: ' + ', '.join(f'{count:,} {action}' for action, count in done.items()))
+        else:
+            plan = Planner(file_manager).build()
+            plan.save(plan_path)
+            print('\n'.join(plan.format_summary()))
+            print(f"Plan written to {plan_path}; apply with --apply")
+    finally:
+        file_manager.close()
+        stop_logging()
+    return 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
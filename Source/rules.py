@@ -0,0 +1,372 @@
+# rules.py
+import os
+import re
+import time
+import string
+import fnmatch
+import logging
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+
+# Hedef şablonlarında kullanılabilecek alanlar
+TEMPLATE_FIELDS = ('year', 'month', 'day', 'ext', 'stem', 'category', 'type')
+# Doğrulamada şablon bu örnek değerlerle bir kez biçimlendirilir (hepsi metin, render gibi)
+_SAMPLE_VALUES = {field: 'x' for field in TEMPLATE_FIELDS}
+_BACKREF = re.compile(r'\\[1-9]|\(\?P=')
+
+RULE_KEYS = {
+    'name', 'destination', 'extensions', 'glob', 'regex', 'ignore_case',
+    'min_size', 'max_size', 'min_age_days', 'max_age_days', 'source', 'types',
+}
+
+
+class RuleError(ValueError):
+    pass
+
+
+def _glob_literal(glob):
+    """Globdaki en uzun joker içermeyen parça"""
+    runs = re.split(r'\[[^\]]*\]?|[*?]', glob)
+    return max(runs, key=len)
+
+
+def _regex_literal(regex):
+    """Regex'in üst düzeyindeki en uzun sabit karakter dizisi (eşleşmede mutlaka geçer)"""
+    try:
+        parsed = sre_parse.parse(regex)
+    except (re.error, OverflowError, RecursionError):
+        return ''
+    best = current = ''
+    for op, value in parsed:
+        if op == sre_parse.LITERAL:
+            current += chr(value)
+            if len(current) > len(best):
+                best = current
+        else:
+            current = ''
+    return best
+
+
+def _pick_trigram(literal):
+    # Küçük harfe çevirmede uzunluğu değişmeyen (ASCII) bir trigram seçilir
+    literal = literal.lower()
+    for position in range(len(literal) - 2):
+        trigram = literal[position:position + 3]
+        if trigram.isascii():
+            return trigram
+    return None
+
+
+def _template_fields(destination):
+    """
+    Hedef şablonundaki alan adları. Konumsal ({}), bilinmeyen ya da
+    nitelikli ({year.real}) alanlar ve örnek değerlerle biçimlendirilemeyen
+    şablonlar (ör. {year:d}) RuleError ile reddedilir; böylece hata taşıma
+    sırasında değil kural yüklenirken çıkar.
+    """
+    try:
+        fields = {name for _, name, _, _ in string.Formatter().parse(destination) if name is not None}
+    except ValueError as e:
+        raise RuleError(f'bad destination template: {e}')
+    if '' in fields or any(name.isdigit() for name in fields):
+        raise RuleError('destination template fields must be named, e.g. {year}')
+    bad_fields = fields - set(TEMPLATE_FIELDS)
+    if bad_fields:
+        raise RuleError(f"unknown template fields: {', '.join(sorted(bad_fields))}")
+    try:
+        destination.format(**_SAMPLE_VALUES)
+    except (ValueError, KeyError, IndexError, AttributeError, TypeError) as e:
+        raise RuleError(f'bad destination template: {e}')
+    return fields
+
+
+def _string_list(data, key):
+    """Koşuldaki metin listesi; liste olmayan değer (ör. "png") RuleError"""
+    value = data.get(key)
+    if value is None:
+        return None
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise RuleError(f'{key} must be a list of strings')
+    return value
+
+
+def _non_negative(data, key):
+    """Boyut/yaş koşulu; negatif olmayan sayı olmalı"""
+    value = data.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise RuleError(f'{key} must be a non-negative number')
+    return value
+
+
+class Rule:
+    """
+    Derlenmiş tek bir kural. Uzantı ve ad deseni RuleEngine tarafından
+    toplu olarak değerlendirilir; check() yalnızca kalan koşullara bakar.
+    """
+    __slots__ = (
+        'index', 'name', 'destination', 'fields', 'extensions', 'pattern',
+        'name_regex', 'trigram', 'min_size', 'max_size', 'min_age', 'max_age', 'source',
+        'types', 'needs_stat',
+    )
+
+    def __init__(self, index, data):
+        if not isinstance(data, Mapping):
+            raise RuleError('rule must be an object')
+        unknown = set(data) - RULE_KEYS
+        if unknown:
+            raise RuleError(f"unknown keys: {', '.join(sorted(unknown))}")
+
+        self.index = index
+        self.name = str(data.get('name', f'rule {index + 1}'))
+        self.destination = data.get('destination')
+        if not isinstance(self.destination, str) or not self.destination.strip():
+            raise RuleError('destination is required')
+        self.fields = _template_fields(self.destination)
+        if Path(self.destination).is_absolute() or '..' in Path(self.destination).parts:
+            raise RuleError('destination must be a relative path inside Files')
+        if os.path.normpath(self.destination) == '.':
+            # Files köküne taşınan dosya her çakışma adlandırmasında yeniden olay üretir
+            raise RuleError('destination must be a folder inside Files, not Files itself')
+
+        extensions = _string_list(data, 'extensions')
+        self.extensions = (
+            frozenset(ext.lower().lstrip('.') for ext in extensions) if extensions else None
+        )
+
+        # Glob ve regex tek bir desene çevrilir; ad başından itibaren eşlenir
+        glob, regex = data.get('glob'), data.get('regex')
+        for key, value in (('glob', glob), ('regex', regex), ('source', data.get('source'))):
+            if value is not None and not isinstance(value, str):
+                raise RuleError(f'{key} must be a string')
+        if glob and regex:
+            raise RuleError('use either glob or regex, not both')
+        if glob:
+            self.pattern = f'(?i:{fnmatch.translate(glob)})'
+        elif regex:
+            flags = 'i' if data.get('ignore_case') else ''
+            self.pattern = f'(?{flags}:.*?(?:{regex}))' if flags else f'(?:.*?(?:{regex}))'
+        else:
+            self.pattern = None
+        try:
+            self.name_regex = re.compile(self.pattern) if self.pattern else None
+        except re.error as e:
+            raise RuleError(f'bad pattern: {e}')
+        literal = _glob_literal(glob) if glob else _regex_literal(regex) if regex else ''
+        self.trigram = _pick_trigram(literal)
+
+        self.min_size = _non_negative(data, 'min_size')
+        self.max_size = _non_negative(data, 'max_size')
+        days = _non_negative(data, 'min_age_days')
+        self.min_age = days * 86400 if days is not None else None
+        days = _non_negative(data, 'max_age_days')
+        self.max_age = days * 86400 if days is not None else None
+        source = data.get('source')
+        self.source = (
+            re.compile(f'(?i:{fnmatch.translate(os.path.normcase(os.path.expanduser(source)))})')
+            if source else None
+        )
+        types = _string_list(data, 'types')
+        self.types = frozenset(types) if types else None
+        self.needs_stat = (
+            self.min_size is not None or self.max_size is not None
+            or self.min_age is not None or self.max_age is not None
+        )
+
+    def check(self, facts):
+        """Uzantı ve ad dışındaki koşullar; ucuzdan pahalıya sırayla"""
+        if self.needs_stat:
+            st = facts.stat()
+            if st is None:
+                return False
+            if self.min_size is not None and st.st_size < self.min_size:
+                return False
+            if self.max_size is not None and st.st_size > self.max_size:
+                return False
+            if self.min_age is not None or self.max_age is not None:
+                age = facts.now - st.st_mtime
+                if self.min_age is not None and age < self.min_age:
+                    return False
+                if self.max_age is not None and age > self.max_age:
+                    return False
+        if self.source is not None and not self.source.match(facts.parent):
+            return False
+        if self.types is not None and facts.kind() not in self.types:
+            return False
+        return True
+
+
+class _FileFacts:
+    """Bir dosya hakkında, yalnızca bir kural ihtiyaç duyduğunda hesaplanan bilgiler"""
+    __slots__ = ('path', 'name', 'ext', 'parent', 'now', 'classifier', '_st', '_kind')
+
+    _MISSING = object()
+
+    def __init__(self, path, st, classifier, now):
+        self.path = path
+        self.parent = os.path.normcase(os.path.dirname(path))
+        self.name = os.path.basename(path)
+        self.ext = os.path.splitext(self.name)[1][1:].lower()
+        self.classifier = classifier
+        self.now = now
+        self._st = self._MISSING if st is None else st
+        self._kind = self._MISSING
+
+    def stat(self):
+        if self._st is self._MISSING:
+            try:
+                self._st = os.stat(self.path)
+            except OSError:
+                self._st = None
+        return self._st
+
+    def kind(self):
+        if self._kind is self._MISSING:
+            sniffed = self.classifier.sniff(self.path, self.stat()) if self.classifier else None
+            self._kind = sniffed[0] if sniffed else None
+        return self._kind
+
+
+class RuleEngine:
+    """
+    Kuralları bir kez karar yapısına derler; dosya başına maliyet kural
+    sayısıyla büyümez:
+    1. Uzantıya göre sözlük: ad deseni olmayan kurallar, uzantı başına
+       öncelik sırasıyla önceden birleştirilmiş listelerde
+    2. Ad desenleri: en az üç karakterlik sabit parçası olan desenler bu
+       parçanın bir trigramıyla indekslenir (arama indeksindeki gibi);
+       dosya adının trigramları yalnızca ilgili kuralları getirir. Sabit
+       parçası olmayan desenler tek bir birleşik regex'te toplanır; tek
+       eşleme hepsini birden eler ya da en öncelikli eşleşeni verir
+    3. Kalan koşullar (boyut, yaş, kaynak dizin, içerik türü)
+    İlk tutan kural kazanır; hiçbiri tutmazsa destination() None döndürür.
+
+    Python'un geri izlemeli regex motoru büyük bir alternasyonu her
+    alternatifi ayrı ayrı deneyerek çalıştırdığından tüm desenler tek
+    regex'e konmaz; trigram ön süzgeci bu maliyeti düz tutar.
+    """
+
+    def __init__(self, rules):
+        self.rules = []
+        for index, data in enumerate(rules):
+            try:
+                self.rules.append(Rule(len(self.rules), data))
+            except RuleError as e:
+                logging.error(f"Invalid rule #{index + 1} skipped: {e}")
+
+        plain = [rule for rule in self.rules if rule.pattern is None]
+        self._plain_any = tuple(rule for rule in plain if rule.extensions is None)
+        by_ext = {}
+        for rule in plain:
+            for ext in rule.extensions or ():
+                by_ext.setdefault(ext, []).append(rule)
+        # Uzantıya bağlı ve bağımsız kurallar öncelik sırasıyla birleştirilir
+        self._plain_by_ext = {
+            ext: tuple(sorted(rules + list(self._plain_any), key=lambda rule: rule.index))
+            for ext, rules in by_ext.items()
+        }
+
+        self._by_trigram = {}
+        generic = []
+        for rule in self.rules:
+            if rule.pattern is None:
+                continue
+            if rule.trigram is not None:
+                self._by_trigram.setdefault(rule.trigram, []).append(rule)
+            else:
+                generic.append(rule)
+        self._generic = tuple(generic)
+
+        self._combined = None
+        # Numaralı geri başvurular birleşik desende kayacağından o durumda birleştirilmez
+        if generic and not any(_BACKREF.search(rule.pattern) for rule in generic):
+            try:
+                self._combined = re.compile('|'.join(
+                    f'(?P<r{rule.index}>{rule.pattern})' for rule in generic
+                ))
+            except re.error as e:
+                logging.warning(f"Rule patterns could not be combined, matching one by one: {e}")
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _named_candidates(self, name):
+        """Ad deseni bu ada uyabilecek kurallar (doğrulanmamış) ve kesin eşleşen genel kural"""
+        candidates = set()
+        if self._by_trigram:
+            lowered = name.lower()
+            by_trigram = self._by_trigram
+            for position in range(len(lowered) - 2):
+                rules = by_trigram.get(lowered[position:position + 3])
+                if rules:
+                    candidates.update(rules)
+
+        known = None
+        if self._generic:
+            if self._combined is not None:
+                found = self._combined.match(name)
+                if found:
+                    # Alternatifler öncelik sırasında; en öncelikli eşleşen kural
+                    known = int(found.lastgroup[1:])
+                    candidates.update(rule for rule in self._generic if rule.index >= known)
+            else:
+                candidates.update(self._generic)
+        return candidates, known
+
+    def match(self, path, st=None, classifier=None, now=None):
+        """Dosyaya uyan ilk kural ve dosya bilgileri; kural yoksa (None, None)"""
+        if not self.rules:
+            return None, None
+        facts = _FileFacts(str(path), st, classifier, time.time() if now is None else now)
+
+        named, known = self._named_candidates(facts.name)
+        plain = self._plain_by_ext.get(facts.ext, self._plain_any)
+        if named:
+            candidates = sorted(
+                [rule for rule in named if rule.extensions is None or facts.ext in rule.extensions]
+                + list(plain),
+                key=lambda rule: rule.index
+            )
+        else:
+            candidates = plain
+
+        for rule in candidates:
+            if (rule.pattern is not None and rule.index != known
+                    and not rule.name_regex.match(facts.name)):
+                continue
+            if rule.check(facts):
+                return rule, facts
+        return None, None
+
+    def destination(self, path, st=None, classifier=None):
+        """Kurala göre Files altındaki göreli hedef dizin ya da None"""
+        rule, facts = self.match(path, st, classifier)
+        if rule is None:
+            return None
+        return self.render(rule, facts)
+
+    def render(self, rule, facts):
+        values = {}
+        if rule.fields & {'year', 'month', 'day'}:
+            st = facts.stat()
+            moment = datetime.fromtimestamp(st.st_mtime if st is not None else facts.now)
+            values.update(year=f'{moment.year:04d}', month=f'{moment.month:02d}', day=f'{moment.day:02d}')
+        if 'ext' in rule.fields:
+            values['ext'] = facts.ext or 'noext'
+        if 'stem' in rule.fields:
+            values['stem'] = os.path.splitext(facts.name)[0]
+        if 'type' in rule.fields:
+            values['type'] = facts.kind() or 'unknown'
+        if 'category' in rule.fields:
+            values['category'] = (
+                facts.classifier.classify(facts.path, facts.stat()) if facts.classifier else 'Others'
+            )
+        destination = rule.destination.format(**values)
+        # Dosya adından gelen değerler dizin ayırıcısı içeremez
+        return os.path.normpath(destination.replace('..', '_'))
@@ -0,0 +1,341 @@
+# transfer.py
+import os
+import sys
+import json
+import time
+import errno
+import shutil
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: aynı süreçteki çift aktarımı _sources engeller
+    fcntl = None
+
+import metrics
+
+PART_PREFIX = '.organizer-'
+VERIFY_CHUNK = 1024 * 1024
+# Devam ederken yarım dosyanın son bu kadar baytı kaynakla karşılaştırılır
+RESUME_CHECK_BYTES = 1024 * 1024
+
+# copy_file_range'in dosya sistemleri arasında desteklenmediğini bildiren hatalar
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.EPERM}
+
+
+class TransferError(OSError):
+    pass
+
+
+def _file_hash(path, chunk_size=VERIFY_CHUNK):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _read_at(fd, offset, size):
+    os.lseek(fd, offset, os.SEEK_SET)
+    data = b''
+    while len(data) < size:
+        chunk = os.read(fd, size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+class TransferEngine:
+    """
+    Dosya taşıma motoru. Aynı aygıtta tek bir os.replace yapılır. Başka
+    aygıta taşımada dosya, hedef dizindeki gizli bir .part dosyasına
+    büyük parçalarla çekirdek içinde kopyalanır (copy_file_range, yoksa
+    sendfile, o da yoksa okuma/yazma). Kopya boyutla (VERIFY='hash' ise
+    özetle de) doğrulanır, diske yazılır ve hedefin üzerine atomik olarak
+    taşınır. Kaynak ancak bundan sonra silinir.
+
+    Yarım kalan kopya (çökme, kapanma) .part olarak kalır. Aynı kaynak
+    değişmeden tekrar taşınırken kaldığı yerden devam edilir. Kaynağın
+    boyutu ve mtime'ı yanındaki .part.json'da tutulur.
+
+    Başka aygıta taşımalar MAX_TRANSFERS iş parçacıklı bir havuzda da
+    yürütülebilir (submit); böylece büyük dosyalar izleyici işçilerini
+    bekletmez. Tek bir dosya sıralı parçalarla kopyalanır; yarım dosyanın
+    her zaman kesintisiz bir önek olması devam etmeyi mümkün kılar.
+
+    Süren aktarımların kaynak yolları tutulur (is_transferring); aynı
+    kaynak yeniden verilirse reddedilir. .part dosyası yazılmadan önce
+    özel olarak kilitlenir; başka bir süreç aynı kopyayı sürdürüyorsa
+    dosya kesilmez, aktarım hata ile biter.
+    """
+
+    def __init__(self, settings, governor, previous=None):
+        self.governor = governor
+        self.chunk_bytes = max(1, int(settings['CHUNK_MB'] * 1024 * 1024))
+        self.verify_hash = settings['VERIFY'] == 'hash'
+        self.fsync = settings['FSYNC']
+        self.max_transfers = settings['MAX_TRANSFERS']
+
+        self._use_copy_file_range = hasattr(os, 'copy_file_range')
+        # sendfile yalnızca Linux'ta dosyadan dosyaya çalışır
+        self._use_sendfile = hasattr(os, 'sendfile') and sys.platform.startswith('linux')
+
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._stopping = threading.Event()
+        # Havuza verilip henüz bitmemiş aktarımlar
+        self._pending = 0
+        self._active = 0
+        # Havuza verilmiş ya da kopyalanmakta olan kaynaklar
+        self._sources = set()
+        self._active_lock = threading.Lock()
+        if previous is not None:
+            # Ayar değişikliğinde eski havuzda süren aktarımlar burada da görünür
+            self._sources = previous._sources
+            self._active_lock = previous._active_lock
+        metrics.add_collector('transfers', lambda: [('transfers_active', self._active, {})])
+
+    def rename(self, src_path, dest_path):
+        """Aynı aygıtta atomik taşır ve True döndürür; aygıtlar farklıysa False"""
+        try:
+            os.replace(src_path, dest_path)
+            return True
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            return False
+
+    def submit(self, src_path, dest_path, finish=None):
+        """
+        Başka aygıta taşımayı havuzda başlatır; Future döndürür. finish(hata)
+        aynı iş parçacığında, Future tamamlanmadan önce çağrılır; böylece
+        Future'ı bekleyen, taşımanın tüm kayıtlarının bittiğini bilir.
+        """
+        src_path = Path(src_path)
+        self._claim(src_path)
+        try:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_transfers, thread_name_prefix='transfer'
+                    )
+                with self._active_lock:
+                    self._pending += 1
+                future = self._pool.submit(self._run, src_path, Path(dest_path), finish)
+        except Exception:
+            self._release(src_path)
+            raise
+        future.add_done_callback(lambda future: self._transfer_done(src_path))
+        return future
+
+    def _run(self, src_path, dest_path, finish):
+        try:
+            self._copy_move(src_path, dest_path)
+        except Exception as e:
+            if finish is not None:
+                finish(e)
+            raise
+        if finish is not None:
+            finish(None)
+
+    def _transfer_done(self, src_path):
+        with self._active_lock:
+            self._pending -= 1
+        self._release(src_path)
+
+    def _claim(self, src_path):
+        key = os.path.abspath(src_path)
+        with self._active_lock:
+            if key in self._sources:
+                raise TransferError(f"transfer already in progress: {src_path}")
+            self._sources.add(key)
+
+    def _release(self, src_path):
+        with self._active_lock:
+            self._sources.discard(os.path.abspath(src_path))
+
+    def is_transferring(self, src_path):
+        """Kaynak havuzda bekliyor ya da kopyalanıyor mu"""
+        with self._active_lock:
+            return os.path.abspath(src_path) in self._sources
+
+    def busy(self):
+        with self._active_lock:
+            return self._pending > 0
+
+    def shutdown(self, wait=True, interrupt=True):
+        """
+        Havuzu kapatır. interrupt True ise bekleyen aktarımlar iptal edilir,
+        sürenler bir sonraki parçada durur; yarım dosyaları sonra sürdürülür.
+        """
+        if interrupt:
+            self._stopping.set()
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=interrupt)
+
+    @staticmethod
+    def part_path(src_path, dest_dir):
+        token = hashlib.blake2b(os.fsencode(os.path.abspath(src_path)), digest_size=8).hexdigest()
+        return Path(dest_dir) / f'{PART_PREFIX}{token}.part'
+
+    def discard_partial(self, src_path, dest_dir):
+        """Artık devam edilmeyecek bir kopyanın yarım dosyasını siler"""
+        part = self.part_path(src_path, dest_dir)
+        for path in (part, part.with_name(part.name + '.json')):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def copy_move(self, src_path, dest_path):
+        """Başka aygıta kopyalar, doğrular, hedefe yerleştirir ve kaynağı siler"""
+        src_path = Path(src_path)
+        self._claim(src_path)
+        try:
+            self._copy_move(src_path, Path(dest_path))
+        finally:
+            self._release(src_path)
+
+    def _copy_move(self, src_path, dest_path):
+        with self._active_lock:
+            self._active += 1
+        start = time.perf_counter()
+        try:
+            size, resumed = self._copy(src_path, dest_path)
+        finally:
+            with self._active_lock:
+                self._active -= 1
+        os.unlink(src_path)
+
+        elapsed = time.perf_counter() - start
+        metrics.inc('transfer_bytes_total', size - resumed)
+        metrics.observe('transfer_seconds', elapsed)
+        if resumed:
+            metrics.inc('transfers_resumed_total')
+        logging.info(
+            f"Transferred {src_path.name} across devices: {size / (1024 * 1024):.1f} MB in {elapsed:.2f}s"
+            f"{f' (resumed at {resumed / (1024 * 1024):.1f} MB)' if resumed else ''}",
+            extra={'op': 'transfer', 'path': src_path, 'dest': dest_path, 'bytes': size, 'duration': elapsed}
+        )
+
+    def _copy(self, src_path, dest_path):
+        part = self.part_path(src_path, dest_path.parent)
+        meta_path = part.with_name(part.name + '.json')
+
+        with open(src_path, 'rb') as src:
+            st = os.fstat(src.fileno())
+            signature = {'src': str(src_path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+            # Yarım dosya kesilmeden açılır ve kilitlenir; kilit alınmadan
+            # ne devam konumu okunur ne de dosyaya yazılır
+            with open(os.open(part, os.O_RDWR | os.O_CREAT, 0o600), 'r+b') as dst:
+                self._lock_part(dst, part)
+                offset = self._resume_offset(src.fileno(), part, meta_path, signature)
+                if not offset:
+                    dst.truncate(0)
+                    with open(meta_path, 'w', encoding='utf-8') as f:
+                        json.dump(signature, f)
+                self._copy_range(src.fileno(), dst.fileno(), offset, st.st_size)
+                dst.truncate(st.st_size)
+                if self.fsync:
+                    dst.flush()
+                    os.fsync(dst.fileno())
+
+                # Kopya sırasında kaynak değiştiyse hedefe yerleştirilmez
+                after = os.fstat(src.fileno())
+                if (after.st_size, after.st_mtime_ns) != (st.st_size, st.st_mtime_ns):
+                    self.discard_partial(src_path, dest_path.parent)
+                    raise TransferError(f"source changed during transfer: {src_path}")
+                self._verify(src_path, part, st.st_size)
+
+        shutil.copystat(src_path, part)
+        os.replace(part, dest_path)
+        try:
+            os.unlink(meta_path)
+        except FileNotFoundError:
+            pass
+        return st.st_size, offset
+
+    @staticmethod
+    def _lock_part(dst, part):
+        # Kilit dosya kapanınca (süreç ölse bile) kendiliğinden bırakılır
+        if fcntl is None:
+            return
+        try:
+            fcntl.flock(dst.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError as e:
+            if e.errno in (errno.EWOULDBLOCK, errno.EAGAIN, errno.EACCES):
+                raise TransferError(f"partial copy is locked by another transfer: {part.name}")
+            # Kilit desteklemeyen dosya sistemi; süreç içi koruma yeterli sayılır
+            logging.debug(f"Partial copy lock unavailable for {part.name}: {e}")
+
+    def _resume_offset(self, src_fd, part, meta_path, signature):
+        """Yarım dosya aynı kaynağa aitse ve sonu kaynakla eşleşiyorsa devam edilecek konum"""
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                previous = json.load(f)
+            part_size = os.stat(part).st_size
+        except (OSError, ValueError):
+            return 0
+        if previous != signature or not 0 < part_size <= signature['size']:
+            return 0
+
+        check = min(RESUME_CHECK_BYTES, part_size)
+        with open(part, 'rb') as f:
+            tail = _read_at(f.fileno(), part_size - check, check)
+        if tail != _read_at(src_fd, part_size - check, check):
+            logging.warning(f"Partial transfer does not match source, restarting: {part.name}")
+            return 0
+        return part_size
+
+    def _copy_range(self, src_fd, dst_fd, offset, size):
+        while offset < size:
+            if self._stopping.is_set():
+                raise TransferError('transfer interrupted by shutdown, partial copy kept')
+            self.governor.acquire()
+            copied = self._copy_chunk(src_fd, dst_fd, offset, min(self.chunk_bytes, size - offset))
+            if not copied:
+                raise TransferError('source truncated during transfer')
+            offset += copied
+
+    def _copy_chunk(self, src_fd, dst_fd, offset, count):
+        if self._use_copy_file_range:
+            try:
+                return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                # Çekirdek ya da dosya sistemi desteklemiyor; bir sonraki yönteme geçilir
+                self._use_copy_file_range = False
+        if self._use_sendfile:
+            try:
+                os.lseek(dst_fd, offset, os.SEEK_SET)
+                return os.sendfile(dst_fd, src_fd, offset, count)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                self._use_sendfile = False
+        data = _read_at(src_fd, offset, count)
+        os.lseek(dst_fd, offset, os.SEEK_SET)
+        view = memoryview(data)
+        while view:
+            written = os.write(dst_fd, view)
+            view = view[written:]
+        return len(data)
+
+    def _verify(self, src_path, part, size):
+        if os.stat(part).st_size != size:
+            raise TransferError(f"size mismatch after transfer: {src_path}")
+        if self.verify_hash and _file_hash(src_path) != _file_hash(part):
+            self.discard_partial(src_path, part.parent)
+            raise TransferError(f"hash mismatch after transfer: {src_path}")
@@ -0,0 +1,254 @@
+# trash_index.py
+import os
+import time
+import shutil
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+
+import metrics
+from transfer import PART_PREFIX
+
+
+class TrashIndex:
+    """
+    Çöpe gelen her öğenin geliş zamanını tutan kalıcı indeks. Süre dolumu
+    mtime'a değil geliş zamanına göre yapılır (taşıma mtime'ı korur) ve
+    arrived sütunundaki indeks sayesinde yalnızca süresi dolan öğeler okunur.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        with self._write_lock, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS items (
+                    path TEXT PRIMARY KEY,
+                    arrived REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS items_arrived ON items (arrived)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def reconcile(self, trash_dir, owns=None):
+        """
+        Çöp dizinini indeksle karşılaştırır. move_to_trash dışından gelen
+        öğeler (kullanıcının bıraktıkları, eski sürümden ya da başka bir
+        örnekten kalanlar) geliş zamanı "şimdi" olarak eklenir; böylece
+        silinmeden önce tam saklama süresini beklerler. Artık bulunmayan
+        öğelerin kayıtları silinir. owns verilirse yalnızca bu örneğin
+        payındakiler eklenir. (eklenen, silinen) sayılarını döndürür.
+        """
+        now = time.time()
+        try:
+            with os.scandir(trash_dir) as entries:
+                # Çöpe süren aktarımların yarım kopyaları çöp öğesi değildir
+                present = {entry.path for entry in entries if not entry.name.startswith(PART_PREFIX)}
+        except OSError as e:
+            logging.error(f"Trash index scan error: {e}")
+            return 0, 0
+
+        conn = self._connect()
+        indexed = {path for (path,) in conn.execute('SELECT path FROM items')}
+        added = [(path, now) for path in present - indexed if owns is None or owns(path)]
+        gone = indexed - present
+        if not added and not gone:
+            return 0, 0
+        try:
+            with self._write_lock, conn:
+                conn.executemany('INSERT OR IGNORE INTO items (path, arrived) VALUES (?, ?)', added)
+                # Tarama sırasında kaydedilen yeni gelenler silinmez
+                removed = conn.executemany(
+                    'DELETE FROM items WHERE path = ? AND arrived < ?', [(path, now) for path in gone]
+                ).rowcount if gone else 0
+        except sqlite3.Error as e:
+            logging.error(f"Trash index reconcile error: {e}")
+            return 0, 0
+        if added or removed:
+            logging.info(f"Trash index reconciled: {len(added)} items added, {removed} removed")
+        return len(added), removed
+
+    def record(self, path, arrived=None):
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO items (path, arrived) VALUES (?, ?)',
+                        (str(path), time.time() if arrived is None else arrived)
+                    )
+        except sqlite3.Error as e:
+            logging.error(f"Trash index update error for {path}: {e}")
+
+    def remove(self, path):
+        self.remove_many([path])
+
+    def remove_many(self, paths):
+        if not paths:
+            return
+        try:
+            with self._write_lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany('DELETE FROM items WHERE path = ?', [(str(path),) for path in paths])
+        except sqlite3.Error as e:
+            logging.error(f"Trash index remove error: {e}")
+
+    def due(self, cutoff, limit):
+        """cutoff'tan önce gelmiş en eski limit kadar öğenin yolu"""
+        rows = self._connect().execute(
+            'SELECT path FROM items WHERE arrived < ? ORDER BY arrived LIMIT ?', (cutoff, limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def oldest_arrival(self):
+        row = self._connect().execute('SELECT MIN(arrived) FROM items').fetchone()
+        return row[0]
+
+    def arrivals(self):
+        """Tüm öğelerin yol -> geliş zamanı eşlemesi (tek sorgu)"""
+        return dict(self._connect().execute('SELECT path, arrived FROM items'))
+
+
+class TrashExpiry:
+    """
+    Süresi dolan çöp öğelerini arka plan iş parçacığında, BATCH_SIZE'lık
+    gruplar halinde siler. Bir sonraki öğenin süresi dolana kadar (en fazla
+    CHECK_INTERVAL saniye) uyur; trigger() ile hemen uyandırılabilir.
+    İndeks CHECK_INTERVAL'da bir çöp diziniyle karşılaştırılır; indekse
+    başka yoldan gelmiş öğeler de böylece süresi dolunca silinir.
+    """
+
+    def __init__(self, index, settings, governor, trash_dir=None, owns=None, on_expired=None):
+        self.index = index
+        self.trash_dir = trash_dir
+        self.owns = owns
+        self.retention = settings['RETENTION_DAYS'] * 86400
+        self.batch_size = settings['BATCH_SIZE']
+        self.batch_pause = settings['BATCH_PAUSE']
+        self.check_interval = settings['CHECK_INTERVAL']
+        self.governor = governor
+        self.on_expired = on_expired
+        self.deleted = 0
+        self._reconciled = None
+
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='trash-expiry', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+
+    def trigger(self):
+        self._wake.set()
+
+    def rescan(self):
+        """İşçide bir sonraki turda indeksi çöp diziniyle karşılaştırır (ör. pay değişince)"""
+        self._reconciled = None
+        self._wake.set()
+
+    def reconcile(self):
+        """İndeksi çöp diziniyle hemen karşılaştırır"""
+        self._reconciled = time.monotonic()
+        if self.trash_dir is not None:
+            self.index.reconcile(self.trash_dir, self.owns)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self._next_wait())
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+            try:
+                if self._reconciled is None or time.monotonic() - self._reconciled >= self.check_interval:
+                    self.reconcile()
+                self.expire()
+            except Exception as e:
+                logging.error(f"Trash expiry error: {e}")
+
+    def _next_wait(self):
+        try:
+            oldest = self.index.oldest_arrival()
+        except sqlite3.Error:
+            oldest = None
+        if oldest is None:
+            return self.check_interval
+        return min(self.check_interval, max(1.0, oldest + self.retention - time.time()))
+
+    def expire(self):
+        """Süresi dolmuş tüm öğeleri siler, silinen sayısını döndürür"""
+        deleted = 0
+        freed = 0
+        while not self._stopping.is_set():
+            now = time.time()
+            batch = self.index.due(now - self.retention, self.batch_size)
+            if not batch:
+                break
+
+            count, size = self._delete(batch, now)
+            deleted += count
+            freed += size
+
+            if len(batch) < self.batch_size:
+                break
+            self._stopping.wait(self.batch_pause)
+
+        self._report(deleted, freed)
+        return deleted
+
+    def delete(self, paths):
+        """Verilen çöp öğelerini saklama süresine bakmadan siler (ör. onaylanmış bir plan)"""
+        deleted, freed = self._delete(paths, time.time())
+        self._report(deleted, freed)
+        return deleted
+
+    def _delete(self, batch, now):
+        deleted = 0
+        freed = 0
+        finished = []
+        for path in batch:
+            self.governor.acquire()
+            try:
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path)
+                else:
+                    size = os.lstat(path).st_size
+                    os.unlink(path)
+                    freed += size
+                deleted += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # Silinemeyen öğe (ör. kilitli) bir sonraki saklama süresinde tekrar denenir
+                logging.error(f"Trash cleanup error: {e}")
+                self.index.record(path, now)
+                continue
+            finished.append(path)
+        self.index.remove_many(finished)
+        return deleted, freed
+
+    def _report(self, deleted, freed):
+        if deleted:
+            self.deleted += deleted
+            metrics.inc('trash_items_deleted_total', deleted)
+            metrics.inc('trash_bytes_freed_total', freed)
+            logging.info(f"Trash expiry deleted {deleted} items", extra={'op': 'expire', 'count': deleted})
+            if self.on_expired is not None:
+                self.on_expired()
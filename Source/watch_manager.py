@@ -0,0 +1,358 @@
+# watch_manager.py
+import os
+import time
+import fnmatch
+import threading
+import logging
+from pathlib import Path
+
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+import metrics
+from event_pipeline import EventPipeline
+from logging_setup import is_log_file
+
+
+class WatchRoot:
+    """
+    İzlenen bir kök dizin ve dosya adı filtreleri. organize_existing False
+    ise (Files kökü) ilk taramada bulunan dosyalar olay hattına verilmez;
+    onları açılıştaki categorize_files_in_directory düzenler.
+    """
+    __slots__ = ('path', 'recursive', 'include', 'exclude', 'organize_existing')
+
+    def __init__(self, path, recursive, include, exclude, organize_existing=True):
+        self.path = Path(path)
+        self.recursive = recursive
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.organize_existing = organize_existing
+
+    @property
+    def key(self):
+        return (str(self.path), self.recursive, self.include, self.exclude)
+
+    def matches(self, name):
+        return (
+            any(fnmatch.fnmatch(name, pattern) for pattern in self.include)
+            and not any(fnmatch.fnmatch(name, pattern) for pattern in self.exclude)
+        )
+
+
+def load_roots(config):
+    """Files kökü (alt dizinsiz) + WATCH_ROOTS'taki ek bırakma klasörleri"""
+    settings = config.WATCHER_SETTINGS
+    roots = [WatchRoot(
+        config.BASE_DIRS['FILES'], False, settings['INCLUDE'], settings['EXCLUDE'],
+        organize_existing=False
+    )]
+    for entry in config.WATCH_ROOTS:
+        roots.append(WatchRoot(
+            Path(entry['PATH']).expanduser(),
+            entry.get('RECURSIVE', True),
+            entry.get('INCLUDE', settings['INCLUDE']),
+            entry.get('EXCLUDE', settings['EXCLUDE']),
+        ))
+    return roots
+
+
+class _RootHandler(FileSystemEventHandler):
+    def __init__(self, manager, root):
+        self.manager = manager
+        self.root = root
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.manager.submit(self.root, event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.manager.submit(self.root, event.src_path)
+
+    def on_deleted(self, event):
+        self.manager.forget(event.src_path)
+
+    def on_moved(self, event):
+        self.manager.forget(event.src_path, event.dest_path)
+        # Örn. tarayıcıların .crdownload -> .pdf yeniden adlandırması
+        if not event.is_directory:
+            self.manager.submit(self.root, event.dest_path)
+
+
+class _DirState:
+    __slots__ = ('mtime_ns', 'files', 'subdirs')
+
+    def __init__(self, mtime_ns, files, subdirs):
+        self.mtime_ns = mtime_ns
+        # ad -> (boyut, mtime_ns)
+        self.files = files
+        self.subdirs = subdirs
+
+
+class WatchManager:
+    """
+    Birden çok kökü tek bir Observer ile izler. Ayarlar değiştiğinde
+    apply_roots() yalnızca değişen kökleri yeniden zamanlar.
+
+    watchdog, inotify kuyruk taşmasını (IN_Q_OVERFLOW) ve Windows tampon
+    taşmasını sessizce yutar; bu yüzden kökler RECONCILE_INTERVAL'da bir
+    dizin mtime/boyut anlık görüntüsüyle artımlı olarak karşılaştırılır.
+    mtime'ı değişmeyen dizinler yeniden okunmaz. Olayı kaçırılmış dosya
+    bulunursa bir taşma varsayılır, dosyalar olay hattına verilir ve
+    sonraki karşılaştırma öne çekilir.
+    """
+
+    def __init__(self, file_manager, since=None):
+        self.file_manager = file_manager
+        # İlk taramada bu zamandan önce değişmiş dosyalar önceki çalışmada görülmüştür
+        self.since = since
+        settings = self.config.WATCHER_SETTINGS
+        self.reconcile_interval = settings['RECONCILE_INTERVAL']
+        self.grace = settings['SETTLE_SECONDS'] + settings['RECONCILE_GRACE']
+
+        # Olaylar gözlemci iş parçacığında bekletilmeden olay hattına aktarılır
+        self.pipeline = EventPipeline(file_manager.move_to_category, settings)
+        self.observer = Observer()
+        self.roots = []
+        self._watches = {}
+        self._snapshot = {}
+        self._rebalance = False
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='watch-reconcile', daemon=True)
+
+        self.missed = 0
+        self.reconciles = 0
+        metrics.add_collector('watcher', self._metrics)
+        if file_manager.coordinator is not None:
+            file_manager.coordinator.subscribe(lambda ring: self.rebalance())
+
+    @property
+    def config(self):
+        # Dosya yöneticisindeki güncel yapılandırma anlık görüntüsü
+        return self.file_manager.config
+
+    def start(self):
+        self.pipeline.start()
+        self.apply_roots()
+        self.observer.start()
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+        self.observer.stop()
+        self.observer.join()
+        self.pipeline.stop()
+
+    def join(self):
+        self.observer.join()
+
+    def stats(self):
+        stats = self.pipeline.stats()
+        stats['roots'] = len(self.roots)
+        stats['missed'] = self.missed
+        stats['reconciles'] = self.reconciles
+        return stats
+
+    def _metrics(self):
+        stats = self.pipeline.stats()
+        return [
+            ('watch_roots', len(self.roots), {}),
+            ('watch_pending', stats['pending'], {}),
+            ('watch_queued', stats['queued'], {}),
+            ('watch_in_flight', stats['in_flight'], {}),
+        ]
+
+    def apply_roots(self):
+        """Yapılandırmadaki kökleri izlemeye alır; kaldırılan ya da değişenleri bırakır"""
+        roots = load_roots(self.config)
+        wanted = {root.key: root for root in roots}
+        with self._lock:
+            for key in list(self._watches):
+                if key not in wanted:
+                    root, watch = self._watches.pop(key)
+                    self._unschedule(watch)
+                    self._drop_snapshot(root.path)
+                    logging.info(f"Stopped watching {root.path}")
+            for key, root in wanted.items():
+                if key not in self._watches:
+                    self._schedule(root)
+            self.roots = roots
+        self._wake.set()
+
+    def _schedule(self, root):
+        try:
+            root.path.mkdir(parents=True, exist_ok=True)
+            watch = self.observer.schedule(_RootHandler(self, root), str(root.path), recursive=root.recursive)
+        except OSError as e:
+            logging.error(f"Cannot watch {root.path}: {e}")
+            return
+        self._watches[root.key] = (root, watch)
+        logging.info(f"Watching {root.path}{' (recursive)' if root.recursive else ''}")
+
+    def _unschedule(self, watch):
+        try:
+            self.observer.unschedule(watch)
+        except (KeyError, OSError) as e:
+            logging.error(f"Unschedule error for {watch.path}: {e}")
+
+    def _drop_snapshot(self, path):
+        prefix = str(path)
+        for directory in [d for d in self._snapshot if d == prefix or d.startswith(prefix + os.sep)]:
+            del self._snapshot[directory]
+
+    def _managed_dirs(self):
+        # Kategori, Old ve Trash dizinleri düzenlemenin hedefidir; ek kökler
+        # bunları kapsasa bile içlerindeki dosyalar yeniden düzenlenmez
+        base_dirs = self.config.BASE_DIRS
+        return [base_dirs['FILES'], base_dirs['OLD'], base_dirs['TRASH'], self.config.DATA_DIR]
+
+    def should_organize(self, root, path):
+        path = Path(path)
+        if is_log_file(path, self.config.BASE_DIRS['LOG']) or self.file_manager.is_restored(path):
+            return False
+        if not root.matches(path.name) or not self.file_manager.owns(path):
+            return False
+        if path.parent == root.path:
+            return True
+        if not root.recursive or root.path not in path.parents:
+            return False
+        return not any(managed == path.parent or managed in path.parents for managed in self._managed_dirs())
+
+    def rebalance(self):
+        """
+        Eşgüdümdeki örnek kümesi değişti: payımıza yeni düşen dosyalar için
+        olay gelmeyeceğinden sonraki karşılaştırma kökleri baştan tarar ve
+        mevcut dosyaları da (Files kökü dahil) olay hattına verir. Olay hattı
+        bekleyen ya da işlenmekte olan yolları yeniden almaz.
+        """
+        with self._lock:
+            self._snapshot.clear()
+            self._rebalance = True
+        self._wake.set()
+
+    def is_pending(self, path):
+        """Yol olay hattında bekliyor, işleniyor ya da başka aygıta kopyalanıyor mu"""
+        return self.pipeline.is_pending(path) or self.file_manager.transfers.is_transferring(path)
+
+    def submit(self, root, path):
+        if self.should_organize(root, path):
+            self.pipeline.submit(path)
+
+    def forget(self, src_path, dest_path=None):
+        self.pipeline.discard(src_path)
+        if dest_path is None:
+            self.file_manager.index.remove(src_path)
+        else:
+            self.file_manager.index.move(src_path, dest_path)
+
+    def _run(self):
+        interval = 0
+        while not self._stopping.is_set():
+            self._wake.wait(interval)
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+            try:
+                self._check_watches()
+                missed = self.reconcile()
+            except Exception as e:
+                logging.error(f"Watch reconciliation error: {e}")
+                missed = 0
+            # Kaçırılmış olay bulunduysa taşma sürüyor olabilir; kısa aralıkla tekrar bak
+            interval = min(self.reconcile_interval, self.grace * 2) if missed else self.reconcile_interval
+
+    def _check_watches(self):
+        """Kök silinip yeniden oluşturulduysa ya da yayıcı öldüyse izlemeyi yeniler"""
+        alive = {emitter.watch for emitter in self.observer.emitters if emitter.is_alive()}
+        with self._lock:
+            for key, (root, watch) in list(self._watches.items()):
+                if watch not in alive or not root.path.is_dir():
+                    logging.warning(f"Watch lost for {root.path}, rescheduling")
+                    del self._watches[key]
+                    self._unschedule(watch)
+                    self._drop_snapshot(root.path)
+                    self._schedule(root)
+
+    def reconcile(self):
+        """
+        Kökleri kayıtlı anlık görüntüyle karşılaştırır, olayı kaçırılmış
+        dosyaları olay hattına verir ve kaçırılan dosya sayısını döndürür.
+        """
+        with self._lock:
+            roots = list(self.roots)
+            rebalance, self._rebalance = self._rebalance, False
+        managed = {str(path) for path in self._managed_dirs()}
+
+        missed = 0
+        for root in roots:
+            stack = [str(root.path)]
+            while stack and not self._stopping.is_set():
+                directory = stack.pop()
+                missed += self._reconcile_dir(root, directory, stack, managed, rebalance)
+
+        self.reconciles += 1
+        if missed:
+            self.missed += missed
+            metrics.inc('watch_missed_events_total', missed)
+            logging.warning(f"Watcher missed {missed} file events (queue overflow?), reconciled")
+        return missed
+
+    def _reconcile_dir(self, root, directory, stack, managed, rebalance=False):
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            self._snapshot.pop(directory, None)
+            return 0
+
+        previous = self._snapshot.get(directory)
+        if previous is not None and previous.mtime_ns == mtime_ns:
+            # Dizin girdileri değişmedi; alt dizinler yine de ayrı ayrı kontrol edilir
+            stack.extend(previous.subdirs)
+            return 0
+
+        files = {}
+        subdirs = []
+        changed = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if root.recursive and entry.path not in managed:
+                                subdirs.append(entry.path)
+                            continue
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    signature = (st.st_size, st.st_mtime_ns)
+                    files[entry.name] = signature
+                    if previous is None or previous.files.get(entry.name) != signature:
+                        changed.append((entry.path, st))
+        except OSError as e:
+            logging.error(f"Reconcile scan error for {directory}: {e}")
+            return 0
+
+        self._snapshot[directory] = _DirState(mtime_ns, files, subdirs)
+        stack.extend(subdirs)
+
+        if previous is None and not root.organize_existing and not rebalance:
+            return 0
+
+        missed = 0
+        cutoff = time.time() - self.grace
+        for path, st in changed:
+            if previous is None and not rebalance and self.since is not None and max(st.st_mtime, st.st_ctime) < self.since:
+                continue
+            if not self.should_organize(root, path) or self.is_pending(path):
+                continue
+            self.pipeline.submit(path)
+            # İlk taramadaki dosyalar olay beklenmeden önce de vardı; kaçırılmış sayılmaz
+            if previous is not None and max(st.st_mtime, st.st_ctime) < cutoff:
+                missed += 1
+        return missed
@@ -0,0 +1,59 @@
+# conftest.py
+import os
+import sys
+
+import pytest
+
+# Modüller Source/ altında düz bir yapıda; uygulamadaki gibi doğrudan içe aktarılır
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Source'))
+
+from config import Config  # noqa: E402
+from logging_setup import stop_logging  # noqa: E402
+
+
+class NullGovernor:
+    """Bileşen testleri için hiç beklemeyen kaynak yöneticisi"""
+
+    def acquire(self, amount=1):
+        pass
+
+    def can_perform_io(self):
+        return True
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = Config(home_path=tmp_path / 'home')
+    # Testler makinenin yüküne göre yavaşlamasın
+    config.RESOURCE_LIMITS.update(MAX_CPU=100, MAX_RAM=100, MAX_DISK_MBPS=0)
+    config.METRICS_SETTINGS['DUMP_INTERVAL'] = 0
+    return config
+
+
+@pytest.fixture
+def make_file_manager(config):
+    """FileManager(config) kurar; test bitince arka plan iş parçacıklarını durdurur"""
+    from file_manager import FileManager
+
+    managers = []
+
+    def make():
+        manager = FileManager(config)
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.close()
+    stop_logging()
+
+
+@pytest.fixture
+def file_manager(make_file_manager):
+    return make_file_manager()
+
+
+def write_file(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
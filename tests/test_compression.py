@@ -0,0 +1,89 @@
+# test_compression.py
+import os
+import zipfile
+
+import pytest
+
+from compression import Candidate, CompressionEngine, RotatingArchiveWriter
+from conftest import NullGovernor, write_file
+
+SETTINGS = {
+    'METHOD': 'deflate',
+    'LEVEL': 6,
+    'MAX_WORKERS': 2,
+    'MAX_ARCHIVE_MB': 100,
+    'MAX_ARCHIVE_FILES': 100,
+    'PARALLEL_MAX_MB': 1,
+}
+# zip 1980 öncesi zamanları saklayamaz
+OLD_MTIME = 1_000_000_000
+
+
+@pytest.fixture
+def old_dir(tmp_path):
+    for i in range(6):
+        path = write_file(tmp_path / f'notes{i}.txt', f'notes {i} '.encode() * 500)
+        os.utime(path, (OLD_MTIME, OLD_MTIME))
+    return tmp_path
+
+
+def _compress(old_dir, **settings):
+    catalog = {}
+    engine = CompressionEngine(
+        dict(SETTINGS, **settings), NullGovernor(),
+        on_archive=lambda path, infos: catalog.update({path.name: sorted(info.filename for info in infos)})
+    )
+    return engine.compress_directory(old_dir, 30), catalog
+
+
+def _patch(monkeypatch, method, name, action):
+    """Writer yöntemini, adı name olan aday için önce action'ı çalıştıracak şekilde sarar"""
+    original = getattr(RotatingArchiveWriter, method)
+
+    def wrapper(self, *args):
+        candidate = next(arg for arg in args if isinstance(arg, Candidate))
+        if candidate.name == name:
+            action(candidate)
+        return original(self, *args)
+
+    monkeypatch.setattr(RotatingArchiveWriter, method, wrapper)
+
+
+def _disk_full(candidate):
+    raise OSError(28, 'No space left on device')
+
+
+# Paralel yolda işçide sıkıştırılan veri, saklama yolunda dosya doğrudan yazılır
+@pytest.mark.parametrize('method, writer', [('deflate', 'add_compressed'), ('stored', 'add_file')])
+def test_write_error_keeps_source_and_continues(old_dir, monkeypatch, method, writer):
+    _patch(monkeypatch, writer, 'notes2.txt', _disk_full)
+    archives, catalog = _compress(old_dir, METHOD=method)
+
+    assert sorted(name for name in os.listdir(old_dir) if not name.startswith('Archived_')) == ['notes2.txt']
+    [archive] = archives
+    with zipfile.ZipFile(archive) as zf:
+        assert sorted(zf.namelist()) == [f'notes{i}.txt' for i in (0, 1, 3, 4, 5)]
+    assert catalog == {archive.name: [f'notes{i}.txt' for i in (0, 1, 3, 4, 5)]}
+
+
+def test_catalog_omits_members_whose_source_was_kept(old_dir, monkeypatch):
+    # Arşive yazıldıktan sonra değişen dosya silinmez; katalogda da yer almamalı
+    _patch(monkeypatch, '_verify_and_remove', 'notes4.txt', lambda candidate: os.utime(candidate.path))
+    archives, catalog = _compress(old_dir)
+
+    assert (old_dir / 'notes4.txt').exists()
+    [archive] = archives
+    assert catalog == {archive.name: [f'notes{i}.txt' for i in (0, 1, 2, 3, 5)]}
+
+
+@pytest.mark.parametrize('method', ['deflate', 'stored'])
+def test_pre_1980_mtime_is_clamped(old_dir, method):
+    # ZIP 1980 öncesini gösteremez; dosya yine de arşivlenmeli
+    os.utime(old_dir / 'notes0.txt', (0, 0))
+    archives, catalog = _compress(old_dir, METHOD=method)
+
+    assert [name for name in os.listdir(old_dir) if not name.startswith('Archived_')] == []
+    [archive] = archives
+    with zipfile.ZipFile(archive) as zf:
+        assert len(zf.namelist()) == 6
+        assert zf.getinfo('notes0.txt').date_time == (1980, 1, 1, 0, 0, 0)
@@ -0,0 +1,50 @@
+# test_config.py
+import json
+
+import pytest
+
+from config import Config, ConfigStore
+
+
+def _load(tmp_path, data):
+    home = tmp_path / 'home'
+    home.mkdir(exist_ok=True)
+    (home / '.file_organizer_config.json').write_text(json.dumps(data), encoding='utf-8')
+    return Config(home_path=home)
+
+
+@pytest.mark.parametrize('section, name, value', [
+    ('RESOURCE_LIMITS', 'MAX_CPU', 0),
+    ('RESOURCE_LIMITS', 'MAX_CPU', 150),
+    ('GOVERNOR_SETTINGS', 'SMOOTHING', 0),
+    ('GOVERNOR_SETTINGS', 'THROTTLE_START', 1.0),
+    ('COMPRESSION_SETTINGS', 'LEVEL', 12),
+    ('TRANSFER_SETTINGS', 'CHUNK_MB', 0),
+    ('METRICS_SETTINGS', 'HTTP_PORT', 70000),
+    # Aralık tanımı olmayan sayısal ayarlar negatif olamaz
+    ('GOVERNOR_SETTINGS', 'MAX_PAUSE_SECONDS', -1),
+])
+def test_out_of_range_setting_keeps_default(tmp_path, caplog, section, name, value):
+    default = getattr(Config(home_path=tmp_path / 'defaults', load=False), section)[name]
+    config = _load(tmp_path, {section: {name: value}})
+    assert getattr(config, section)[name] == default
+    assert f'{section}.{name} must be' in caplog.text
+
+
+def test_valid_settings_are_applied_next_to_rejected_ones(tmp_path):
+    config = _load(tmp_path, {'COMPRESSION_SETTINGS': {'LEVEL': 9, 'MAX_WORKERS': 0}})
+    assert config.COMPRESSION_SETTINGS['LEVEL'] == 9
+    assert config.COMPRESSION_SETTINGS['MAX_WORKERS'] >= 1
+
+
+@pytest.mark.parametrize('content', ['[1, 2]', '"text"', 'not json'])
+def test_save_replaces_unusable_config_file(tmp_path, content):
+    home = tmp_path / 'home'
+    home.mkdir()
+    config_file = home / '.file_organizer_config.json'
+    config_file.write_text(content, encoding='utf-8')
+
+    store = ConfigStore(home_path=home)
+    config = store.save({'RESOURCE_LIMITS': {'MAX_CPU': 40}})
+    assert config.RESOURCE_LIMITS['MAX_CPU'] == 40
+    assert json.loads(config_file.read_text(encoding='utf-8')) == {'RESOURCE_LIMITS': {'MAX_CPU': 40}}
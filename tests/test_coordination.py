@@ -0,0 +1,100 @@
+# test_coordination.py
+import os
+import time
+
+import pytest
+
+from conftest import NullGovernor, write_file
+from coordination import Coordinator
+from trash_index import TrashExpiry, TrashIndex
+
+SETTINGS = {'HEARTBEAT_INTERVAL': 5, 'LEASE_SECONDS': 30, 'VIRTUAL_NODES': 64}
+TRASH_SETTINGS = {'RETENTION_DAYS': 1, 'BATCH_SIZE': 10, 'BATCH_PAUSE': 0, 'CHECK_INTERVAL': 3600}
+JOB = 'maintenance'
+
+
+@pytest.fixture
+def make_coordinator(tmp_path):
+    """Aynı paylaşımlı dizini kullanan örnekler; kalp atışları testte elle yapılır"""
+    coordinators = []
+
+    def make(name):
+        coordinator = Coordinator(SETTINGS, tmp_path / 'shared', instance_id=name)
+        coordinator.register_job(JOB)
+        coordinator.start()
+        coordinators.append(coordinator)
+        return coordinator
+
+    yield make
+    for coordinator in coordinators:
+        coordinator.stop()
+
+
+def _age(path, seconds):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_live_instances_split_names(make_coordinator):
+    first = make_coordinator('first')
+    second = make_coordinator('second')
+    first.heartbeat()
+
+    names = [f'file{i}.txt' for i in range(200)]
+    for name in names:
+        assert first.owns(name) != second.owns(name)
+    assert 0 < sum(first.owns(name) for name in names) < len(names)
+
+
+def test_single_leader_and_handover_on_stop(make_coordinator):
+    first = make_coordinator('first')
+    second = make_coordinator('second')
+    assert first.is_leader(JOB) and not second.is_leader(JOB)
+
+    first.stop()
+    second.heartbeat()
+    assert second.is_leader(JOB)
+
+
+def test_stale_lease_is_taken_over_and_old_leader_steps_down(make_coordinator, caplog):
+    first = make_coordinator('first')
+    second = make_coordinator('second')
+
+    # İlk örnek donmuş: kirası ve üyeliği LEASE_SECONDS'tan eski
+    _age(first.leases_dir / f'{JOB}.lease', 60)
+    _age(first.member_path, 60)
+    second.heartbeat()
+    assert second.is_leader(JOB)
+    assert second.ring.members == {'second'}
+
+    first.heartbeat()
+    assert not first.is_leader(JOB)
+    assert 'Lost leadership' in caplog.text
+
+
+def test_trash_share_is_reconciled_when_instance_leaves(make_coordinator, tmp_path):
+    trash = tmp_path / 'trash'
+    names = [f'file{i}.txt' for i in range(20)]
+    for name in names:
+        write_file(trash / name, b'x')
+
+    first = make_coordinator('first')
+    second = make_coordinator('second')
+    index = TrashIndex(tmp_path / 'second.db')
+    expiry = TrashExpiry(index, TRASH_SETTINGS, NullGovernor(), trash_dir=trash, owns=second.owns)
+    # FileManager'daki bağlantının aynısı: halka değişince çöp payı yeniden taranır
+    second.subscribe(lambda ring: expiry.rescan())
+    expiry.start()
+    try:
+        expiry.reconcile()
+        mine = set(index.arrivals())
+        assert 0 < len(mine) < len(names)
+
+        first.stop()
+        second.heartbeat()
+        deadline = time.monotonic() + 5
+        while len(index.arrivals()) < len(names) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert set(index.arrivals()) == {str(trash / name) for name in names}
+    finally:
+        expiry.stop()
@@ -0,0 +1,63 @@
+# test_governor.py
+import threading
+import time
+
+from config import Config
+from governor import ResourceGovernor
+
+MAX_PAUSE = 0.5
+
+
+def _governor(tmp_path):
+    config = Config(home_path=tmp_path / 'home', load=False)
+    settings = dict(config.GOVERNOR_SETTINGS, MAX_PAUSE_SECONDS=MAX_PAUSE)
+    return ResourceGovernor(dict(config.RESOURCE_LIMITS, MAX_CPU=50, MAX_RAM=100, MAX_DISK_MBPS=0), settings)
+
+
+def _set_cpu(governor, cpu):
+    # Örnekleme iş parçacığı başlatılmaz; ölçüm elle verilir
+    governor.cpu = cpu
+    governor._update_rate()
+
+
+def test_pause_deadline_is_shared_by_late_workers(tmp_path):
+    governor = _governor(tmp_path)
+    _set_cpu(governor, 80)
+    assert governor.paused
+
+    first = threading.Thread(target=governor.acquire)
+    first.start()
+    time.sleep(MAX_PAUSE * 0.6)
+
+    # Duraklamanın ortasında gelen işçi kendi MAX_PAUSE_SECONDS'unu beklemez
+    start = time.monotonic()
+    governor.acquire()
+    assert time.monotonic() - start < MAX_PAUSE * 0.8
+    first.join(MAX_PAUSE * 2)
+    assert not first.is_alive()
+
+
+def test_pause_restarts_after_resume(tmp_path):
+    governor = _governor(tmp_path)
+    _set_cpu(governor, 80)
+    first_pause = governor._paused_since
+    _set_cpu(governor, 10)
+    assert not governor.paused and governor._paused_since is None
+
+    time.sleep(0.01)
+    _set_cpu(governor, 80)
+    assert governor._paused_since > first_pause
+
+
+def test_resume_wakes_waiting_worker(tmp_path):
+    governor = _governor(tmp_path)
+    governor.max_pause = 30
+    _set_cpu(governor, 80)
+
+    worker = threading.Thread(target=governor.acquire)
+    worker.start()
+    time.sleep(0.05)
+    assert worker.is_alive()
+    _set_cpu(governor, 10)
+    worker.join(2)
+    assert not worker.is_alive()
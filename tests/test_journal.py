@@ -0,0 +1,174 @@
+# test_journal.py
+import time
+
+from conftest import write_file
+from journal import MoveJournal
+
+SETTINGS = {
+    'FSYNC_INTERVAL': 0.5,
+    'FSYNC_BATCH': 256,
+    'MAX_MB': 64,
+    'KEEP_BATCHES': 50,
+    'SESSION_IDLE_SECONDS': 600,
+    'SESSION_MAX_SECONDS': 3600,
+    'SESSION_MAX_MOVES': 1000,
+}
+
+
+def _move(journal, src, dst):
+    entry = journal.intent(src, dst)
+    journal.done(entry)
+
+
+def test_reload_keeps_batches_and_truncates_torn_tail(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = MoveJournal(path, SETTINGS)
+    with journal.batch('categorize') as batch_id:
+        _move(journal, 'a', 'b')
+        journal.intent('c', 'd')
+    journal.close()
+    with open(path, 'ab') as f:
+        f.write(b'{"op":"done","i')
+
+    journal = MoveJournal(path, SETTINGS)
+    try:
+        assert journal.batch_moves(batch_id) == [('a', 'b')]
+        assert [(src, dst) for _, src, dst in journal.pending()] == [('c', 'd')]
+        assert path.read_bytes().endswith(b'\n')
+    finally:
+        journal.close()
+
+
+def test_session_batch_rotates_on_move_cap_and_idle_gap(tmp_path):
+    journal = MoveJournal(tmp_path / 'journal.jsonl', dict(SETTINGS, SESSION_MAX_MOVES=2, SESSION_IDLE_SECONDS=0.2))
+    try:
+        for i in range(3):
+            _move(journal, f'src{i}', f'dst{i}')
+        time.sleep(0.3)
+        _move(journal, 'src3', 'dst3')
+        assert [moves for _, _, _, moves, _ in journal.batches()] == [2, 1, 1]
+    finally:
+        journal.close()
+
+
+def test_undone_session_is_not_reused(tmp_path):
+    journal = MoveJournal(tmp_path / 'journal.jsonl', SETTINGS)
+    try:
+        _move(journal, 'a', 'b')
+        first = journal.last_batch()
+        journal.mark_undone(first)
+        _move(journal, 'c', 'd')
+        assert journal.last_batch() not in (None, first)
+    finally:
+        journal.close()
+
+
+def test_last_batch_skips_undo_batches_after_reload(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = MoveJournal(path, SETTINGS)
+    with journal.batch('categorize') as first:
+        _move(journal, 'a', 'b')
+    with journal.batch('categorize') as second:
+        _move(journal, 'c', 'd')
+    with journal.batch(f'undo {second}', undo_of=second):
+        _move(journal, 'd', 'c')
+    journal.mark_undone(second)
+    journal.close()
+
+    journal = MoveJournal(path, SETTINGS)
+    try:
+        assert journal.last_batch() == first
+    finally:
+        journal.close()
+
+
+def test_running_journal_is_compacted_past_max_size(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    # MAX_MB ayarda en az 1; test için birkaç KB'a indirilir
+    settings = dict(SETTINGS, MAX_MB=4096 / (1024 * 1024), KEEP_BATCHES=3)
+    journal = MoveJournal(path, settings)
+    try:
+        for number in range(100):
+            with journal.batch('categorize'):
+                _move(journal, f'src{number}', f'dst{number}')
+            assert path.stat().st_size <= 8192
+        pending = journal.intent('left', 'behind')
+        assert journal.batches()[0][0] > 90
+    finally:
+        journal.close()
+
+    journal = MoveJournal(path, settings)
+    try:
+        last = journal.last_batch()
+        assert journal.batch_moves(last) == [('src99', 'dst99')]
+        assert journal.pending() == [(pending, 'left', 'behind')]
+    finally:
+        journal.close()
+
+
+def test_compaction_keeps_intents_of_missing_batches(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    # Toplu iş kaydı kesilmiş ya da elle silinmiş bir günlük; boyut sınırı aşılmış
+    path.write_text(
+        '{"op":"intent","id":7,"batch":3,"src":"a","dst":"b"}\n'
+        + '{"op":"batch","batch":1,"label":"watch","time":0}\n' * 200,
+        encoding='utf-8'
+    )
+    settings = dict(SETTINGS, MAX_MB=1024 / (1024 * 1024), KEEP_BATCHES=1)
+
+    journal = MoveJournal(path, settings)
+    journal.close()
+    journal = MoveJournal(path, settings)
+    try:
+        assert journal.pending() == [(7, 'a', 'b')]
+        assert path.stat().st_size < 1024
+    finally:
+        journal.close()
+
+
+def test_recover_rolls_back_completes_and_drops_lost_moves(config, make_file_manager):
+    files = config.BASE_DIRS['FILES']
+    documents = files / 'Documents'
+    # Kaynak duruyor, hedefte yer tutucu: geri sarılır
+    kept = write_file(files / 'kept.pdf', b'kept')
+    write_file(documents / 'kept.pdf', b'')
+    # Kaynak yok, hedef var: tamamlanmış sayılır
+    done = write_file(documents / 'done.pdf', b'done')
+
+    journal = MoveJournal(config.JOURNAL_PATH, config.JOURNAL_SETTINGS)
+    with journal.batch('categorize') as batch_id:
+        journal.intent(kept, documents / 'kept.pdf')
+        journal.intent(files / 'done.pdf', done)
+        journal.intent(files / 'lost.pdf', documents / 'lost.pdf')
+    journal.close()
+
+    file_manager = make_file_manager()
+    assert file_manager.journal.pending() == []
+    assert kept.read_bytes() == b'kept'
+    assert not (documents / 'kept.pdf').exists()
+    assert file_manager.journal.batch_moves(batch_id) == [(str(files / 'done.pdf'), str(done))]
+
+    # Tamamlanan taşıma geri alınabilir
+    assert file_manager.undo_batch(batch_id) == 1
+    assert (files / 'done.pdf').read_bytes() == b'done'
+
+
+def test_undo_restores_batch_and_second_undo_does_not_redo(config, file_manager):
+    files = config.BASE_DIRS['FILES']
+    report = write_file(files / 'report.pdf', b'%PDF-1.4 report')
+    photo = write_file(files / 'photo.jpg', b'\xff\xd8\xff photo')
+
+    file_manager.categorize_files_in_directory()
+    assert (files / 'Documents' / 'report.pdf').exists()
+    assert (files / 'Images' / 'photo.jpg').exists()
+
+    assert file_manager.undo_batch() == 2
+    assert report.read_bytes() == b'%PDF-1.4 report'
+    assert photo.read_bytes() == b'\xff\xd8\xff photo'
+    assert file_manager.is_restored(report)
+
+    # Geri alma işinin kendisi "son iş" sayılmaz; ikinci tıklama taşımaları yinelemez
+    assert file_manager.journal.last_batch() is None
+    assert file_manager.undo_batch() == 0
+    assert report.exists() and photo.exists()
+    assert not (files / 'Documents' / 'report.pdf').exists()
@@ -0,0 +1,120 @@
+# test_planner.py
+import os
+import time
+
+import pytest
+
+import planner
+from conftest import write_file
+from planner import Plan, PlanExecutor, Planner
+
+DAY = 86400
+# Gelecekteki bir "şimdi" ile yaş eşikleri ctime'ı geriye almadan aşılır
+LATER = 400 * DAY
+
+
+@pytest.fixture(params=['loop', 'numpy'])
+def vectorized(request, monkeypatch):
+    if request.param == 'numpy':
+        monkeypatch.setattr(planner, 'np', pytest.importorskip('numpy'))
+    else:
+        monkeypatch.setattr(planner, 'np', None)
+    return request.param == 'numpy'
+
+
+@pytest.fixture
+def tree(config, file_manager):
+    base_dirs = config.BASE_DIRS
+    files = base_dirs['FILES']
+    paths = {
+        'categorize': write_file(files / 'report.pdf', b'%PDF-1.4 new report'),
+        'age': write_file(files / 'Documents' / 'stale.pdf', b'%PDF-1.4 stale'),
+        'compress': write_file(base_dirs['OLD'] / 'notes.txt', b'old notes ' * 100),
+        'expire': write_file(base_dirs['TRASH'] / 'junk.bin', b'junk'),
+    }
+    file_manager.trash.record(paths['expire'])
+    return paths
+
+
+def _by_action(plan):
+    return {planner.ACTIONS[item.action]: item for item in plan.items}
+
+
+def test_plan_decides_every_action(file_manager, tree, vectorized):
+    plan = Planner(file_manager).build(now=time.time() + LATER)
+
+    items = _by_action(plan)
+    assert {action: item.path for action, item in items.items()} == {
+        action: str(path) for action, path in tree.items()
+    }
+    assert items['categorize'].dest == 'Documents'
+    assert plan.vectorized == vectorized
+    assert plan.summary['expire'] == {'count': 1, 'bytes': 4, 'freed': 4}
+    assert all(plan.summary[action]['count'] == 1 for action in planner.ACTIONS)
+
+
+def test_dry_run_changes_nothing(config, file_manager, tree, vectorized):
+    Planner(file_manager).build(now=time.time() + LATER)
+    assert all(path.exists() for path in tree.values())
+    assert os.listdir(config.BASE_DIRS['FILES'] / 'Documents') == ['stale.pdf']
+
+
+def test_recent_files_stay_put(file_manager, tree, vectorized):
+    plan = Planner(file_manager).build()
+    assert [planner.ACTIONS[item.action] for item in plan.items] == ['categorize']
+
+
+def test_collision_with_existing_file_is_flagged(config, file_manager, vectorized):
+    files = config.BASE_DIRS['FILES']
+    write_file(files / 'Images' / 'photo.jpg', b'\xff\xd8\xff existing')
+    write_file(files / 'photo.jpg', b'\xff\xd8\xff incoming')
+    write_file(files / 'other.jpg', b'\xff\xd8\xff other')
+
+    plan = Planner(file_manager).build()
+
+    renamed = {os.path.basename(item.path): item.renamed for item in plan.items}
+    assert renamed == {'photo.jpg': True, 'other.jpg': False}
+    assert plan.summary['categorize']['renamed'] == 1
+
+
+def test_saved_plan_applies_every_action(config, file_manager, tree, vectorized, tmp_path):
+    path = tmp_path / 'plan.jsonl'
+    Planner(file_manager).build(now=time.time() + LATER).save(path)
+    plan = Plan.load(path)
+
+    done = PlanExecutor(file_manager).execute(plan)
+
+    assert done == {action: 1 for action in planner.ACTIONS}
+    base_dirs = config.BASE_DIRS
+    assert (base_dirs['FILES'] / 'Documents' / 'report.pdf').read_bytes() == b'%PDF-1.4 new report'
+    assert (base_dirs['OLD'] / 'stale.pdf').read_bytes() == b'%PDF-1.4 stale'
+    assert not any(path.exists() for path in tree.values())
+    archives = [name for name in os.listdir(base_dirs['OLD']) if name.startswith('Archived_')]
+    assert len(archives) == 1
+    assert os.listdir(base_dirs['TRASH']) == []
+
+
+def test_files_changed_after_planning_are_skipped(config, file_manager, tree, vectorized):
+    plan = Planner(file_manager).build(now=time.time() + LATER)
+    tree['categorize'].write_bytes(b'%PDF-1.4 edited after planning')
+
+    done = PlanExecutor(file_manager).execute(plan)
+
+    assert done['categorize'] == 0
+    assert tree['categorize'].exists()
+    assert done['expire'] == 1
+
+
+def test_numpy_and_loop_plans_match(file_manager, tree, monkeypatch):
+    numpy = pytest.importorskip('numpy')
+    now = time.time() + LATER
+    monkeypatch.setattr(planner, 'np', None)
+    loop = [item.to_json() for item in Planner(file_manager).build(now=now).items]
+    monkeypatch.setattr(planner, 'np', numpy)
+    vectorized = [item.to_json() for item in Planner(file_manager).build(now=now).items]
+    assert sorted(loop, key=str) == sorted(vectorized, key=str)
+
+
+def test_apply_without_plan_fails(tmp_path, capsys):
+    assert planner.main(['--home', str(tmp_path), '--apply']) == 1
+    assert 'No plan' in capsys.readouterr().err
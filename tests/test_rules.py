@@ -0,0 +1,78 @@
+# test_rules.py
+import os
+
+import pytest
+
+from conftest import write_file
+from rules import Rule, RuleEngine, RuleError
+
+
+@pytest.mark.parametrize('destination', [
+    'Images/{}',
+    'Images/{0}',
+    'Images/{year.real}',
+    'Images/{year[0]}',
+    'Images/{year',
+    'Images/{year:d}',
+    'Images/{year:%Y}',
+    'Images/{unknown}',
+    '/abs/{year}',
+    '../outside',
+    '',
+    '.',
+    './',
+    'Images/..',
+])
+def test_invalid_destination_template_is_rejected(destination):
+    with pytest.raises(RuleError):
+        Rule(0, {'destination': destination, 'extensions': ['png']})
+
+
+@pytest.mark.parametrize('data', [
+    'not a rule',
+    {'extensions': ['png']},
+    {'destination': 'Images', 'colour': 'red'},
+    {'destination': 'Images', 'glob': '*.png', 'regex': 'png$'},
+    {'destination': 'Images', 'regex': '('},
+    {'destination': 'Images', 'extensions': 'png'},
+    {'destination': 'Images', 'types': 'png'},
+    {'destination': 'Images', 'extensions': ['png', 3]},
+    {'destination': 'Images', 'glob': 5},
+    {'destination': 'Images', 'min_size': '10'},
+    {'destination': 'Images', 'max_size': -1},
+    {'destination': 'Images', 'min_age_days': '3'},
+    {'destination': 'Images', 'max_age_days': True},
+])
+def test_invalid_rule_is_rejected(data):
+    with pytest.raises(RuleError):
+        Rule(0, data)
+
+
+def test_engine_skips_invalid_rules_and_keeps_valid_ones():
+    engine = RuleEngine([
+        {'destination': 'Images/{}', 'extensions': ['png']},
+        {'destination': 'Images/Shots/{ext:>5}', 'extensions': ['png']},
+    ])
+    assert len(engine) == 1
+    assert engine.destination('/tmp/shot.png') == os.path.join('Images', 'Shots', '  png')
+
+
+def test_rule_error_falls_back_to_category_instead_of_trash(config, file_manager, monkeypatch):
+    class BrokenRules:
+        def __len__(self):
+            return 1
+
+        def destination(self, path, st=None, classifier=None):
+            raise IndexError('tuple index out of range')
+
+    monkeypatch.setattr(file_manager, 'rules', BrokenRules())
+    files = config.BASE_DIRS['FILES']
+    write_file(files / 'shot.png', b'\x89PNG\r\n\x1a\n shot')
+    write_file(files / 'other.png', b'\x89PNG\r\n\x1a\n other')
+
+    file_manager.move_to_category(files / 'shot.png')
+    file_manager.categorize_files_in_directory()
+
+    assert (files / 'Images' / 'shot.png').exists()
+    assert (files / 'Images' / 'other.png').exists()
+    assert os.listdir(config.BASE_DIRS['TRASH']) == []
@@ -0,0 +1,162 @@
+# test_transfer.py
+import os
+import json
+import threading
+
+import pytest
+
+from conftest import NullGovernor, write_file
+from transfer import TransferEngine, TransferError
+
+SETTINGS = {'MAX_TRANSFERS': 2, 'CHUNK_MB': 1, 'VERIFY': 'hash', 'FSYNC': False}
+SIZE = 3 * 1024 * 1024 + 123
+
+
+class GateGovernor(NullGovernor):
+    """İlk parçadan sonra serbest bırakılana kadar aktarımı bekletir"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def acquire(self, amount=1):
+        self.calls += 1
+        if self.calls == 2:
+            self.started.set()
+            assert self.release.wait(10)
+
+
+@pytest.fixture
+def source(tmp_path):
+    (tmp_path / 'dst').mkdir()
+    return write_file(tmp_path / 'src' / 'video.bin', os.urandom(SIZE))
+
+
+def _engine(governor=None, **settings):
+    return TransferEngine(dict(SETTINGS, **settings), governor or NullGovernor())
+
+
+def _write_partial(engine, source, dest_dir, data):
+    part = engine.part_path(source, dest_dir)
+    part.write_bytes(data)
+    st = os.stat(source)
+    signature = {'src': str(source), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+    part.with_name(part.name + '.json').write_text(json.dumps(signature))
+    return part
+
+
+def _resumed_offsets(engine, monkeypatch):
+    offsets = []
+    copy_range = engine._copy_range
+
+    def spy(src_fd, dst_fd, offset, size):
+        offsets.append(offset)
+        return copy_range(src_fd, dst_fd, offset, size)
+
+    monkeypatch.setattr(engine, '_copy_range', spy)
+    return offsets
+
+
+def test_resumes_matching_partial_copy(tmp_path, source, monkeypatch):
+    engine = _engine()
+    data = source.read_bytes()
+    dest = tmp_path / 'dst' / 'video.bin'
+    part = _write_partial(engine, source, dest.parent, data[:SIZE // 2])
+    offsets = _resumed_offsets(engine, monkeypatch)
+
+    engine.copy_move(source, dest)
+
+    assert offsets == [SIZE // 2]
+    assert dest.read_bytes() == data
+    assert not source.exists()
+    assert not part.exists() and not part.with_name(part.name + '.json').exists()
+
+
+def test_restarts_when_partial_does_not_match_source(tmp_path, source, monkeypatch):
+    engine = _engine()
+    data = source.read_bytes()
+    dest = tmp_path / 'dst' / 'video.bin'
+    _write_partial(engine, source, dest.parent, b'\0' * (SIZE // 2))
+    offsets = _resumed_offsets(engine, monkeypatch)
+
+    engine.copy_move(source, dest)
+
+    assert offsets == [0]
+    assert dest.read_bytes() == data
+
+
+def test_interrupted_copy_is_kept_and_resumed(tmp_path, source, monkeypatch):
+    data = source.read_bytes()
+    dest = tmp_path / 'dst' / 'video.bin'
+    governor = GateGovernor()
+    engine = _engine(governor)
+    future = engine.submit(source, dest)
+    assert governor.started.wait(10)
+    engine.shutdown(wait=False)
+    governor.release.set()
+    with pytest.raises(TransferError):
+        future.result(10)
+    assert source.exists() and not dest.exists()
+    assert 0 < os.path.getsize(engine.part_path(source, dest.parent)) < SIZE
+
+    engine = _engine()
+    offsets = _resumed_offsets(engine, monkeypatch)
+    engine.copy_move(source, dest)
+    assert offsets[0] > 0
+    assert dest.read_bytes() == data
+
+
+def test_concurrent_submit_of_same_source_is_rejected(tmp_path, source):
+    data = source.read_bytes()
+    governor = GateGovernor()
+    engine = _engine(governor)
+    future = engine.submit(source, tmp_path / 'dst' / 'video.bin')
+    try:
+        assert governor.started.wait(10)
+        assert engine.is_transferring(source)
+        with pytest.raises(TransferError):
+            engine.submit(source, tmp_path / 'dst' / 'video_1.bin')
+        # Başka bir süreç aynı yarım dosyayı sürdüremez ve onu kesmez
+        with pytest.raises(TransferError):
+            _engine().copy_move(source, tmp_path / 'dst' / 'video_2.bin')
+    finally:
+        governor.release.set()
+    future.result(10)
+
+    assert not engine.is_transferring(source)
+    assert (tmp_path / 'dst' / 'video.bin').read_bytes() == data
+    assert sorted(os.listdir(tmp_path / 'dst')) == ['video.bin']
+
+
+def test_in_flight_file_is_not_resubmitted_by_organizer(config, file_manager):
+    files = config.BASE_DIRS['FILES']
+    report = write_file(files / 'report.pdf', b'%PDF-1.4 report')
+    file_manager.transfers._claim(report)
+    try:
+        file_manager.categorize_files_in_directory()
+        file_manager.move_to_category(report)
+        assert report.exists()
+        assert os.listdir(files / 'Documents') == []
+    finally:
+        file_manager.transfers._release(report)
+
+    file_manager.categorize_files_in_directory()
+    assert (files / 'Documents' / 'report.pdf').exists()
+
+
+def test_partial_copies_are_not_indexed_as_user_files(config, file_manager):
+    documents = config.BASE_DIRS['FILES'] / 'Documents'
+    part = file_manager.transfers.part_path('/elsewhere/report.pdf', documents)
+    write_file(part, b'partial')
+    write_file(part.with_name(part.name + '.json'), b'{}')
+    write_file(documents / 'report.pdf', b'%PDF-1.4 report')
+    trash_part = file_manager.transfers.part_path('/elsewhere/old.bin', config.BASE_DIRS['TRASH'])
+    write_file(trash_part, b'partial')
+
+    file_manager.index.refresh()
+    file_manager.trash_expiry.reconcile()
+
+    assert [path.name for path in file_manager.index.search('report')] == ['report.pdf']
+    assert file_manager.index.search('organizer') == []
+    assert file_manager.trash.arrivals() == {}
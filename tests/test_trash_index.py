@@ -0,0 +1,81 @@
+# test_trash_index.py
+import time
+
+import pytest
+
+from conftest import NullGovernor, write_file
+from transfer import PART_PREFIX
+from trash_index import TrashExpiry, TrashIndex
+
+SETTINGS = {'RETENTION_DAYS': 1, 'BATCH_SIZE': 10, 'BATCH_PAUSE': 0, 'CHECK_INTERVAL': 3600}
+
+
+@pytest.fixture
+def trash(tmp_path):
+    return tmp_path / 'trash'
+
+
+@pytest.fixture
+def index(tmp_path):
+    return TrashIndex(tmp_path / 'trash.db')
+
+
+def _paths(index):
+    return set(index.arrivals())
+
+
+def test_reconcile_adds_foreign_items_with_full_retention(trash, index):
+    dropped = write_file(trash / 'dropped.txt', b'x')
+    before = time.time()
+
+    assert index.reconcile(trash) == (1, 0)
+    assert index.arrivals()[str(dropped)] >= before
+
+    # Geliş zamanı "şimdi" sayıldığından mtime ne kadar eski olursa olsun hemen silinmez
+    expiry = TrashExpiry(index, SETTINGS, NullGovernor(), trash_dir=trash)
+    assert expiry.expire() == 0
+    assert dropped.exists()
+
+
+def test_reconcile_drops_rows_of_missing_items(trash, index):
+    kept = write_file(trash / 'kept.txt', b'x')
+    index.record(kept, arrived=1)
+    index.record(trash / 'restored.txt', arrived=1)
+
+    assert index.reconcile(trash) == (0, 1)
+    assert _paths(index) == {str(kept)}
+
+
+def test_reconcile_keeps_rows_recorded_during_the_scan(trash, index):
+    trash.mkdir()
+    # Tarama başladıktan sonra kaydedilen öğe dizin listesinde olmayabilir
+    index.record(trash / 'arriving.txt', arrived=time.time() + 60)
+
+    assert index.reconcile(trash) == (0, 0)
+    assert _paths(index) == {str(trash / 'arriving.txt')}
+
+
+def test_reconcile_skips_partial_copies_and_foreign_share(trash, index):
+    write_file(trash / f'{PART_PREFIX}big.iso.part', b'x')
+    mine = write_file(trash / 'mine.txt', b'x')
+    write_file(trash / 'theirs.txt', b'x')
+
+    index.reconcile(trash, owns=lambda path: path.endswith('mine.txt'))
+    assert _paths(index) == {str(mine)}
+
+
+def test_rescan_reconciles_in_worker(trash, index):
+    trash.mkdir()
+    expiry = TrashExpiry(index, SETTINGS, NullGovernor(), trash_dir=trash)
+    expiry.start()
+    try:
+        expiry.reconcile()
+        dropped = write_file(trash / 'dropped.txt', b'x')
+        expiry.rescan()
+
+        deadline = time.monotonic() + 5
+        while str(dropped) not in _paths(index) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert _paths(index) == {str(dropped)}
+    finally:
+        expiry.stop()